@@ -0,0 +1,3 @@
+"""
+Benchmarks and in-process fakes for the resume processor.
+"""
@@ -0,0 +1,319 @@
+"""
+In-process fakes for benchmarking the resume processor without external services.
+
+Provides a deterministic chat model with configurable latency and token counts,
+and in-memory stand-ins for S3Client and DynamoClient with the same interface.
+"""
+import io
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+DEFAULT_CUSTOM_CRITERIA = ["Past Success", "Diversity Hiring"]
+
+
+def build_jd_response(jd_score: float, verdict: bool = True, skills: int = 6) -> Dict[str, Any]:
+    """Build a JD analysis payload shaped like JD_OUTPUT_FORMAT."""
+    def skill_entries(prefix: str, max_score: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                "skill": f"{prefix} {i + 1}",
+                "score_awarded": max_score - (i % 2),
+                "max_score": max_score,
+                "comment": f"Resume shows explicit evidence of {prefix.lower()} {i + 1} across two roles."
+            }
+            for i in range(skills)
+        ]
+
+    return {
+        "Raw Score (out of 100)": int(jd_score * 10),
+        "Normalized Score (out of 10)": jd_score,
+        "Verdict": verdict,
+        "Score Breakdown": {
+            "Required Skills Match": "30/45",
+            "Preferred Skills Match": "15/20",
+            "Experience Match": "18/20",
+            "Education Match": "10/10",
+            "Resume Quality & Strengths": "4/5"
+        },
+        "Detailed Scoring": {
+            "Required Skills Match": skill_entries("Required skill", 6),
+            "Preferred Skills Match": skill_entries("Preferred skill", 4),
+            "Experience Match": [{
+                "criteria": "Years of Experience",
+                "required": "6-10",
+                "actual": "14",
+                "score_awarded": 18,
+                "max_score": 20,
+                "comment": "Exceeds the required range with relevant backend experience."
+            }],
+            "Education Match": [{
+                "criteria": "Degree",
+                "required": "BS in Computer Science",
+                "actual": "B.Tech",
+                "score_awarded": 10,
+                "max_score": 10,
+                "comment": "Degree matches the requirement."
+            }],
+            "Resume Quality & Strengths": [{
+                "criteria": "Clarity",
+                "score_awarded": 4,
+                "max_score": 5,
+                "comment": "Well structured with quantified achievements."
+            }]
+        },
+        "Key Strengths": ["Backend depth", "Cloud deployments", "Product ownership"],
+        "Areas for Improvement": ["Frontend exposure", "Team leadership evidence", "Mobile experience"]
+    }
+
+
+def build_cultural_response(
+    cultural_fit_score: float,
+    uniqueness_score: float,
+    custom_criteria: List[str]
+) -> Dict[str, Any]:
+    """Build a cultural analysis payload shaped like the CULTURAL_AGENT_PROMPT output."""
+    return {
+        "cultural_fit_score": cultural_fit_score,
+        "cultural_fit_justification": "Demonstrates ownership and curiosity through product builds.",
+        "core_value_scores": [
+            {"core_value": "Take ownership", "score": "strong", "justification": "Built two products from scratch."},
+            {"core_value": "Learn and be curious", "score": "partial", "justification": "Moved across several stacks."}
+        ],
+        "uniqueness_score": uniqueness_score,
+        "uniqueness_justification": "No explicit LLM project work in the resume.",
+        "custom_criteria_scores": [
+            {"name": name, "score": 5, "justification": f"Moderate evidence for {name}."}
+            for name in custom_criteria
+        ]
+    }
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic chat model standing in for ChatOpenAI.
+
+    Recognises which agent (or cultural fan-out part) is calling from the rendered
+    prompt and returns a canned, valid JSON payload for it. Latency is `latency_ms` plus
+    `ms_per_output_token * output_tokens` plus seeded uniform jitter. Streamed
+    responses arrive in `stream_chunk_chars` chunks spread over that latency. Like
+    the provider's client, a call given a `timeout` raises TimeoutError once waiting
+    for the response (or the next chunk) takes longer.
+    """
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    ms_per_output_token: float = 0.0
+    output_tokens: int = 600
+    seed: int = 0
+    jd_score: float = 7.5
+    jd_verdict: bool = True
+    cultural_fit_score: float = 7.0
+    uniqueness_score: float = 4.0
+    custom_criteria: List[str] = DEFAULT_CUSTOM_CRITERIA
+    stream_chunk_chars: int = 64
+
+    _rng: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+    _calls: int = PrivateAttr(default=0)
+    _input_tokens: int = PrivateAttr(default=0)
+    _output_tokens: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Number of calls and estimated tokens served so far."""
+        return {
+            "calls": self._calls,
+            "input_tokens": self._input_tokens,
+            "output_tokens": self._output_tokens
+        }
+
+    def _respond(self, prompt: str) -> str:
+        if '"cultural_analysis"' in prompt:
+            payload = {
+                "jd_analysis": build_jd_response(self.jd_score, self.jd_verdict),
+                "cultural_analysis": build_cultural_response(self.cultural_fit_score, self.uniqueness_score, self.custom_criteria)
+            }
+        elif "Criterion name:" in prompt:
+            name = re.search(r"Criterion name: (.+)", prompt).group(1).strip()
+            payload = {"name": name, "score": 5, "justification": f"Moderate evidence for {name}."}
+        elif "cultural_fit_score" in prompt:
+            payload = build_cultural_response(self.cultural_fit_score, self.uniqueness_score, self.custom_criteria)
+        elif '"uniqueness_score"' in prompt:
+            cultural = build_cultural_response(self.cultural_fit_score, self.uniqueness_score, self.custom_criteria)
+            payload = {key: cultural[key] for key in ("uniqueness_score", "uniqueness_justification")}
+        else:
+            payload = build_jd_response(self.jd_score, self.jd_verdict)
+        return json.dumps(payload)
+
+    def _complete(self, messages: List[BaseMessage]) -> Tuple[str, Dict[str, int], float]:
+        """Record a call and return its content, usage metadata and latency in ms."""
+        prompt = "".join(str(message.content) for message in messages)
+        # Rough 4-characters-per-token estimate, good enough for relative comparisons
+        input_tokens = len(prompt) // 4
+
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            self._calls += 1
+            self._input_tokens += input_tokens
+            self._output_tokens += self.output_tokens
+
+        delay_ms = max(0.0, self.latency_ms + self.ms_per_output_token * self.output_tokens + jitter)
+        usage = {
+            "input_tokens": input_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tokens": input_tokens + self.output_tokens
+        }
+        return self._respond(prompt), usage, delay_ms
+
+    @staticmethod
+    def _wait(seconds: float, timeout: Optional[float]) -> None:
+        """Wait `seconds` for the response, giving up after `timeout` seconds."""
+        if timeout is not None and seconds > timeout:
+            time.sleep(max(timeout, 0.0))
+            raise TimeoutError("Request timed out.")
+        if seconds:
+            time.sleep(seconds)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        content, usage, delay_ms = self._complete(messages)
+        self._wait(delay_ms / 1000, kwargs.get('timeout'))
+        message = AIMessage(content=content, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        content, usage, delay_ms = self._complete(messages)
+        chunks = [content[i:i + self.stream_chunk_chars] for i in range(0, len(content), self.stream_chunk_chars)]
+        for i, text in enumerate(chunks):
+            self._wait(delay_ms / len(chunks) / 1000, kwargs.get('timeout'))
+            # Usage is reported once, with the last chunk
+            chunk = AIMessageChunk(content=text, usage_metadata=usage if i == len(chunks) - 1 else None)
+            yield ChatGenerationChunk(message=chunk)
+
+
+class InMemoryS3Client:
+    """Dict-backed stand-in for utils.s3_client.S3Client."""
+
+    def __init__(self, objects: Optional[Dict[str, bytes]] = None, latency_ms: float = 0.0):
+        self.objects: Dict[str, bytes] = dict(objects or {})
+        self.latency_ms = latency_ms
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, operation: str) -> None:
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def batch_get_objects(self, keys: List[str]) -> Dict[str, Any]:
+        results = {}
+        for key in keys:
+            self._record('get_object')
+            results[key] = {'Body': io.BytesIO(self.objects[key])}
+        return results
+
+    def save_analysis(self, key: str, analysis_data: Dict[str, Any]) -> bool:
+        return self.put_object(key, json.dumps(analysis_data, indent=2))
+
+    def get_object(self, bucket: str, key: str) -> Optional[Dict[str, Any]]:
+        self._record('get_object')
+        if key not in self.objects:
+            return None
+        return json.loads(self.objects[key].decode('utf-8'))
+
+    def put_object(self, key: str, data: str) -> bool:
+        self._record('put_object')
+        self.objects[key] = data.encode('utf-8') if isinstance(data, str) else data
+        return True
+
+    def delete_object(self, key: str) -> bool:
+        self._record('delete_object')
+        self.objects.pop(key, None)
+        return True
+
+
+class InMemoryDynamoClient:
+    """Dict-backed stand-in for utils.dynamo_client.DynamoClient."""
+
+    _SET_CLAUSE = re.compile(r'^\s*([#\w]+)\s*=\s*(:\w+)\s*$')
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.items: Dict[tuple, Dict[str, Any]] = {}
+        self.latency_ms = latency_ms
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _item_key(key: Dict[str, Any]) -> tuple:
+        return tuple(sorted(key.items()))
+
+    def _record(self, operation: str) -> None:
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def get_item(self, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        self._record('get_item')
+        item = self.items.get(self._item_key(key))
+        return dict(item) if item is not None else None
+
+    def put_item(self, item: Dict[str, Any]) -> bool:
+        self._record('put_item')
+        key = {name: item[name] for name in ('candidate_id', 'job_id') if name in item}
+        self.items[self._item_key(key)] = dict(item)
+        return True
+
+    def batch_get_items(self, keys: List[Dict[str, Any]], projection: Optional[List[str]] = None, **kwargs: Any) -> Optional[List[Dict[str, Any]]]:
+        self._record('batch_get_items')
+        found = []
+        for item_key in {self._item_key(key) for key in keys}:
+            item = self.items.get(item_key)
+            if item is not None:
+                found.append({name: value for name, value in item.items() if projection is None or name in projection})
+        return found
+
+    def update_item(self, key: Dict[str, Any], update_expression: str, expression_values: Dict[str, Any], expression_attribute_names: Dict[str, str]) -> bool:
+        """Apply a `SET a = :x, #b = :y` style update expression."""
+        self._record('update_item')
+        assignments = update_expression.strip()
+        if not assignments.upper().startswith('SET '):
+            raise ValueError(f"Unsupported update expression: {update_expression}")
+        with self._lock:
+            item = self.items.setdefault(self._item_key(key), dict(key))
+            for clause in assignments[4:].split(','):
+                match = self._SET_CLAUSE.match(clause)
+                if not match:
+                    raise ValueError(f"Unsupported update clause: {clause}")
+                name, placeholder = match.groups()
+                name = expression_attribute_names.get(name, name)
+                item[name] = expression_values[placeholder]
+        return True
@@ -0,0 +1,113 @@
+"""
+Microbenchmark helpers with stored baselines and a regression threshold.
+
+Timings are stored relative to a fixed pure-Python calibration workload, so a
+baseline recorded on one machine stays meaningful on another. A benchmark fails
+when its relative cost exceeds the baseline by more than MICROBENCH_THRESHOLD
+(default 1.5, i.e. 50% slower). Set MICROBENCH_UPDATE=1 to re-record baselines,
+in the same change as anything that alters a benchmarked path (its inputs, the
+code it runs): a baseline of a different workload makes the check meaningless.
+"""
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baselines', 'microbenchmarks.json')
+
+REGRESSION_THRESHOLD = float(os.getenv('MICROBENCH_THRESHOLD', '1.5'))
+UPDATE_BASELINES = os.getenv('MICROBENCH_UPDATE') == '1'
+
+_calibration: Optional[float] = None
+
+
+def measure(fn: Callable[[], Any], repeat: int = 7, min_time: float = 0.05) -> float:
+    """
+    Best-of-`repeat` time per call of `fn`, in seconds.
+
+    Each repeat runs `fn` in a loop for at least `min_time` seconds so that
+    fast functions are not dominated by timer resolution.
+    """
+    # Warm-up and size the inner loop
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 2
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def _calibration_workload() -> None:
+    # Dict/str/JSON-ish work, similar in nature to the code under test
+    data = {f"key_{i}": [i, str(i), {"v": i * 0.5}] for i in range(200)}
+    json.dumps(data)
+    sorted(data, key=len)
+
+
+def calibration_time() -> float:
+    """Per-call time of the calibration workload on this machine (cached)."""
+    global _calibration
+    if _calibration is None:
+        _calibration = measure(_calibration_workload)
+    return _calibration
+
+
+def load_baselines(path: str = BASELINE_FILE) -> Dict[str, float]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(baselines: Dict[str, float], path: str = BASELINE_FILE) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(dict(sorted(baselines.items())), f, indent=2)
+        f.write('\n')
+
+
+def check_against_baseline(name: str, fn: Callable[[], Any], path: str = BASELINE_FILE) -> Dict[str, float]:
+    """
+    Measure `fn` and compare its calibrated cost with the stored baseline.
+
+    Args:
+        name: Baseline entry name
+        fn: Zero-argument callable to benchmark
+        path: Baseline file
+
+    Returns:
+        Dict with the absolute time, relative cost and baseline
+
+    Raises:
+        AssertionError: If the relative cost exceeds the baseline by more than the threshold
+        LookupError: If no baseline is recorded for `name` and updating is not enabled
+    """
+    seconds = measure(fn)
+    relative = seconds / calibration_time()
+    baselines = load_baselines(path)
+
+    if UPDATE_BASELINES:
+        baselines[name] = round(relative, 4)
+        save_baselines(baselines, path)
+        return {'seconds': seconds, 'relative': relative, 'baseline': relative}
+
+    if name not in baselines:
+        raise LookupError(f"No microbenchmark baseline for '{name}'; run with MICROBENCH_UPDATE=1 to record it")
+
+    baseline = baselines[name]
+    assert relative <= baseline * REGRESSION_THRESHOLD, (
+        f"{name} regressed: {relative:.2f}x calibration vs baseline {baseline:.2f}x "
+        f"({seconds * 1e6:.1f}us per call, threshold {REGRESSION_THRESHOLD:.2f})"
+    )
+    return {'seconds': seconds, 'relative': relative, 'baseline': baseline}
@@ -0,0 +1,277 @@
+"""
+End-to-end throughput benchmark for the resume processor.
+
+Drives either ResumeProcessorWorkflow directly or the FastAPI app in-process,
+with the fakes from benchmarks.fakes standing in for OpenAI, S3 and DynamoDB,
+and reports throughput, latency percentiles and a per-node time breakdown.
+
+Usage:
+    python -m benchmarks.throughput --target workflow --runs 200 --concurrency 8 --llm-latency-ms 50
+    python -m benchmarks.throughput --target app --compare benchmarks/results/<previous>.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from models.workflow_request import WorkflowRequest
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+FIXTURE_DIR = os.path.join(SRC_DIR, 'tests', 'test-data', 'h2-2025-backend-lead-2235')
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+JOB_ID = 'h2-2025-backend-lead-2235'
+
+# Fixture file name for each S3 URL field of WorkflowRequest
+FIXTURE_FILES = {
+    'resume_s3_url': 'resume-data.json',
+    'jd_s3_url': 'job-description.json',
+    'core_values_s3_url': 'core-values.json',
+    'uniqueness_description_s3_url': 'uniqueness-defination.json',
+    'custom_criteria_s3_url': 'custom-criteria.json',
+}
+
+
+def load_fixture_objects() -> Dict[str, bytes]:
+    """Read the bundled test-data documents keyed by their S3 keys."""
+    objects = {}
+    for file_name in FIXTURE_FILES.values():
+        with open(os.path.join(FIXTURE_DIR, file_name), 'rb') as f:
+            objects[f"{JOB_ID}/config/{file_name}"] = f.read()
+    return objects
+
+
+def build_request(candidate_id: str) -> WorkflowRequest:
+    """Build a workflow request for the bundled fixture job."""
+    with open(os.path.join(FIXTURE_DIR, 'scoring-weights.json')) as f:
+        scoring = json.load(f)
+    return WorkflowRequest(
+        job_id=JOB_ID,
+        candidate_id=candidate_id,
+        **{field: f"{JOB_ID}/config/{file_name}" for field, file_name in FIXTURE_FILES.items()},
+        **scoring
+    )
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies: List[float], wall_time: float) -> Dict[str, float]:
+    """Throughput and latency percentiles, in runs/s and milliseconds."""
+    return {
+        'throughput_per_s': len(latencies) / wall_time if wall_time else 0.0,
+        'mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def _run_workflow_once(llm: FakeChatModel, s3_client: InMemoryS3Client, dynamo_client: InMemoryDynamoClient, candidate_id: str) -> Dict[str, Any]:
+    """Run one candidate through build_state and the compiled graph, timing each node."""
+    from services.workflow_service import WorkflowService
+    from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+    started = time.perf_counter()
+    # Mirror the controller, which builds a workflow per request
+    workflow = ResumeProcessorWorkflow(llm=llm, s3_client=s3_client, dynamo_client=dynamo_client)
+    built = time.perf_counter()
+    state = WorkflowService.build_state(build_request(candidate_id), s3_client)
+    node_times = {'workflow_init': built - started, 'build_state': time.perf_counter() - built}
+
+    # Nodes run sequentially, so the gap between streamed updates is the node's time
+    status = None
+    last = time.perf_counter()
+    for update in workflow.compiled_workflow.stream(state, stream_mode="updates"):
+        now = time.perf_counter()
+        for node_name, node_state in update.items():
+            node_times[node_name] = now - last
+            status = node_state.get('status', status)
+        last = now
+
+    return {'latency': time.perf_counter() - started, 'node_times': node_times, 'status': status}
+
+
+def run_workflow_benchmark(llm: FakeChatModel, runs: int, concurrency: int, s3_latency_ms: float = 0.0, dynamo_latency_ms: float = 0.0) -> Dict[str, Any]:
+    """Run `runs` candidates through ResumeProcessorWorkflow on `concurrency` threads."""
+    s3_client = InMemoryS3Client(load_fixture_objects(), latency_ms=s3_latency_ms)
+    dynamo_client = InMemoryDynamoClient(latency_ms=dynamo_latency_ms)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(
+            lambda i: _run_workflow_once(llm, s3_client, dynamo_client, f"bench-candidate-{i}"),
+            range(runs)
+        ))
+    wall_time = time.perf_counter() - started
+
+    node_samples: Dict[str, List[float]] = {}
+    statuses: Dict[str, int] = {}
+    for outcome in outcomes:
+        for node_name, seconds in outcome['node_times'].items():
+            node_samples.setdefault(node_name, []).append(seconds)
+        statuses[str(outcome['status'])] = statuses.get(str(outcome['status']), 0) + 1
+
+    return {
+        **summarize([outcome['latency'] for outcome in outcomes], wall_time),
+        'runs': runs,
+        'wall_time_s': wall_time,
+        'statuses': statuses,
+        'nodes': {
+            name: {'mean_ms': sum(samples) / len(samples) * 1000, 'p95_ms': percentile(samples, 95) * 1000}
+            for name, samples in node_samples.items()
+        },
+        'llm': llm.stats,
+        's3_calls': s3_client.calls,
+        'dynamo_calls': dynamo_client.calls,
+    }
+
+
+async def _drive_app(app, runs: int, concurrency: int) -> List[Dict[str, Any]]:
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        async def one(i: int) -> Dict[str, Any]:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/workflows/resume_processor/run",
+                    json=build_request(f"bench-candidate-{i}").model_dump()
+                )
+                return {'latency': time.perf_counter() - started, 'http_status': response.status_code}
+        return await asyncio.gather(*(one(i) for i in range(runs)))
+
+
+def run_app_benchmark(llm: FakeChatModel, runs: int, concurrency: int, s3_latency_ms: float = 0.0, dynamo_latency_ms: float = 0.0) -> Dict[str, Any]:
+    """Post `runs` requests to the FastAPI app in-process with up to `concurrency` in flight."""
+    from controllers.workflow_controller import get_s3_client, get_workflow
+    from main import app
+    from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+    s3_client = InMemoryS3Client(load_fixture_objects(), latency_ms=s3_latency_ms)
+    dynamo_client = InMemoryDynamoClient(latency_ms=dynamo_latency_ms)
+    app.dependency_overrides[get_s3_client] = lambda: s3_client
+    app.dependency_overrides[get_workflow] = lambda: ResumeProcessorWorkflow(llm=llm, s3_client=s3_client, dynamo_client=dynamo_client)
+    try:
+        started = time.perf_counter()
+        outcomes = asyncio.run(_drive_app(app, runs, concurrency))
+        wall_time = time.perf_counter() - started
+    finally:
+        app.dependency_overrides.clear()
+
+    http_statuses: Dict[str, int] = {}
+    for outcome in outcomes:
+        http_statuses[str(outcome['http_status'])] = http_statuses.get(str(outcome['http_status']), 0) + 1
+
+    return {
+        **summarize([outcome['latency'] for outcome in outcomes], wall_time),
+        'runs': runs,
+        'wall_time_s': wall_time,
+        'http_statuses': http_statuses,
+        'llm': llm.stats,
+        's3_calls': s3_client.calls,
+        'dynamo_calls': dynamo_client.calls,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=SRC_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def save_results(results: Dict[str, Any], path: Optional[str] = None) -> str:
+    """Write benchmark results as JSON, by default under benchmarks/results/<timestamp>-<commit>.json."""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        path = os.path.join(RESULTS_DIR, f"{stamp}-{results.get('commit') or 'nocommit'}.json")
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, float]:
+    """Relative change (current vs baseline) of throughput and latency percentiles."""
+    deltas = {}
+    for metric in ('throughput_per_s', 'p50_ms', 'p95_ms', 'p99_ms'):
+        before = baseline['results'].get(metric)
+        after = current['results'].get(metric)
+        if before:
+            deltas[metric] = (after - before) / before
+    return deltas
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Resume processor throughput benchmark")
+    parser.add_argument('--target', choices=['workflow', 'app'], default='workflow')
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0)
+    parser.add_argument('--llm-jitter-ms', type=float, default=0.0)
+    parser.add_argument('--llm-ms-per-token', type=float, default=0.0)
+    parser.add_argument('--llm-output-tokens', type=int, default=600)
+    parser.add_argument('--s3-latency-ms', type=float, default=0.0)
+    parser.add_argument('--dynamo-latency-ms', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--state-mode', choices=['full', 'slim'], help="Overrides WORKFLOW_STATE_MODE for the run")
+    parser.add_argument('--evaluation-mode', choices=['two_call', 'combined'], help="Overrides EVALUATION_MODE for the run")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument('--compare', help="Previous results file to compare against")
+    args = parser.parse_args(argv)
+
+    if args.state_mode:
+        os.environ['WORKFLOW_STATE_MODE'] = args.state_mode
+    if args.evaluation_mode:
+        os.environ['EVALUATION_MODE'] = args.evaluation_mode
+
+    llm = FakeChatModel(
+        latency_ms=args.llm_latency_ms,
+        jitter_ms=args.llm_jitter_ms,
+        ms_per_output_token=args.llm_ms_per_token,
+        output_tokens=args.llm_output_tokens,
+        seed=args.seed
+    )
+    runner = run_app_benchmark if args.target == 'app' else run_workflow_benchmark
+    results = runner(llm, args.runs, args.concurrency, args.s3_latency_ms, args.dynamo_latency_ms)
+
+    report = {
+        'commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'config': vars(args),
+        'results': results,
+    }
+    path = save_results(report, args.output)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for metric, delta in compare_results(baseline, report).items():
+            print(f"{metric}: {delta:+.1%} vs {args.compare}")
+
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from utils.lifecycle import get_lifecycle
+from utils.responses import ORJSONResponse
+
+router = APIRouter()
+
+@router.get("/health/live", response_class=ORJSONResponse)
+async def liveness() -> dict:
+    """Report that the process answers; a failing probe means it should be restarted."""
+    return {'status': 'alive'}
+
+@router.get("/health/ready", response_class=ORJSONResponse)
+async def readiness() -> ORJSONResponse:
+    """Report whether the process takes traffic: 503 until it has warmed up and once it is draining."""
+    lifecycle = get_lifecycle()
+    snapshot = lifecycle.snapshot()
+    return ORJSONResponse(status_code=200 if lifecycle.ready else 503, content=snapshot)
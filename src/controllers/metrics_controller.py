@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from utils.metrics import collect_metrics
+from utils.responses import ORJSONResponse
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=ORJSONResponse)
+async def get_metrics() -> dict:
+    """Return a snapshot of the in-process metrics (LLM HTTP pool, etc.)."""
+    return collect_metrics()
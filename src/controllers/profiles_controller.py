@@ -0,0 +1,24 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+from utils.profiling import get_profile_path, list_profiles
+from utils.responses import ORJSONResponse
+
+router = APIRouter()
+
+@router.get("/profiles", response_class=ORJSONResponse)
+async def get_profiles(
+    job_id: Optional[str] = Query(None, description="Only list profiles of this job"),
+    candidate_id: Optional[str] = Query(None, description="Only list profiles of this candidate")
+) -> dict:
+    """List the saved run profiles, newest first."""
+    return {'profiles': list_profiles(job_id, candidate_id)}
+
+@router.get("/profiles/{job_id}/{candidate_id}/{name}")
+async def download_profile(job_id: str, candidate_id: str, name: str) -> FileResponse:
+    """Download one profile file (`.folded` collapsed stacks or `.json` summary)."""
+    path = get_profile_path(job_id, candidate_id, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile {job_id}/{candidate_id}/{name} not found")
+    media_type = 'application/json' if name.endswith('.json') else 'text/plain'
+    return FileResponse(path, media_type=media_type, filename=name)
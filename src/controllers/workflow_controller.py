@@ -1,58 +1,413 @@
-from fastapi import APIRouter, HTTPException
+import math
+import threading
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from models.workflow_request import WorkflowRequest
-from models.workflow_response import WorkflowResponse
-from workflows.resume_processor.workflow import ResumeProcessorWorkflow
-from services.workflow_service import WorkflowService
-from utils.logger import get_logger
+from models.workflow_response import (
+    WorkflowResponse,
+    DEFAULT_RESPONSE_FIELDS,
+    ALL_RESPONSE_FIELDS,
+    EXPLAIN_RESPONSE_FIELDS,
+    REEVALUATE_RESPONSE_FIELDS
+)
+from models.candidate_results_request import CandidateResultsRequest
+from models.candidate_results_response import CandidateResultsResponse, CANDIDATE_RESULT_FIELDS
+from utils.s3_client import S3Client
+from utils.dynamo_client import DynamoClient
+from utils.responses import ORJSONResponse
+from utils.circuit_breaker import CircuitOpenError
+from utils.admission import AdmissionController, AdmissionRejected, get_admission_controller
+from utils.deadline import DeadlineExceeded, deadline_from_timeout, deadline_scope
+from utils.profiling import RunProfiler, should_profile
+from utils.tracing import start_trace
+from utils.logger import get_logger, Payload
 
 router = APIRouter()
 
 logger = get_logger(__name__)
 
-@router.post("/workflows/resume_processor/run", response_model=WorkflowResponse)
-async def run_workflow(request: WorkflowRequest) -> WorkflowResponse:
-    try:
-        # log the request
-        logger.info(f"Received workflow request: {request}")
+_shared: Dict[str, Any] = {}
+_shared_lock = threading.Lock()
+
+def _shared_instance(name: str, factory: Callable[[], Any]) -> Any:
+    """Build the process-shared instance `name` on first use."""
+    with _shared_lock:
+        if name not in _shared:
+            _shared[name] = factory()
+        return _shared[name]
+
+def get_workflow():
+    """Return the process-shared workflow, compiled on first use. Overridable via app.dependency_overrides."""
+    # The workflow stack (langgraph, langchain) is imported on the first
+    # request (or at warm-up) rather than when the app module is loaded, to keep startup fast
+    from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+    s3_client = get_s3_client()
+    return _shared_instance('workflow', lambda: ResumeProcessorWorkflow(s3_client=s3_client))
+
+def get_s3_client() -> S3Client:
+    """Return the process-shared S3 client used to fetch workflow inputs. Overridable via app.dependency_overrides."""
+    return _shared_instance('s3_client', S3Client)
+
+def get_dynamo_client() -> DynamoClient:
+    """Build the DynamoDB client used to read candidate results. Overridable via app.dependency_overrides."""
+    # Not shared: boto3 resources are not thread-safe, unlike the S3 client
+    return DynamoClient()
+
+def retry_after_headers(seconds: Optional[float]) -> Dict[str, str]:
+    """Retry-After header for a request rejected because of load or an unavailable dependency."""
+    return {'Retry-After': str(max(1, math.ceil(seconds or 1)))}
+
+def workflow_response(
+    status_code: int,
+    description: str,
+    data: Dict[str, Any],
+    error_message: Optional[str] = None,
+    http_status: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> ORJSONResponse:
+    """
+    Render a WorkflowResponse body straight to JSON.
 
-        # build the state for workflow & initialize the workflow
-        state = WorkflowService.build_state(request)
+    Returned as a Response, so FastAPI neither validates nor re-encodes the
+    (possibly full) state through the response model before it is rendered.
+    """
+    return ORJSONResponse(
+        content={'status_code': status_code, 'description': description, 'error_message': error_message, 'data': data},
+        status_code=http_status,
+        headers=headers
+    )
 
-        workflow = ResumeProcessorWorkflow()
+def execute_run(
+    request: WorkflowRequest,
+    workflow,
+    s3_client: S3Client,
+    profile: bool,
+    deadline: Optional[float] = None,
+    dynamo_client: Optional[DynamoClient] = None
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Build the state for a request and run the workflow on the calling (worker) thread.
+
+    When `dynamo_client` is given the run is a re-evaluation: the results stored for
+    the candidate are loaded, and nodes whose inputs are unchanged reuse them.
+
+    Returns:
+        Tuple of the final state and the response headers identifying its profile and trace
+    """
+    from services.workflow_service import WorkflowService
+
+    headers = {}
+    profiler = RunProfiler(request.job_id, request.candidate_id) if profile else None
+    with profiler or nullcontext(), start_trace(
+        'POST /workflows/resume_processor/run', job_id=request.job_id, candidate_id=request.candidate_id
+    ) as request_span:
+        # build the state for workflow
+        state = WorkflowService.build_state(request, s3_client, deadline=deadline)
+        if dynamo_client is not None:
+            state['stored_results'] = WorkflowService.load_stored_results(request, dynamo_client)
 
         # run the workflow
         final_state = workflow.process_resume(state)
+    if profiler and profiler.profile_id:
+        headers['X-Profile-Id'] = profiler.profile_id
+    if request_span.trace_id:
+        headers['X-Trace-Id'] = request_span.trace_id
+    return final_state, headers
+
+def execute_explain(
+    request: WorkflowRequest,
+    workflow,
+    s3_client: S3Client,
+    dynamo_client: DynamoClient,
+    deadline: Optional[float] = None
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Generate the detailed analyses for the scores recorded for a candidate, on the calling (worker) thread.
+
+    Candidates whose analyses are already detailed are returned as they are; candidates
+    rejected at the JD gate have only their JD analysis explained.
+
+    Returns:
+        Tuple of the state and the response headers identifying its trace
+
+    Raises:
+        LookupError: If no scores are recorded for the candidate
+    """
+    from services.workflow_service import WorkflowService
+    from workflows.resume_processor.consts import ANALYSIS_DETAIL_FULL
+
+    headers = {}
+    with start_trace(
+        'POST /workflows/resume_processor/explain', job_id=request.job_id, candidate_id=request.candidate_id
+    ) as request_span, deadline_scope(deadline):
+        item = dynamo_client.get_item({'candidate_id': request.candidate_id, 'job_id': request.job_id})
+        if not item or item.get('jd_score') is None:
+            raise LookupError(f"No scores recorded for candidate {request.candidate_id} of job {request.job_id}")
+
+        state = WorkflowService.build_state(request, s3_client, deadline=deadline)
+        state = WorkflowService.apply_recorded_scores(state, item)
+        request_span.set_attribute('analysis_detail', state['analysis_detail'])
+        if state['analysis_detail'] != ANALYSIS_DETAIL_FULL:
+            state = workflow.explanation.explain_analyses(state)
+    if request_span.trace_id:
+        headers['X-Trace-Id'] = request_span.trace_id
+    return state, headers
+
+def parse_response_fields(fields: Optional[str], default: List[str] = DEFAULT_RESPONSE_FIELDS) -> Optional[List[str]]:
+    """
+    Parse the `fields` query parameter into the state fields to return.
+
+    Args:
+        fields: Comma-separated state fields, `*` or an empty value for the full state, or None for the default view
+        default: Fields of the default view
+
+    Returns:
+        Optional[List[str]]: Fields to return, or None for the full state
+
+    Raises:
+        HTTPException: 400 if a requested field is not part of the workflow state
+    """
+    if fields is None:
+        return default
+    if fields.strip() == ALL_RESPONSE_FIELDS:
+        return None
+
+    from workflows.resume_processor.state import ResumeProcessorState
+
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    if not requested:
+        return None
+    unknown = [field for field in requested if field not in ResumeProcessorState.__annotations__]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown response fields: {', '.join(unknown)}"
+        )
+    return requested
+
+@router.post("/workflows/resume_processor/run", response_class=ORJSONResponse, responses={200: {'model': WorkflowResponse}})
+async def run_workflow(
+    request: WorkflowRequest,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated state fields to return in `data`; `*` returns the full state. Defaults to scores and status."
+    ),
+    x_profile: Optional[str] = Header(
+        None,
+        description="Set to `true` to profile this run (requires PROFILING_ENABLED); see /profiles"
+    ),
+    workflow = Depends(get_workflow),
+    s3_client: S3Client = Depends(get_s3_client),
+    admission: AdmissionController = Depends(get_admission_controller)
+) -> ORJSONResponse:
+    return await serve_run(
+        request, parse_response_fields(fields), workflow, s3_client, admission, should_profile(x_profile)
+    )
+
+@router.post("/workflows/resume_processor/reevaluate", response_class=ORJSONResponse, responses={200: {'model': WorkflowResponse}})
+async def reevaluate_workflow(
+    request: WorkflowRequest,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated state fields to return in `data`; `*` returns the full state. Defaults to scores, status and the reused nodes."
+    ),
+    x_profile: Optional[str] = Header(
+        None,
+        description="Set to `true` to profile this run (requires PROFILING_ENABLED); see /profiles"
+    ),
+    workflow = Depends(get_workflow),
+    s3_client: S3Client = Depends(get_s3_client),
+    dynamo_client: DynamoClient = Depends(get_dynamo_client),
+    admission: AdmissionController = Depends(get_admission_controller)
+) -> ORJSONResponse:
+    """
+    Re-evaluate a candidate after the job's documents, weights or thresholds changed.
+
+    LLM nodes whose inputs (resume, the job documents they read, prompts, model)
+    are unchanged reuse the stored scores; routing and rating always run again.
+    """
+    return await serve_run(
+        request, parse_response_fields(fields, REEVALUATE_RESPONSE_FIELDS),
+        workflow, s3_client, admission, should_profile(x_profile), dynamo_client=dynamo_client
+    )
+
+async def serve_run(
+    request: WorkflowRequest,
+    response_fields: Optional[List[str]],
+    workflow,
+    s3_client: S3Client,
+    admission: AdmissionController,
+    profile: bool,
+    dynamo_client: Optional[DynamoClient] = None
+) -> ORJSONResponse:
+    """Admit a run (or a re-evaluation, with `dynamo_client`), execute it and turn its final state into a response."""
+    # Imported lazily for the same reason as in get_workflow
+    from services.workflow_service import WorkflowService
+
+    try:
+        # log the request
+        logger.info(
+            "Received workflow request for candidate %s, job %s: %s",
+            request.candidate_id, request.job_id, Payload(request),
+            extra={'job_id': request.job_id, 'candidate_id': request.candidate_id}
+        )
+
+        # The caller's time budget starts now, including any wait for admission
+        deadline = deadline_from_timeout(request.timeout_seconds)
+
+        # Runs on a worker thread once admitted, so the event loop keeps serving requests
+        final_state, run_headers = await admission.run(
+            execute_run, request, workflow, s3_client, profile, deadline, dynamo_client
+        )
+
+        # A dependency's circuit breaker was open: tell the caller to retry later
+        if final_state.get('status') == 'DEPENDENCY_UNAVAILABLE':
+            logger.error(f"Workflow stopped, dependency unavailable: {final_state.get('error_message')}")
+            return workflow_response(
+                503,
+                "Dependency unavailable, retry later",
+                WorkflowService.project_state(final_state, response_fields),
+                error_message=final_state.get('error_message'),
+                http_status=503,
+                headers={**run_headers, **retry_after_headers(final_state.get('retry_after'))}
+            )
+
+        # The run could not finish before the caller's deadline
+        if final_state.get('status') == 'DEADLINE_EXCEEDED':
+            logger.warning(f"Workflow aborted at its deadline: {final_state.get('error_message')}")
+            return workflow_response(
+                504,
+                "Deadline exceeded, workflow aborted",
+                WorkflowService.project_state(final_state, response_fields),
+                error_message=final_state.get('error_message'),
+                http_status=504,
+                headers=run_headers
+            )
 
         # Handle error cases
         if final_state.get('status') == 'FAILED' or final_state.get('error_message'):
             logger.error(f"Workflow failed: {final_state.get('error_message')}")
-            return WorkflowResponse(
-                status_code=500,
-                description="Workflow execution failed",
+            return workflow_response(
+                500,
+                "Workflow execution failed",
+                WorkflowService.project_state(final_state, response_fields),
                 error_message=final_state.get('error_message'),
-                data=final_state
+                headers=run_headers
             )
         
         # Handle rejection case (this is a valid business case, not an error)
         if final_state.get('status') == 'REJECTED':
             logger.info(f"Candidate rejected with score {final_state.get('absolute_score')}")
-            return WorkflowResponse(
-                status_code=200,
-                description="Candidate rejected - score below threshold",
-                data=final_state
+            return workflow_response(
+                200,
+                "Candidate rejected - score below threshold",
+                WorkflowService.project_state(final_state, response_fields),
+                headers=run_headers
             )
 
         # Success case
         logger.info("Workflow completed successfully")
-        return WorkflowResponse(
-            status_code=200,
-            description="Workflow execution completed successfully",
-            data=final_state
+        return workflow_response(
+            200,
+            "Workflow execution completed successfully",
+            WorkflowService.project_state(final_state, response_fields),
+            headers=run_headers
         )
         
+    except AdmissionRejected as e:
+        logger.warning(f"Workflow rejected by admission control: {e.reason}")
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers=retry_after_headers(e.retry_after)
+        )
+    except CircuitOpenError as e:
+        logger.error(f"Workflow rejected, dependency unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers=retry_after_headers(e.retry_after)
+        )
     except Exception as e:
         logger.error(f"Workflow execution failed with exception: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Workflow execution failed: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/workflows/resume_processor/explain", response_class=ORJSONResponse, responses={200: {'model': WorkflowResponse}})
+async def explain_scores(
+    request: WorkflowRequest,
+    workflow = Depends(get_workflow),
+    s3_client: S3Client = Depends(get_s3_client),
+    dynamo_client: DynamoClient = Depends(get_dynamo_client),
+    admission: AdmissionController = Depends(get_admission_controller)
+) -> ORJSONResponse:
+    """
+    Generate the detailed analyses of a candidate scored with analysis_detail 'scores'.
+
+    The recorded scores and JD verdict are kept; the detailed analyses replace the
+    score-only ones at the same jd_analysis.json and cultural_analysis.json keys.
+    Candidates rejected at the JD gate get only their JD analysis explained.
+    """
+    from services.workflow_service import WorkflowService
+
+    try:
+        logger.info(
+            "Received explain request for candidate %s, job %s",
+            request.candidate_id, request.job_id,
+            extra={'job_id': request.job_id, 'candidate_id': request.candidate_id}
+        )
+        deadline = deadline_from_timeout(request.timeout_seconds)
+        state, run_headers = await admission.run(
+            execute_explain, request, workflow, s3_client, dynamo_client, deadline
+        )
+        return workflow_response(
+            200,
+            "Detailed analyses available",
+            WorkflowService.project_state(state, EXPLAIN_RESPONSE_FIELDS),
+            headers=run_headers
+        )
+
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except AdmissionRejected as e:
+        logger.warning(f"Explain request rejected by admission control: {e.reason}")
+        raise HTTPException(status_code=429, detail=str(e), headers=retry_after_headers(e.retry_after))
+    except CircuitOpenError as e:
+        logger.error(f"Explain request failed, dependency unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers=retry_after_headers(e.retry_after))
+    except DeadlineExceeded as e:
+        logger.warning(f"Explain request aborted at its deadline: {str(e)}")
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logger.error(f"Explain request failed with exception: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Explanation failed: {str(e)}")
+
+@router.post("/workflows/resume_processor/results", response_class=ORJSONResponse, responses={200: {'model': CandidateResultsResponse}})
+async def get_candidate_results(
+    request: CandidateResultsRequest,
+    dynamo_client: DynamoClient = Depends(get_dynamo_client)
+) -> ORJSONResponse:
+    """Return scores and status for a list of candidates of a job in one call."""
+    from services.workflow_service import WorkflowService
+
+    try:
+        items = dynamo_client.batch_get_items(
+            [{'candidate_id': candidate_id, 'job_id': request.job_id} for candidate_id in request.candidate_ids],
+            projection=CANDIDATE_RESULT_FIELDS
+        )
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers=retry_after_headers(e.retry_after))
+    if items is None:
+        raise HTTPException(
+            status_code=502,
+            detail="Failed to read candidate results from DynamoDB"
+        )
+
+    return ORJSONResponse(content={
+        'status_code': 200,
+        'description': "Candidate results fetched successfully",
+        **WorkflowService.to_candidate_results(items, request.candidate_ids)
+    })
@@ -1,18 +1,65 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import os
-import uvicorn
 from controllers.workflow_controller import router as workflow_router
+from controllers.metrics_controller import router as metrics_router
+from controllers.profiles_controller import router as profiles_router
+from controllers.health_controller import router as health_router
+from utils.config import load_config
+from utils.lifecycle import get_lifecycle
 from utils.logger import get_logger
 
 # Initialize logger
 logger = get_logger(__name__)
 
+def warm_up() -> None:
+    """Build the shared clients and the compiled workflow before the process reports ready."""
+    from controllers.workflow_controller import get_dynamo_client, get_s3_client, get_workflow
+    from services.llm_client import get_chat_model
+    from utils.admission import get_admission_controller
+    from workflows.resume_processor.token_budget import count_tokens
+    get_lifecycle().warm_up({
+        'llm_client': get_chat_model,
+        's3_client': get_s3_client,
+        # Not kept, but loads boto3's DynamoDB resource model for the per-request clients
+        'dynamo_client': get_dynamo_client,
+        'workflow': get_workflow,
+        'token_encoding': lambda: count_tokens('warm-up'),
+        'admission': get_admission_controller
+    })
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load configuration and warm up before serving; drain in-flight work at shutdown."""
+    load_config()
+    warm_up()
+    get_lifecycle().mark_ready()
+    # Report draining as soon as SIGTERM arrives, while connections are still accepted
+    restore_sigterm = get_lifecycle().drain_on_sigterm()
+    yield
+    restore_sigterm()
+    get_lifecycle().mark_draining()
+    # Let admitted evaluations finish, while their LLM connections are still open
+    from utils.admission import get_admission_controller
+    get_admission_controller().shutdown()
+    # Finish saving the analyses still being written in the background
+    from utils.background import flush_background_writes
+    flush_background_writes()
+    # Close pooled LLM connections, if the shared client was ever created
+    from services.llm_client import close_http_client
+    close_http_client()
+    # Export the traces still queued
+    from utils.tracing import reset_tracer
+    reset_tracer()
+
 # Create FastAPI app
 app = FastAPI(
     title="LangGraph Multi-Agent API",
     description="API for managing LangGraph-based multi-agent workflows",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -24,10 +71,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses for clients that accept gzip
+if os.getenv('ENABLE_GZIP', 'true').lower() == 'true':
+    app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv('GZIP_MINIMUM_SIZE', 1024)))
+
 # Include routers
 app.include_router(workflow_router, prefix="/api/v1", tags=["workflows"])
+app.include_router(metrics_router, prefix="/api/v1", tags=["metrics"])
+app.include_router(profiles_router, prefix="/api/v1", tags=["profiles"])
+app.include_router(health_router, prefix="/api/v1", tags=["health"])
 
 if __name__ == "__main__":
+    # Single-process development server; run server.py in production
+    import uvicorn
+
     logger.info("Starting FastAPI application...")
     uvicorn.run(
         "main:app",  # Updated to use the correct module path
@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class CandidateResultsRequest(BaseModel):
+    job_id: str
+    candidate_ids: List[str] = Field(..., min_length=1, max_length=1000)
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+# DynamoDB attributes returned for each candidate by the bulk results endpoint
+CANDIDATE_RESULT_FIELDS = [
+    'candidate_id',
+    'job_id',
+    'status',
+    'jd_score',
+    'cultural_fit_score',
+    'uniqueness_score',
+    'custom_criteria_scores',
+    'absolute_score',
+    'verdict_comment'
+]
+
+class CandidateResult(BaseModel):
+    candidate_id: str
+    job_id: str
+    status: Optional[str] = None
+    jd_score: Optional[float] = None
+    cultural_fit_score: Optional[float] = None
+    uniqueness_score: Optional[float] = None
+    custom_criteria_scores: Optional[List[Dict[str, Any]]] = None
+    absolute_score: Optional[float] = None
+    verdict_comment: Optional[str] = None
+
+class CandidateResultsResponse(BaseModel):
+    status_code: int
+    description: str
+    results: List[CandidateResult]
+    missing_candidate_ids: List[str]
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
  
 class WorkflowRequest(BaseModel):
     job_id: str
@@ -11,4 +12,10 @@ class WorkflowRequest(BaseModel):
     weights: dict
     jd_threshold: float
     absolute_grading_error_boundary: float
-    absolute_grading_threshold: float
\ No newline at end of file
+    absolute_grading_threshold: float
+    # 'combined' scores JD match and cultural fit in one LLM call; defaults to EVALUATION_MODE
+    evaluation_mode: Optional[Literal['two_call', 'combined']] = None
+    # 'scores' skips the written explanations until they are requested; defaults to ANALYSIS_DETAIL
+    analysis_detail: Optional[Literal['full', 'scores']] = None
+    # Time budget of the caller; the run aborts with DEADLINE_EXCEEDED once it cannot finish in time
+    timeout_seconds: Optional[float] = Field(None, gt=0)
\ No newline at end of file
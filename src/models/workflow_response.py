@@ -1,5 +1,32 @@
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
+
+# State fields returned in `data` when the caller does not ask for specific fields
+DEFAULT_RESPONSE_FIELDS = [
+    'job_id',
+    'candidate_id',
+    'status',
+    'error_message',
+    'jd_score',
+    'cultural_fit_score',
+    'uniqueness_score',
+    'custom_criteria_scores',
+    'absolute_score'
+]
+
+# State fields returned by the explain endpoint
+EXPLAIN_RESPONSE_FIELDS = DEFAULT_RESPONSE_FIELDS + [
+    'analysis_detail',
+    'jd_analysis_url',
+    'cultural_analysis_url'
+]
+
+# State fields returned by default by the reevaluate endpoint
+REEVALUATE_RESPONSE_FIELDS = DEFAULT_RESPONSE_FIELDS + ['reused_nodes']
+
+# Value of the `fields` query parameter that returns the full workflow state
+ALL_RESPONSE_FIELDS = '*'
+
 class WorkflowResponse(BaseModel):
     status_code: int
     description: str
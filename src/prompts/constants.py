@@ -9,6 +9,7 @@ SCORING_RUBRIC = {
 JD_OUTPUT_FORMAT = {
     "Raw Score (out of 100)": "<integer>",
     "Normalized Score (out of 10)": "<float rounded to 1 decimal place>",
+    "Verdict": "<true or false>",
     "Score Breakdown": {
         "Required Skills Match": "<score>/45",
         "Preferred Skills Match": "<score>/20",
@@ -71,6 +72,12 @@ JD_OUTPUT_FORMAT = {
         "Suggestion 1",
         "Suggestion 2",
         "Suggestion 3"
-    ],
-    "Verdict": "<true or false>"
-} 
\ No newline at end of file
+    ]
+} 
+
+# Score-only variant of JD_OUTPUT_FORMAT for the fast analysis mode: no per-skill
+# comments, strengths or improvement bullets
+JD_SCORE_OUTPUT_FORMAT = {
+    key: JD_OUTPUT_FORMAT[key]
+    for key in ("Raw Score (out of 100)", "Normalized Score (out of 10)", "Verdict", "Score Breakdown")
+}
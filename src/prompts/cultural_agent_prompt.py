@@ -1,4 +1,4 @@
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 
 CULTURAL_AGENT_PROMPT = PromptTemplate(
 input_variables=[
@@ -82,4 +82,25 @@ Company Core Values:
 ]
 }}
 """
-    )
\ No newline at end of file
+    )
+
+# Fast analysis mode: same rules, but only the scores are returned
+CULTURAL_SCORE_PROMPT = PromptTemplate(
+    input_variables=CULTURAL_AGENT_PROMPT.input_variables,
+    template=CULTURAL_AGENT_PROMPT.template.split("## Output Format")[0] + """## Output Format (STRICT JSON):
+
+Return only the scores. Do not write any justification.
+
+{{
+"cultural_fit_score": <0-10>,
+"uniqueness_score": <0-10>,
+"custom_criteria_scores": [
+    {{
+    "name": "<criteria_name>",
+    "score": <0-10>
+    }},
+    ...
+]
+}}
+"""
+)
@@ -0,0 +1,106 @@
+"""
+Prompt templates for the cultural agent's fan-out mode.
+Each covers one part of CULTURAL_AGENT_PROMPT so the parts can run concurrently.
+"""
+from langchain_core.prompts import PromptTemplate
+
+CULTURAL_FIT_PROMPT = PromptTemplate(
+    input_variables=["resume_json", "core_values_json"],
+    template="""
+You are an expert HR and talent evaluation AI.
+
+Your task is to judge the *cultural fit* of the candidate strictly based on the explicit data in the resume. You must follow the rules below with no assumptions.
+
+Resume Data:
+{resume_json}
+
+Company Core Values:
+{core_values_json}
+
+- Carefully review the resume and the company's core values (JSON format: each with 'value' and 'description').
+- Only use explicit evidence (projects, roles, achievements, behavioral statements).
+- If a core value is only listed in skills (not demonstrated), do **not** score it as a strong match.
+- Score for each core value individually: strong match, partial match, or no match (with justification).
+- Follow this guideline for the overall cultural fit score (integer 0-10):
+
+    * 0-2: No core values matched & any anti-cultural patterns present
+    * 3-4: Weak/vague match for 1 value &/or anti-cultural signals
+    * 5-6: Strong match for 1 value OR weak matches for 2-3 values
+    * 7-8: Strong match for 2 values, some good behavioral signals & soft skills
+    * 9: Strong match for 3 values, very strong cultural alignment and soft skills
+    * 10: Strong match for 3+ values, extremely strong alignment and soft skills
+
+## Output Format (STRICT JSON):
+
+{{
+"cultural_fit_score": <0-10>,
+"cultural_fit_justification": "<text>",
+"core_value_scores": [
+    {{
+    "core_value": "<value>",
+    "score": "<no/partial/strong>",
+    "justification": "<1-2 lines why (w/ resume evidence)>"
+    }},
+    ...
+]
+}}
+"""
+)
+
+UNIQUENESS_PROMPT = PromptTemplate(
+    input_variables=["resume_json", "uniqueness_definition"],
+    template="""
+You are an expert HR and talent evaluation AI.
+
+Your task is to judge the *uniqueness* of the candidate strictly based on the explicit data in the resume.
+
+Definitions:
+- **Uniqueness** means: {uniqueness_definition}
+
+Resume Data:
+{resume_json}
+
+**Instructions:**
+- Review the resume for evidence of uniqueness as defined above.
+- Assign a score from 0 to 10 (0 = no evidence, 10 = truly outstanding/rare, 5 = some moderate uniqueness, etc)
+- Write a 2–3 line justification, citing explicit resume evidence.
+- DO NOT hallucinate or infer. Use only explicit content.
+
+## Output Format (STRICT JSON):
+
+{{
+"uniqueness_score": <0-10>,
+"uniqueness_justification": "<text>"
+}}
+"""
+)
+
+CUSTOM_CRITERION_PROMPT = PromptTemplate(
+    input_variables=["resume_json", "criterion_name", "criterion_json"],
+    template="""
+You are an expert HR and talent evaluation AI.
+
+Your task is to assess ONE custom criterion strictly based on the explicit data in the resume.
+
+Criterion name: {criterion_name}
+
+Criterion (as provided):
+{criterion_json}
+
+Resume Data:
+{resume_json}
+
+**Instructions:**
+- Assign a score from 0 to 10 (0 = no evidence, 10 = extremely strong evidence)
+- Write a 2–3 line justification citing concrete evidence. If there is no explicit evidence, assign 0 and explain.
+- DO NOT hallucinate or infer. Use only explicit content.
+
+## Output Format (STRICT JSON):
+
+{{
+"name": "<criteria_name>",
+"score": <0-10>,
+"justification": "<2-3 line reason>"
+}}
+"""
+)
@@ -0,0 +1,28 @@
+"""
+Prompt templates for explaining scores assigned in the fast analysis mode.
+Each extends the full agent prompt with the scores the explanation must keep.
+"""
+from langchain_core.prompts import PromptTemplate
+from prompts.jd_agent_prompt import JD_AGENT_PROMPT
+from prompts.cultural_agent_prompt import CULTURAL_AGENT_PROMPT
+
+ASSIGNED_SCORES_SECTION = """
+---
+
+## ASSIGNED SCORES
+
+These scores were already assigned to this candidate and are final:
+{assigned_scores}
+
+Return the complete output format above with exactly these scores, explaining each of them with evidence from the resume.
+"""
+
+JD_EXPLAIN_PROMPT = PromptTemplate(
+    input_variables=[*JD_AGENT_PROMPT.input_variables, "assigned_scores"],
+    template=JD_AGENT_PROMPT.template + ASSIGNED_SCORES_SECTION
+)
+
+CULTURAL_EXPLAIN_PROMPT = PromptTemplate(
+    input_variables=[*CULTURAL_AGENT_PROMPT.input_variables, "assigned_scores"],
+    template=CULTURAL_AGENT_PROMPT.template + ASSIGNED_SCORES_SECTION
+)
@@ -1,7 +1,7 @@
 """
 Prompt template for JD analysis agent.
 """
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 
 JD_AGENT_PROMPT = PromptTemplate(
     input_variables=["resume", "job_description", "scoring_rubric", "output_format"],
@@ -70,5 +70,6 @@ IMPORTANT:
 - Do not fabricate information.
 - Ensure total category scores match sum of sub-scores.
 - Only return clean, valid JSON. No extra text or markdown.
+- Return the fields in the order shown: the scores and the verdict come first.
 """
 )
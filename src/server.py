@@ -0,0 +1,109 @@
+"""
+Production entry point: a preforked gunicorn master running uvicorn workers.
+
+With preloading, the master imports the app and the workflow stack once and
+the workers fork from it, sharing those pages instead of each importing them.
+Each worker then runs the app's lifespan: it warms up its clients and compiled
+workflow before accepting connections. On SIGTERM it reports draining on the
+readiness endpoint and keeps serving for SERVER_DRAIN_SECONDS, then stops
+accepting, lets its in-flight evaluations finish and flushes pending uploads,
+within GRACEFUL_TIMEOUT (which should exceed SERVER_DRAIN_SECONDS).
+Admission limits (MAX_IN_FLIGHT_EVALUATIONS, ...) and the LLM connection pool
+apply per worker.
+
+`python main.py` remains the single-process development server with reload.
+
+Usage:
+    python server.py
+
+Environment variables:
+    HOST: Interface to bind (default 0.0.0.0)
+    PORT: Port to bind (default 5002)
+    WEB_CONCURRENCY: Worker processes (default: one per CPU available to the process)
+    SERVER_PRELOAD: Import the app in the master before forking the workers (default true)
+    SERVER_WORKER_CLASS: gunicorn worker class (default uvicorn_worker.UvicornWorker)
+    GRACEFUL_TIMEOUT: Seconds a stopping worker has to drain before it is killed (default 60)
+    WORKER_TIMEOUT: Seconds a silent worker is given before the master restarts it (default 120)
+    KEEPALIVE: Seconds an idle keep-alive connection is kept open (default 5)
+    MAX_REQUESTS: Requests after which a worker is replaced; 0 never replaces it (default 0)
+    MAX_REQUESTS_JITTER: Random spread added to MAX_REQUESTS, so workers are not replaced together (default 0)
+"""
+import importlib
+import os
+from typing import Any, Dict
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+APP = 'main:app'
+
+# Imported by the master when preloading, so the workers inherit them
+PRELOAD_MODULES = ['main', 'workflows.resume_processor.workflow']
+
+
+def default_workers() -> int:
+    """One worker per CPU the process may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def build_options() -> Dict[str, Any]:
+    """gunicorn settings, read from the environment."""
+    return {
+        'bind': f"{os.getenv('HOST', '0.0.0.0')}:{int(os.getenv('PORT', 5002))}",
+        'workers': int(os.getenv('WEB_CONCURRENCY', default_workers())),
+        'worker_class': os.getenv('SERVER_WORKER_CLASS', 'uvicorn_worker.UvicornWorker'),
+        'preload_app': os.getenv('SERVER_PRELOAD', 'true').lower() == 'true',
+        'graceful_timeout': int(os.getenv('GRACEFUL_TIMEOUT', 60)),
+        'timeout': int(os.getenv('WORKER_TIMEOUT', 120)),
+        'keepalive': int(os.getenv('KEEPALIVE', 5)),
+        'max_requests': int(os.getenv('MAX_REQUESTS', 0)),
+        'max_requests_jitter': int(os.getenv('MAX_REQUESTS_JITTER', 0))
+    }
+
+
+def load_app() -> Any:
+    """Import the app; with preloading, also the workflow stack the workers would import on warm-up."""
+    # Only modules: clients, pools and threads are built per worker, after the fork
+    for module in PRELOAD_MODULES:
+        importlib.import_module(module)
+    return importlib.import_module('main').app
+
+
+def run() -> None:
+    """Start the gunicorn master, or plain uvicorn workers when gunicorn is not installed."""
+    options = build_options()
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        # gunicorn does not run on every platform; uvicorn can still fork workers, without preloading
+        import uvicorn
+
+        logger.warning("gunicorn is not installed; starting uvicorn workers without preloading")
+        host, port = options['bind'].rsplit(':', 1)
+        uvicorn.run(
+            APP,
+            host=host,
+            port=int(port),
+            workers=options['workers'],
+            timeout_keep_alive=options['keepalive'],
+            timeout_graceful_shutdown=options['graceful_timeout']
+        )
+        return
+
+    class Server(BaseApplication):
+        def load_config(self) -> None:
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> Any:
+            return load_app()
+
+    logger.info(f"Starting {options['workers']} workers on {options['bind']} (preload: {options['preload_app']})")
+    Server().run()
+
+
+if __name__ == "__main__":
+    run()
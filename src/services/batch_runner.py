@@ -0,0 +1,268 @@
+"""
+Offline batch runner for screening large candidate backlogs outside the HTTP path.
+
+Streams a manifest (CSV or JSONL) of candidates, runs each row through
+ResumeProcessorWorkflow with bounded concurrency and appends one JSON line per
+candidate to the output file as soon as it finishes. The output file doubles as
+the checkpoint: rerunning with the same output skips candidates already in it.
+
+Manifest columns/keys:
+    job_id, candidate_id, resume_s3_url, jd_s3_url, core_values_s3_url,
+    uniqueness_description_s3_url, custom_criteria_s3_url
+    and optionally weights, jd_threshold, absolute_grading_error_boundary,
+    absolute_grading_threshold (JSONL only; otherwise taken from --scoring-config)
+
+Usage:
+    python -m services.batch_runner manifest.jsonl --output results.jsonl \\
+        --scoring-config scoring-weights.json --concurrency 8
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+from models.workflow_request import WorkflowRequest
+from models.workflow_response import DEFAULT_RESPONSE_FIELDS
+from utils.circuit_breaker import CircuitOpenError
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Statuses rerun by --retry-failed
+FAILED_STATUSES = {'FAILED', 'ERROR', 'DEPENDENCY_UNAVAILABLE', 'DEADLINE_EXCEEDED'}
+
+
+def iter_manifest(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream manifest rows one at a time.
+
+    Args:
+        path: Manifest path; `.csv` files are read as CSV, anything else as JSONL
+
+    Yields:
+        Dict for each manifest row
+    """
+    with open(path, newline='') as f:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def count_manifest_rows(path: str) -> int:
+    """Count manifest rows without parsing them, for progress and ETA."""
+    with open(path, 'rb') as f:
+        lines = sum(1 for line in f if line.strip())
+    return lines - 1 if path.endswith('.csv') else lines
+
+
+def load_checkpoint(output_path: str, retry_failed: bool = False) -> Set[Tuple[str, str]]:
+    """
+    Read the (job_id, candidate_id) pairs already present in the output file.
+
+    A torn last line left by a crash mid-write is truncated so appends stay valid JSONL.
+
+    Args:
+        output_path: Output JSONL path
+        retry_failed: Leave failed candidates out so they are run again
+
+    Returns:
+        Set of (job_id, candidate_id) pairs to skip
+    """
+    done: Set[Tuple[str, str]] = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, 'rb+') as f:
+        valid_length = 0
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            valid_length += len(line)
+            result = json.loads(line)
+            key = (result['job_id'], result['candidate_id'])
+            if retry_failed and result.get('status') in FAILED_STATUSES:
+                done.discard(key)
+            else:
+                done.add(key)
+        f.truncate(valid_length)
+    return done
+
+
+def build_request(row: Dict[str, Any], scoring_config: Dict[str, Any]) -> WorkflowRequest:
+    """Build a workflow request from a manifest row, filling scoring settings from the config."""
+    return WorkflowRequest(**{**scoring_config, **{key: value for key, value in row.items() if value not in (None, '')}})
+
+
+def process_row(workflow, s3_client, row: Dict[str, Any], scoring_config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one manifest row through the workflow.
+
+    Returns:
+        Result line for the output file; failures are captured as status ERROR,
+        or DEPENDENCY_UNAVAILABLE when a circuit breaker rejected the candidate
+    """
+    from services.workflow_service import WorkflowService
+
+    started = time.perf_counter()
+    try:
+        state = WorkflowService.build_state(build_request(row, scoring_config), s3_client)
+        final_state = workflow.process_resume(state)
+        result = WorkflowService.project_state(final_state, DEFAULT_RESPONSE_FIELDS)
+    except CircuitOpenError as e:
+        logger.error(f"[BatchRunner] Candidate {row.get('candidate_id')} skipped: {str(e)}")
+        result = {
+            'job_id': row.get('job_id'),
+            'candidate_id': row.get('candidate_id'),
+            'status': 'DEPENDENCY_UNAVAILABLE',
+            'error_message': str(e)
+        }
+    except Exception as e:
+        logger.error(f"[BatchRunner] Candidate {row.get('candidate_id')} failed: {str(e)}")
+        result = {
+            'job_id': row.get('job_id'),
+            'candidate_id': row.get('candidate_id'),
+            'status': 'ERROR',
+            'error_message': str(e)
+        }
+    result['duration_s'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+class ProgressReporter:
+    """Logs throughput and ETA at most once per interval."""
+
+    def __init__(self, total: int, interval: float):
+        self.total = total
+        self.interval = interval
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.completed = 0
+        self.failed = 0
+
+    def record(self, result: Dict[str, Any]) -> None:
+        self.completed += 1
+        if result.get('status') in FAILED_STATUSES:
+            self.failed += 1
+        now = time.monotonic()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report()
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        rate = self.completed / elapsed if elapsed else 0.0
+        remaining = max(self.total - self.completed, 0)
+        eta = remaining / rate if rate else None
+        logger.info(
+            f"[BatchRunner] {self.completed}/{self.total} done ({self.failed} failed), "
+            f"{rate:.2f} candidates/s, ETA {f'{eta:.0f}s' if eta is not None else 'unknown'}"
+        )
+        return {'completed': self.completed, 'failed': self.failed, 'rate_per_s': rate, 'eta_s': eta}
+
+
+def run_batch(
+    manifest_path: str,
+    output_path: str,
+    scoring_config: Optional[Dict[str, Any]] = None,
+    concurrency: int = 4,
+    retry_failed: bool = False,
+    progress_interval: float = 10.0,
+    workflow=None,
+    s3_client=None
+) -> Dict[str, Any]:
+    """
+    Run every manifest row not yet in the output file through the workflow.
+
+    Args:
+        manifest_path: CSV or JSONL manifest
+        output_path: JSONL file results are appended to; also the checkpoint
+        scoring_config: Default weights/thresholds for rows that do not carry their own
+        concurrency: Maximum candidates processed at once
+        retry_failed: Rerun candidates whose previous result was FAILED, ERROR, DEPENDENCY_UNAVAILABLE or DEADLINE_EXCEEDED
+        progress_interval: Seconds between progress log lines
+        workflow: Workflow to use; a ResumeProcessorWorkflow is built when omitted
+        s3_client: S3 client shared by all rows; a new S3Client is built when omitted
+
+    Returns:
+        Dict with final progress counters and the number of skipped rows
+    """
+    if workflow is None:
+        from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+        workflow = ResumeProcessorWorkflow()
+    if s3_client is None:
+        from utils.s3_client import S3Client
+        s3_client = S3Client()
+
+    scoring_config = scoring_config or {}
+    done = load_checkpoint(output_path, retry_failed)
+    total = count_manifest_rows(manifest_path)
+    progress = ProgressReporter(total - len(done), progress_interval)
+    skipped = 0
+    logger.info(f"[BatchRunner] {total} rows in manifest, {len(done)} already done, concurrency {concurrency}")
+
+    in_flight: Set[Future] = set()
+    with open(output_path, 'a') as output, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        def drain(return_when) -> None:
+            finished, pending = wait(in_flight, return_when=return_when)
+            for future in finished:
+                result = future.result()
+                output.write(json.dumps(result, default=str) + '\n')
+                progress.record(result)
+            # Flush so a crash never loses results that were reported as done
+            output.flush()
+            in_flight.intersection_update(pending)
+
+        for row in iter_manifest(manifest_path):
+            if (row['job_id'], row['candidate_id']) in done:
+                skipped += 1
+                continue
+            # Keep the backlog of submitted rows bounded instead of reading the whole manifest
+            if len(in_flight) >= concurrency * 2:
+                drain(FIRST_COMPLETED)
+            in_flight.add(executor.submit(process_row, workflow, s3_client, row, scoring_config))
+
+        while in_flight:
+            drain(FIRST_COMPLETED)
+
+    # Analyses still being saved in the background (see JD_STREAMING)
+    from utils.background import get_background_writer
+    get_background_writer().flush()
+
+    summary = progress.report()
+    summary['skipped'] = skipped
+    return summary
+
+
+def main(argv=None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Run the resume processor over a manifest of candidates")
+    parser.add_argument('manifest', help="CSV or JSONL manifest of candidates")
+    parser.add_argument('--output', required=True, help="JSONL results file; rerunning resumes from it")
+    parser.add_argument('--scoring-config', help="JSON file with weights and thresholds (scoring-weights.json format)")
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv('BATCH_CONCURRENCY', 4)))
+    parser.add_argument('--retry-failed', action='store_true', help="Rerun candidates that previously failed")
+    parser.add_argument('--progress-interval', type=float, default=10.0, help="Seconds between progress reports")
+    args = parser.parse_args(argv)
+
+    scoring_config = {}
+    if args.scoring_config:
+        with open(args.scoring_config) as f:
+            scoring_config = json.load(f)
+
+    return run_batch(
+        args.manifest,
+        args.output,
+        scoring_config=scoring_config,
+        concurrency=args.concurrency,
+        retry_failed=args.retry_failed,
+        progress_interval=args.progress_interval
+    )
+
+
+if __name__ == '__main__':
+    main()
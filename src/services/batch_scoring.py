@@ -0,0 +1,543 @@
+"""
+Deferred scoring of candidate backlogs through a provider batch API.
+
+Backlogs that can wait for the provider's completion window (24h) are cheaper to
+score through its batch API than with real-time calls. The JD_AGENT_PROMPT and
+CULTURAL_AGENT_PROMPT requests of every candidate are rendered into batch input
+files and submitted. The result files are then ingested through the agents' own
+parsing and record_analysis, the router and the absolute rating, so each
+candidate ends with the same S3 analyses and DynamoDB item as a live run.
+
+As in the live graph there are two stages: the JD analyses of every candidate,
+then the cultural analyses of the candidates the router approved. Progress is
+kept in a work directory, so `advance` can be called again (e.g. from cron)
+until the run is done:
+
+    job.json                    settings and submitted batches
+    <stage>.<n>.requests.jsonl  batch input files
+    <stage>.<n>.output.jsonl    downloaded result files
+    approved.jsonl              JD scores of the candidates waiting for the cultural stage
+    results.jsonl               one line per candidate, in the batch runner's output format
+
+Batched runs always use the two-call evaluation with full analyses; the
+fan-out, streaming, combined and fast modes only apply to live runs.
+
+The transport is pluggable: OpenAIBatchTransport uses the OpenAI Batch API, and
+LocalBatchTransport runs the requests with a chat model and writes result files
+in the same format, to run the whole pipeline offline.
+
+Usage:
+    python -m services.batch_scoring submit manifest.jsonl --work-dir runs/backlog \\
+        --scoring-config scoring-weights.json
+    python -m services.batch_scoring advance --work-dir runs/backlog --wait
+
+Environment variables:
+    BATCH_TRANSPORT: 'openai' or 'local' (default openai)
+    BATCH_LOCAL_DIR: Directory the local transport keeps its batches in (default batches)
+    BATCH_MAX_REQUESTS: Requests per batch input file (default 50000, the OpenAI limit)
+    BATCH_COMPLETION_WINDOW: Completion window requested for OpenAI batches (default 24h)
+    BATCH_POLL_INTERVAL: Seconds between status checks with --wait (default 60)
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models.workflow_response import DEFAULT_RESPONSE_FIELDS
+from services.batch_runner import build_request, iter_manifest
+from utils.circuit_breaker import CircuitOpenError
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ENDPOINT = '/v1/chat/completions'
+
+STAGE_JD = 'jd_analysis'
+STAGE_CULTURAL = 'cultural_agent'
+STAGES = (STAGE_JD, STAGE_CULTURAL)
+
+# Batch statuses after which the batch will not make progress
+FINISHED_BATCH_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+# Result fields carried from the JD stage to the cultural one
+APPROVED_FIELDS = ['job_id', 'candidate_id', 'jd_score', 'jd_analysis_url']
+
+# Roles of LangChain message types in chat completion requests
+MESSAGE_ROLES = {'system': 'system', 'human': 'user', 'ai': 'assistant'}
+
+
+class OpenAIBatchTransport:
+    """Submits batch input files to the OpenAI Batch API."""
+
+    def __init__(self, client=None, completion_window: Optional[str] = None):
+        if client is None:
+            from utils.config import load_config
+            load_config()
+            # The SDK is only needed by batch runs, so import it on first use
+            from openai import OpenAI
+            client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.client = client
+        self.completion_window = completion_window or os.getenv('BATCH_COMPLETION_WINDOW', '24h')
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, 'rb') as f:
+            uploaded = self.client.files.create(file=f, purpose='batch')
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=ENDPOINT,
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def download(self, batch_id: str, output_path: str) -> bool:
+        batch = self.client.batches.retrieve(batch_id)
+        # Requests that failed are reported in a separate error file, in the same line format
+        file_ids = [file_id for file_id in (batch.output_file_id, batch.error_file_id) if file_id]
+        if not file_ids:
+            return False
+        with open(output_path, 'w', encoding='utf-8') as output:
+            for file_id in file_ids:
+                text = self.client.files.content(file_id).text
+                output.write(text if text.endswith('\n') else text + '\n')
+        return True
+
+
+class LocalBatchTransport:
+    """Runs batch input files with a chat model and writes OpenAI-format result files, for offline runs and tests."""
+
+    def __init__(self, directory: str, llm=None):
+        self.directory = directory
+        self.llm = llm
+        os.makedirs(directory, exist_ok=True)
+
+    def _output_path(self, batch_id: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.output.jsonl")
+
+    def submit(self, input_path: str) -> str:
+        if self.llm is None:
+            from services.llm_client import get_chat_model
+            self.llm = get_chat_model()
+        batch_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        with open(input_path, encoding='utf-8') as requests, open(self._output_path(batch_id), 'w', encoding='utf-8') as output:
+            for line in requests:
+                if line.strip():
+                    output.write(json.dumps(self._run(json.loads(line))) + '\n')
+        return batch_id
+
+    def _run(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        result = {'id': f"local_req_{uuid.uuid4().hex[:12]}", 'custom_id': request['custom_id'], 'response': None, 'error': None}
+        try:
+            message = self.llm.invoke([(message['role'], message['content']) for message in request['body']['messages']])
+        except Exception as e:
+            result['error'] = {'code': type(e).__name__, 'message': str(e)}
+            return result
+        result['response'] = {
+            'status_code': 200,
+            'body': {'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': message.content}}]}
+        }
+        return result
+
+    def status(self, batch_id: str) -> str:
+        return 'completed' if os.path.exists(self._output_path(batch_id)) else 'failed'
+
+    def download(self, batch_id: str, output_path: str) -> bool:
+        if not os.path.exists(self._output_path(batch_id)):
+            return False
+        shutil.copyfile(self._output_path(batch_id), output_path)
+        return True
+
+
+def build_transport(kind: Optional[str] = None):
+    """Transport named by `kind`, defaulting to BATCH_TRANSPORT."""
+    kind = (kind or os.getenv('BATCH_TRANSPORT', 'openai')).lower()
+    if kind == 'openai':
+        return OpenAIBatchTransport()
+    if kind == 'local':
+        return LocalBatchTransport(os.getenv('BATCH_LOCAL_DIR', 'batches'))
+    raise ValueError(f"Unknown batch transport '{kind}'")
+
+
+def response_content(result: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Completion text of one line of a batch result file.
+
+    Returns:
+        Tuple of the content, or None, and the error message, or None
+    """
+    response = result.get('response') or {}
+    if result.get('error') or response.get('status_code') != 200:
+        error = result.get('error') or (response.get('body') or {}).get('error') or {}
+        return None, error.get('message') or f"Request failed with status {response.get('status_code')}"
+    try:
+        return response['body']['choices'][0]['message']['content'], None
+    except (KeyError, IndexError, TypeError):
+        return None, "No completion in the batch result"
+
+
+def _read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class BatchScoringJob:
+    """A batched scoring run, kept in a work directory between calls."""
+
+    def __init__(self, work_dir: str, transport, s3_client=None, dynamo_client=None):
+        """
+        Args:
+            work_dir: Directory holding the run's files
+            transport: Transport submitting the batch files (OpenAIBatchTransport, LocalBatchTransport, ...)
+            s3_client: S3 client for the inputs and analyses; a new one is created when omitted
+            dynamo_client: DynamoDB client for the results; the nodes create their own when omitted
+        """
+        from workflows.resume_processor.nodes.jd_analysis_agent import JDAnalysisAgent
+        from workflows.resume_processor.nodes.cultural_agent import CulturalAgent
+        from workflows.resume_processor.nodes.router import RouterNode
+        from workflows.resume_processor.nodes.absolute_rating import AbsoluteRatingNode
+
+        if s3_client is None:
+            from utils.s3_client import S3Client
+            s3_client = S3Client()
+        self.work_dir = work_dir
+        self.transport = transport
+        self.s3_client = s3_client
+        # Only their parsing and persistence is used: the LLM calls are batched
+        self.jd_agent = JDAnalysisAgent(None, s3_client, dynamo_client, streaming=False)
+        self.cultural_agent = CulturalAgent(None, s3_client, dynamo_client, fanout=False)
+        self.router = RouterNode(dynamo_client)
+        self.absolute_rating = AbsoluteRatingNode(dynamo_client)
+        self._rows: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.work_dir, name)
+
+    def load_job(self) -> Dict[str, Any]:
+        with open(self._path('job.json')) as f:
+            return json.load(f)
+
+    def _save_job(self, job: Dict[str, Any]) -> None:
+        # Replaced atomically so an interrupted save never loses the submitted batch ids
+        tmp_path = self._path('job.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(job, f, indent=2)
+        os.replace(tmp_path, self._path('job.json'))
+
+    def _manifest_rows(self, job: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        if self._rows is None:
+            self._rows = {f"{row['job_id']}/{row['candidate_id']}": row for row in iter_manifest(job['manifest'])}
+        return self._rows
+
+    def _build_state(self, row: Dict[str, Any], scoring_config: Dict[str, Any]) -> Tuple[Dict[str, Any], str, Dict[str, Any]]:
+        """Workflow state of a manifest row, with the resume and job documents the prompts are rendered from."""
+        from services.workflow_service import WorkflowService
+        from workflows.resume_processor.consts import ANALYSIS_DETAIL_FULL, EVALUATION_MODE_TWO_CALL
+        from workflows.resume_processor.fingerprints import get_fingerprints
+        from workflows.resume_processor.job_context import get_job_documents
+        from workflows.resume_processor.token_budget import get_budgeted_resume
+
+        request = build_request(row, scoring_config).model_copy(update={
+            'evaluation_mode': EVALUATION_MODE_TWO_CALL,
+            'analysis_detail': ANALYSIS_DETAIL_FULL,
+            'timeout_seconds': None
+        })
+        state = WorkflowService.build_state(request, self.s3_client)
+        state['deadline'] = None
+        job_documents = get_job_documents(state, self.s3_client)
+        resume, truncation = get_budgeted_resume(state, job_documents)
+        if truncation:
+            state['resume_truncation'] = truncation
+        get_fingerprints(state)
+        return state, resume, job_documents
+
+    def _render(self, stage: str, custom_id: str, resume: str, job_documents: Dict[str, Any]) -> Dict[str, Any]:
+        """Batch request of a stage's prompt, as the agent would send it live."""
+        from services.llm_client import get_model_parameters
+
+        if stage == STAGE_JD:
+            prompt, prompt_input = self.jd_agent.prompt, self.jd_agent.build_prompt_input(resume, job_documents)
+        else:
+            prompt, prompt_input = self.cultural_agent.prompt, self.cultural_agent.build_prompt_input(resume, job_documents)
+        messages = prompt.format_prompt(**prompt_input).to_messages()
+        return {
+            'custom_id': custom_id,
+            'method': 'POST',
+            'url': ENDPOINT,
+            'body': {
+                **get_model_parameters(),
+                'messages': [{'role': MESSAGE_ROLES[message.type], 'content': message.content} for message in messages]
+            }
+        }
+
+    def submit(self, manifest_path: str, scoring_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Render the JD requests of every manifest row and submit them.
+
+        Args:
+            manifest_path: CSV or JSONL manifest, as for the batch runner
+            scoring_config: Default weights/thresholds for rows that do not carry their own
+
+        Returns:
+            Dict[str, Any]: Progress of the run, as advance() reports it
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+        if os.path.exists(self._path('job.json')):
+            raise FileExistsError(f"{self.work_dir} already holds a batch scoring run")
+        job = {
+            'manifest': os.path.abspath(manifest_path),
+            'scoring_config': scoring_config or {},
+            'stages': {},
+            'status': STAGE_JD
+        }
+        self._render_stage(job, STAGE_JD, self._manifest_rows(job).values())
+        self._submit_batches(job, STAGE_JD)
+        return self.progress(job)
+
+    def _render_stage(self, job: Dict[str, Any], stage: str, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        Render the stage's requests into batch files of at most BATCH_MAX_REQUESTS lines.
+
+        The files are recorded in job.json, and the stage made current, only once all
+        of them are written, so an interrupted rendering is simply started over.
+        """
+        max_requests = int(os.getenv('BATCH_MAX_REQUESTS', 50000))
+        batches: List[Dict[str, Any]] = []
+        errors: List[Dict[str, Any]] = []
+        requests = None
+        try:
+            for row in rows:
+                custom_id = f"{row['job_id']}/{row['candidate_id']}"
+                try:
+                    _, resume, job_documents = self._build_state(self._manifest_rows(job)[custom_id], job['scoring_config'])
+                    request = self._render(stage, custom_id, resume, job_documents)
+                except Exception as e:
+                    logger.error(f"[BatchScoring] Could not render the {stage} request of {custom_id}: {str(e)}")
+                    errors.append(self._error_result(row, e))
+                    continue
+                if requests is None or batches[-1]['requests'] == max_requests:
+                    if requests is not None:
+                        requests.close()
+                    batches.append({'input': f"{stage}.{len(batches)}.requests.jsonl", 'requests': 0, 'status': 'rendered'})
+                    requests = open(self._path(batches[-1]['input']), 'w', encoding='utf-8')
+                requests.write(json.dumps(request) + '\n')
+                batches[-1]['requests'] += 1
+        finally:
+            if requests is not None:
+                requests.close()
+        for error in errors:
+            self._write_result(error)
+        job['stages'][stage] = {'batches': batches}
+        job['status'] = stage
+        self._save_job(job)
+
+    def _submit_batches(self, job: Dict[str, Any], stage: str) -> None:
+        """Submit the stage's batches not submitted yet; after a failed submission, advance() submits the rest."""
+        for batch in job['stages'][stage]['batches']:
+            if 'id' in batch:
+                continue
+            batch['id'] = self.transport.submit(self._path(batch['input']))
+            batch['status'] = 'submitted'
+            logger.info(f"[BatchScoring] Submitted batch {batch['id']} with {batch['requests']} requests")
+            self._save_job(job)
+
+    def advance(self) -> Dict[str, Any]:
+        """
+        Ingest the batches that finished and submit the next stage once the current one is done.
+
+        Returns:
+            Dict[str, Any]: Progress of the run; its status is 'done' once every stage is ingested
+        """
+        job = self.load_job()
+        for stage in STAGES:
+            if job['status'] != stage:
+                continue
+            self._submit_batches(job, stage)
+            for batch in job['stages'][stage]['batches']:
+                if batch['status'] == 'ingested':
+                    continue
+                status = self.transport.status(batch['id'])
+                if status not in FINISHED_BATCH_STATUSES:
+                    batch['status'] = status
+                    continue
+                self._ingest_batch(job, stage, batch, status)
+                batch['status'] = 'ingested'
+                batch['batch_status'] = status
+                self._save_job(job)
+            if any(batch['status'] != 'ingested' for batch in job['stages'][stage]['batches']):
+                break
+            if stage == STAGE_JD:
+                # Submitted on the next pass of the loop
+                self._render_stage(job, STAGE_CULTURAL, _read_jsonl(self._path('approved.jsonl')))
+            else:
+                job['status'] = 'done'
+                self._save_job(job)
+        self._save_job(job)
+        return self.progress(job)
+
+    def wait(self, poll_interval: Optional[float] = None) -> Dict[str, Any]:
+        """Advance the run until it is done."""
+        poll_interval = poll_interval if poll_interval is not None else float(os.getenv('BATCH_POLL_INTERVAL', 60))
+        progress = self.advance()
+        while progress['status'] != 'done':
+            logger.info(f"[BatchScoring] Waiting for batches: {progress['stages']}")
+            time.sleep(poll_interval)
+            progress = self.advance()
+        return progress
+
+    def _ingest_batch(self, job: Dict[str, Any], stage: str, batch: Dict[str, Any], status: str) -> None:
+        """Apply the results of a finished batch; requests it returned no result for are recorded as errors."""
+        output_path = self._path(batch['input'].replace('.requests.', '.output.'))
+        if not self.transport.download(batch['id'], output_path):
+            logger.warning(f"[BatchScoring] Batch {batch['id']} ended {status} without results")
+        results = {result['custom_id']: result for result in _read_jsonl(output_path)}
+        approved = {f"{line['job_id']}/{line['candidate_id']}": line for line in _read_jsonl(self._path('approved.jsonl'))}
+        # An interrupted ingestion is resumed without applying a result twice
+        done = {f"{line['job_id']}/{line['candidate_id']}" for line in _read_jsonl(self._path('results.jsonl'))}
+        if stage == STAGE_JD:
+            done.update(approved)
+        rows = self._manifest_rows(job)
+        for request in _read_jsonl(self._path(batch['input'])):
+            custom_id = request['custom_id']
+            if custom_id in done:
+                continue
+            result = results.get(custom_id)
+            if result is None:
+                self._write_result(self._error_result(rows[custom_id], f"No result in batch {batch['id']} ({status})"))
+                continue
+            self._ingest_result(job, stage, rows[custom_id], result, approved.get(custom_id))
+        logger.info(f"[BatchScoring] Ingested {len(results)} {stage} results of batch {batch['id']}")
+
+    def _ingest_result(
+        self,
+        job: Dict[str, Any],
+        stage: str,
+        row: Dict[str, Any],
+        result: Dict[str, Any],
+        approved: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Apply one batch result to its candidate.
+
+        Args:
+            job: The run's settings
+            stage: Stage the result belongs to
+            row: The candidate's manifest row
+            result: Line of the batch result file
+            approved: For the cultural stage, the candidate's line in approved.jsonl
+        """
+        content, error = response_content(result)
+        if error:
+            self._write_result(self._error_result(row, error))
+            return
+        try:
+            state, _, _ = self._build_state(row, job['scoring_config'])
+            if stage == STAGE_JD:
+                state = self._apply_jd_analysis(state, content)
+                if state['next_node'] == 'cultural_agent':
+                    self._append('approved.jsonl', {field: state.get(field) for field in APPROVED_FIELDS})
+                    return
+            else:
+                state.update(approved)
+                state = self._apply_cultural_analysis(state, content)
+        except Exception as e:
+            logger.error(f"[BatchScoring] Candidate {row.get('candidate_id')} failed: {str(e)}")
+            self._write_result(self._error_result(row, e))
+            return
+        self._write_result(self._final_result(state))
+
+    def _apply_jd_analysis(self, state: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """Record a JD analysis and route on it, as the jd_analysis and router nodes do."""
+        state = self.jd_agent.record_analysis(state, self.jd_agent._parse_analysis_result(content))
+        if state['next_node'] == 'end':
+            return state
+        return self.router.route(state)
+
+    def _apply_cultural_analysis(self, state: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """Record a cultural analysis and rate the candidate, as the cultural_agent and absolute_rating nodes do."""
+        try:
+            analysis_data = self.cultural_agent._parse_analysis_result(content)
+        except Exception as e:
+            state['error_message'] = f"[Cultural Agent] Failed to parse cultural analysis result: {str(e)}"
+            state['status'] = 'FAILED'
+            state['next_node'] = 'end'
+            return state
+        state = self.cultural_agent.record_analysis(state, analysis_data)
+        if state['next_node'] == 'end':
+            return state
+        return self.absolute_rating.compute_rating(state)
+
+    @staticmethod
+    def _final_result(state: Dict[str, Any]) -> Dict[str, Any]:
+        from services.workflow_service import WorkflowService
+        from workflows.resume_processor.state import final_status
+
+        # As ResumeProcessorWorkflow.process_resume reports a finished run
+        state['status'] = final_status(state)
+        return WorkflowService.project_state(state, DEFAULT_RESPONSE_FIELDS)
+
+    @staticmethod
+    def _error_result(row: Dict[str, Any], error: Any) -> Dict[str, Any]:
+        return {
+            'job_id': row.get('job_id'),
+            'candidate_id': row.get('candidate_id'),
+            'status': 'DEPENDENCY_UNAVAILABLE' if isinstance(error, CircuitOpenError) else 'ERROR',
+            'error_message': str(error)
+        }
+
+    def _write_result(self, result: Dict[str, Any]) -> None:
+        self._append('results.jsonl', result)
+
+    def _append(self, name: str, line: Dict[str, Any]) -> None:
+        with open(self._path(name), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(line, default=str) + '\n')
+
+    def progress(self, job: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        job = job or self.load_job()
+        return {
+            'status': job['status'],
+            'stages': {
+                stage: {
+                    'batches': len(info['batches']),
+                    'requests': sum(batch['requests'] for batch in info['batches']),
+                    'pending': sum(batch.get('status') != 'ingested' for batch in info['batches'])
+                }
+                for stage, info in job['stages'].items()
+            },
+            'results': sum(1 for _ in _read_jsonl(self._path('results.jsonl')))
+        }
+
+
+def main(argv=None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Score a manifest of candidates through a provider batch API")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    submit = subparsers.add_parser('submit', help="Render and submit the JD requests of a manifest")
+    submit.add_argument('manifest', help="CSV or JSONL manifest of candidates")
+    submit.add_argument('--scoring-config', help="JSON file with weights and thresholds (scoring-weights.json format)")
+    advance = subparsers.add_parser('advance', help="Ingest finished batches and submit the next stage")
+    advance.add_argument('--wait', action='store_true', help="Keep polling until every stage is ingested")
+    for subparser in (submit, advance):
+        subparser.add_argument('--work-dir', required=True, help="Directory holding the run's files")
+        subparser.add_argument('--transport', choices=['openai', 'local'], help="Defaults to BATCH_TRANSPORT")
+    args = parser.parse_args(argv)
+
+    job = BatchScoringJob(args.work_dir, build_transport(args.transport))
+    if args.command == 'submit':
+        scoring_config = {}
+        if args.scoring_config:
+            with open(args.scoring_config) as f:
+                scoring_config = json.load(f)
+        return job.submit(args.manifest, scoring_config)
+    return job.wait() if args.wait else job.advance()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Process-shared LLM client with a tuned HTTP transport.
+
+Every workflow in the process talks to the LLM provider through one httpx
+connection pool, so TLS handshakes are paid once per pooled connection instead
+of once per candidate evaluation.
+
+Environment variables:
+    LLM_MODEL_NAME: Chat model name (default gpt-4o-mini)
+    LLM_HTTP2: Use HTTP/2 when the `h2` package is installed (default true)
+    LLM_HTTP_MAX_CONNECTIONS: Maximum open connections (default 64)
+    LLM_HTTP_MAX_KEEPALIVE: Maximum idle keep-alive connections (default 32)
+    LLM_HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept (default 60)
+    LLM_HTTP_CONNECT_TIMEOUT: Connect timeout in seconds (default 5)
+    LLM_HTTP_READ_TIMEOUT: Read timeout in seconds (default 60)
+    LLM_HTTP_WRITE_TIMEOUT: Write timeout in seconds (default 10)
+    LLM_HTTP_POOL_TIMEOUT: Seconds to wait for a free pooled connection (default 10)
+"""
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+import httpx
+
+from utils.config import load_config
+from utils.metrics import register_metrics
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+logger = logging.getLogger(__name__)
+
+_http_client: Optional[httpx.Client] = None
+_transport: Optional["InstrumentedTransport"] = None
+_chat_model: Optional["ChatOpenAI"] = None
+_lock = threading.Lock()
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """HTTP transport wrapper that counts requests and pooled connections."""
+
+    def __init__(self, transport: httpx.HTTPTransport):
+        self._transport = transport
+        self._lock = threading.Lock()
+        # Connections seen so far; each new one means a TCP/TLS handshake
+        self._seen_connections: "weakref.WeakSet" = weakref.WeakSet()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.connections_opened = 0
+        self.total_latency = 0.0
+        self.status_codes: Dict[int, int] = {}
+
+    def _pool_connections(self) -> list:
+        pool = getattr(self._transport, '_pool', None)
+        return list(getattr(pool, 'connections', []))
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            response = self._transport.handle_request(request)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.in_flight -= 1
+                self.requests += 1
+                self.total_latency += elapsed
+                for connection in self._pool_connections():
+                    if connection not in self._seen_connections:
+                        self._seen_connections.add(connection)
+                        self.connections_opened += 1
+
+        with self._lock:
+            self.status_codes[response.status_code] = self.status_codes.get(response.status_code, 0) + 1
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters and pool occupancy."""
+        connections = self._pool_connections()
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'in_flight': self.in_flight,
+                'connections_opened': self.connections_opened,
+                'pool_connections': len(connections),
+                'pool_idle_connections': sum(1 for connection in connections if connection.is_idle()),
+                'mean_time_to_headers_ms': self.total_latency / self.requests * 1000 if self.requests else 0.0,
+                'status_codes': dict(self.status_codes),
+            }
+
+
+def _http2_enabled() -> bool:
+    if os.getenv('LLM_HTTP2', 'true').lower() != 'true':
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.info("LLM_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+        return False
+
+
+def get_timeout() -> httpx.Timeout:
+    """Explicit connect/read/write/pool timeouts for LLM requests."""
+    return httpx.Timeout(
+        connect=float(os.getenv('LLM_HTTP_CONNECT_TIMEOUT', 5)),
+        read=float(os.getenv('LLM_HTTP_READ_TIMEOUT', 60)),
+        write=float(os.getenv('LLM_HTTP_WRITE_TIMEOUT', 10)),
+        pool=float(os.getenv('LLM_HTTP_POOL_TIMEOUT', 10))
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Return the process-shared HTTP client for the LLM provider, creating it on first use.
+    """
+    global _http_client, _transport
+    with _lock:
+        if _http_client is None:
+            limits = httpx.Limits(
+                max_connections=int(os.getenv('LLM_HTTP_MAX_CONNECTIONS', 64)),
+                max_keepalive_connections=int(os.getenv('LLM_HTTP_MAX_KEEPALIVE', 32)),
+                keepalive_expiry=float(os.getenv('LLM_HTTP_KEEPALIVE_EXPIRY', 60))
+            )
+            http2 = _http2_enabled()
+            _transport = InstrumentedTransport(httpx.HTTPTransport(http2=http2, limits=limits))
+            _http_client = httpx.Client(transport=_transport, timeout=get_timeout())
+            register_metrics('llm_http', get_http_metrics)
+            logger.info(f"LLM HTTP client initialized (http2={http2}, max_connections={limits.max_connections})")
+        return _http_client
+
+
+def get_http_metrics() -> Dict[str, Any]:
+    """Metrics of the shared LLM HTTP client, or an empty dict before first use."""
+    return _transport.snapshot() if _transport is not None else {}
+
+
+def get_model_parameters() -> Dict[str, Any]:
+    """Model and sampling parameters of every LLM request, live or batched."""
+    return {
+        'model': os.getenv('LLM_MODEL_NAME', 'gpt-4o-mini'),
+        'temperature': 0.2,
+        'top_p': 0.9
+    }
+
+
+def get_chat_model() -> "ChatOpenAI":
+    """
+    Return the process-shared chat model, which sends all requests through get_http_client().
+    """
+    global _chat_model
+    if _chat_model is None:
+        load_config()
+        # langchain_openai pulls in the whole OpenAI SDK, so import it on first use
+        from langchain_openai import ChatOpenAI
+
+        http_client = get_http_client()
+        with _lock:
+            if _chat_model is None:
+                _chat_model = ChatOpenAI(
+                    **get_model_parameters(),
+                    api_key=os.getenv('OPENAI_API_KEY'),
+                    http_client=http_client,
+                    timeout=get_timeout()
+                )
+    return _chat_model
+
+
+def close_http_client() -> None:
+    """Close the shared HTTP client and its pooled connections."""
+    global _http_client, _transport, _chat_model
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
+        _transport = None
+        _chat_model = None
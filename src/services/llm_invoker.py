@@ -0,0 +1,514 @@
+"""
+Single entry point the agents use to invoke their LLM chains.
+
+Calls go through the 'llm' circuit breaker (see utils.circuit_breaker), so they
+fail fast while the provider is unhealthy, and are traced (see utils.tracing)
+as an 'llm' span with one 'chain.invoke' (or 'chain.stream') span per attempt.
+Under a deadline (see utils.deadline) the time left is bound to the request
+itself as its timeout (see with_request_timeout), so an attempt stops at the
+deadline rather than at the HTTP client's read timeout, and the caller stops
+waiting for it then. Such calls run on a bounded pool of primary threads.
+
+Optionally hedges slow calls: when a call has not returned after a percentile of
+recently observed latencies for that agent, a duplicate is issued and whichever
+finishes first wins. Hedges are capped by a process-wide budget so they never
+exceed a fixed fraction of calls. Attempts that may be hedged are streamed, so
+the losing one is closed as soon as its next chunk arrives instead of running
+to completion; likewise for attempts still running at the deadline. The latency
+recorded is the one the caller saw, from the call to its result, including the
+wait on a slower primary.
+
+stream_llm() streams a JSON completion instead and returns as soon as the
+fields the caller needs are parsed, while the rest keeps streaming on a
+background thread (see LLMStream). Streamed calls are not hedged.
+
+Environment variables:
+    LLM_HEDGING_ENABLED: Hedge slow LLM calls (default false)
+    LLM_HEDGE_PERCENTILE: Latency percentile after which a hedge is sent (default 95)
+    LLM_HEDGE_MAX_RATIO: Maximum hedges as a fraction of calls (default 0.05)
+    LLM_HEDGE_BURST: Hedges that may be spent back to back (default 5)
+    LLM_HEDGE_MIN_SAMPLES: Latencies observed before hedging starts (default 20)
+    LLM_HEDGE_WINDOW: Recent latencies kept per agent (default 200)
+    LLM_HEDGE_MAX_WORKERS: Threads running hedges and streams (default 64)
+    LLM_PRIMARY_MAX_WORKERS: Threads running the primary attempts of hedged or deadline-bound calls (default 64)
+"""
+import contextvars
+import logging
+import operator
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import reduce
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from utils.circuit_breaker import get_breaker
+from utils.deadline import DeadlineExceeded, check_deadline
+from utils.hedging import HedgeBudget, LatencyTracker
+from utils.json_stream import StreamingJSONObject
+from utils.metrics import register_metrics
+from utils.tracing import current_span, span
+
+logger = logging.getLogger(__name__)
+
+_invoker: Optional["LLMInvoker"] = None
+_lock = threading.Lock()
+
+
+def with_request_timeout(chain, timeout: Optional[float]):
+    """
+    Bound the requests of `chain`'s chat model to `timeout` seconds.
+
+    Applies to a chat model or a `prompt | llm` sequence ending in one; other
+    chains, and calls without a timeout, are returned unchanged.
+    """
+    # Without langchain loaded, `chain` cannot be a langchain runnable; not worth importing it for
+    if timeout is None or 'langchain_core' not in sys.modules:
+        return chain
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.runnables import RunnableSequence
+
+    if isinstance(chain, BaseChatModel):
+        return chain.bind(timeout=timeout)
+    if isinstance(chain, RunnableSequence) and isinstance(chain.last, BaseChatModel):
+        return RunnableSequence(*chain.steps[:-1], chain.last.bind(timeout=timeout))
+    return chain
+
+
+class LLMStream:
+    """
+    A chain's JSON completion, streamed on a background thread and parsed as it arrives.
+
+    Callers wait for the top-level fields they need with wait_for() and for the
+    whole completion with result(). The stream runs through the 'llm' circuit breaker.
+    """
+
+    def __init__(self, chain, prompt_input: Dict[str, Any], name: str):
+        self.chain = chain
+        self.prompt_input = prompt_input
+        self.name = name
+        self.parser = StreamingJSONObject()
+        self.usage: Dict[str, int] = {}
+        self.started = time.perf_counter()
+        self._cond = threading.Condition()
+        self._done = False
+        self._cancelled = False
+        self._error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        """Consume the stream; runs on a worker thread."""
+        try:
+            with span('chain.stream') as call_span, get_breaker('llm').guard():
+                for chunk in self.chain.stream(self.prompt_input):
+                    if self._cancelled:
+                        break
+                    text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                    with self._cond:
+                        if self.parser.feed(text):
+                            self._cond.notify_all()
+                    usage = getattr(chunk, 'usage_metadata', None) or {}
+                    for key, value in usage.items():
+                        if isinstance(value, int):
+                            self.usage[key] = self.usage.get(key, 0) + value
+                call_span.set_attributes(
+                    input_tokens=self.usage.get('input_tokens'),
+                    output_tokens=self.usage.get('output_tokens'),
+                    cancelled=self._cancelled
+                )
+        except BaseException as e:
+            self._error = e
+        finally:
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+
+    def wait_for(self, fields: Iterable[str], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Wait until every one of `fields` is parsed, or the stream ends.
+
+        Args:
+            fields: Top-level fields of the JSON completion to wait for
+            timeout: Seconds to wait; waits indefinitely when None
+
+        Returns:
+            Dict[str, Any]: The fields parsed so far among `fields`; all of them unless
+                the completion ended without some
+
+        Raises:
+            DeadlineExceeded: If the fields did not arrive within `timeout`
+            Exception: The stream's error, if it failed before the fields arrived
+        """
+        fields = list(fields)
+        with self._cond:
+            arrived = self._cond.wait_for(
+                lambda: self._done or all(field in self.parser.fields for field in fields),
+                timeout=timeout
+            )
+            if not arrived:
+                raise DeadlineExceeded(f"{self.name} LLM stream did not reach {', '.join(fields)} within {timeout:.2f}s")
+            parsed = {field: self.parser.fields[field] for field in fields if field in self.parser.fields}
+            if len(parsed) < len(fields) and self._error is not None:
+                raise self._error
+            return parsed
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        """
+        Full text of the completion, once streamed.
+
+        Raises:
+            DeadlineExceeded: If the stream did not end within `timeout`
+            Exception: The stream's error, if it failed
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._done, timeout=timeout):
+                raise DeadlineExceeded(f"{self.name} LLM stream did not finish within {timeout:.2f}s")
+        if self._error is not None:
+            raise self._error
+        if self._cancelled:
+            raise RuntimeError(f"{self.name} LLM stream was cancelled")
+        return self.parser.text
+
+    def cancel(self) -> None:
+        """Stop consuming the stream; the rest of the completion is discarded."""
+        self._cancelled = True
+
+
+class LLMInvoker:
+    """Invokes chains, hedging calls that run past the configured latency percentile."""
+
+    def __init__(
+        self,
+        hedging_enabled: bool = False,
+        percentile: float = 95.0,
+        max_ratio: float = 0.05,
+        burst: float = 5.0,
+        min_samples: int = 20,
+        window: int = 200,
+        max_workers: int = 64,
+        max_primary_workers: int = 64
+    ):
+        self.hedging_enabled = hedging_enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.max_workers = max_workers
+        self.max_primary_workers = max_primary_workers
+        self.budget = HedgeBudget(max_ratio, burst)
+        self._trackers: Dict[str, LatencyTracker] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._primary_executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.hedge_wins = 0
+        self.cancelled = 0
+        self.timed_out = 0
+
+    @classmethod
+    def from_env(cls) -> "LLMInvoker":
+        return cls(
+            hedging_enabled=os.getenv('LLM_HEDGING_ENABLED', 'false').lower() == 'true',
+            percentile=float(os.getenv('LLM_HEDGE_PERCENTILE', 95)),
+            max_ratio=float(os.getenv('LLM_HEDGE_MAX_RATIO', 0.05)),
+            burst=float(os.getenv('LLM_HEDGE_BURST', 5)),
+            min_samples=int(os.getenv('LLM_HEDGE_MIN_SAMPLES', 20)),
+            window=int(os.getenv('LLM_HEDGE_WINDOW', 200)),
+            max_workers=int(os.getenv('LLM_HEDGE_MAX_WORKERS', 64)),
+            max_primary_workers=int(os.getenv('LLM_PRIMARY_MAX_WORKERS', 64))
+        )
+
+    def _tracker(self, name: str) -> LatencyTracker:
+        with self._lock:
+            if name not in self._trackers:
+                self._trackers[name] = LatencyTracker(self.window)
+            return self._trackers[name]
+
+    def _pool(self, attempt: str) -> ThreadPoolExecutor:
+        """
+        Executor for `attempt`: primaries run on a pool of their own, hedges and streams on the hedge pool.
+
+        Primaries do not share the hedge pool: queued behind other calls there, the
+        wait would count as latency and trigger hedges of its own.
+        """
+        with self._lock:
+            if attempt == 'primary':
+                if self._primary_executor is None:
+                    self._primary_executor = ThreadPoolExecutor(max_workers=self.max_primary_workers, thread_name_prefix='llm-primary')
+                return self._primary_executor
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='llm-hedge')
+            return self._executor
+
+    def _submit(
+        self,
+        chain,
+        prompt_input: Dict[str, Any],
+        attempt: str,
+        timeout: Optional[float] = None,
+        streamed: bool = False
+    ) -> Tuple[Future, threading.Event]:
+        """
+        Start an attempt on its pool, its requests bounded to `timeout` seconds.
+
+        Returns:
+            Tuple of the attempt's future and the event closing it, when streamed
+        """
+        closed = threading.Event()
+        chain = with_request_timeout(chain, timeout)
+        # Run in a copy of the caller's context so context-local state follows the call
+        context = contextvars.copy_context()
+        if streamed:
+            future = self._pool(attempt).submit(context.run, self._streamed_invoke, chain, prompt_input, attempt, closed)
+        else:
+            future = self._pool(attempt).submit(context.run, self._timed_invoke, chain, prompt_input, attempt)
+        return future, closed
+
+    @staticmethod
+    def _timed_invoke(chain, prompt_input: Dict[str, Any], attempt: str = 'primary'):
+        started = time.perf_counter()
+        with span('chain.invoke', attempt=attempt) as call_span:
+            result = chain.invoke(prompt_input)
+            usage = getattr(result, 'usage_metadata', None) or {}
+            call_span.set_attributes(
+                input_tokens=usage.get('input_tokens'),
+                output_tokens=usage.get('output_tokens')
+            )
+        return result, time.perf_counter() - started
+
+    @staticmethod
+    def _streamed_invoke(chain, prompt_input: Dict[str, Any], attempt: str, closed: threading.Event):
+        """
+        Invoke `chain` by streaming it, so that the attempt can be closed midway.
+
+        Returns:
+            Tuple of the chunks merged into one message (None once closed) and the elapsed seconds
+        """
+        started = time.perf_counter()
+        chunks = []
+        with span('chain.stream', attempt=attempt) as call_span:
+            for chunk in chain.stream(prompt_input):
+                if closed.is_set():
+                    # Leaving the loop closes the stream and its connection
+                    call_span.set_attribute('cancelled', True)
+                    return None, time.perf_counter() - started
+                chunks.append(chunk)
+            result = reduce(operator.add, chunks) if chunks else None
+            usage = getattr(result, 'usage_metadata', None) or {}
+            call_span.set_attributes(
+                input_tokens=usage.get('input_tokens'),
+                output_tokens=usage.get('output_tokens')
+            )
+        return result, time.perf_counter() - started
+
+    def stream(
+        self,
+        chain,
+        prompt_input: Dict[str, Any],
+        name: str,
+        fields: Iterable[str],
+        timeout: Optional[float] = None
+    ) -> Tuple[Dict[str, Any], LLMStream]:
+        """
+        Stream `chain`'s JSON completion on a worker thread until `fields` are parsed.
+
+        The time until the fields arrive is the latency tracked for `name`.
+
+        Args:
+            chain: Runnable to stream, e.g. `prompt | llm`
+            prompt_input: Input for the chain
+            name: Caller name; latency percentiles are tracked per name
+            fields: Top-level fields of the completion to wait for
+            timeout: Seconds to wait for the fields; waits indefinitely when None
+
+        Returns:
+            Tuple of the parsed `fields` and the stream, still running
+
+        Raises:
+            DeadlineExceeded: If the fields did not arrive within `timeout`; the stream is cancelled
+        """
+        stream = LLMStream(chain, prompt_input, name)
+        # Run in a copy of the caller's context so context-local state follows the stream
+        self._pool('stream').submit(contextvars.copy_context().run, stream.run)
+        try:
+            parsed = stream.wait_for(fields, timeout)
+        except DeadlineExceeded:
+            stream.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise
+        self._tracker(name).record(time.perf_counter() - stream.started)
+        return parsed, stream
+
+    def hedge_delay(self, name: str) -> Optional[float]:
+        """Seconds to wait before hedging calls for `name`, or None while too few latencies are known."""
+        tracker = self._tracker(name)
+        if len(tracker) < self.min_samples:
+            return None
+        return tracker.percentile(self.percentile)
+
+    def typical_latency(self, name: str) -> Optional[float]:
+        """Median recent latency of calls for `name`, or None while too few latencies are known."""
+        with self._lock:
+            tracker = self._trackers.get(name)
+        if tracker is None or len(tracker) < self.min_samples:
+            return None
+        return tracker.percentile(50)
+
+    def invoke(self, chain, prompt_input: Dict[str, Any], name: str, timeout: Optional[float] = None):
+        """
+        Invoke `chain` with `prompt_input`, hedging it when enabled.
+
+        Args:
+            chain: Runnable to invoke, e.g. `prompt | llm`
+            prompt_input: Input for the chain
+            name: Caller name; latency percentiles are tracked per name
+            timeout: Seconds to wait for a result; waits indefinitely when None
+
+        Returns:
+            Result of whichever invocation finished first; the streamed chunks merged
+            into one message when the call could be hedged
+
+        Raises:
+            DeadlineExceeded: If no invocation finished within `timeout`
+        """
+        started = time.perf_counter()
+        tracker = self._tracker(name)
+        self.budget.on_call()
+        delay = self.hedge_delay(name) if self.hedging_enabled else None
+        if delay is None and timeout is None:
+            result, elapsed = self._timed_invoke(chain, prompt_input)
+            tracker.record(elapsed)
+            return result
+
+        expires = None if timeout is None else time.monotonic() + max(timeout, 0.0)
+        # Only an attempt that may lose to a hedge is streamed, so that it can be closed
+        primary, closed = self._submit(chain, prompt_input, 'primary', self._time_left(expires), streamed=delay is not None)
+        attempts = {primary: closed}
+        if delay is not None:
+            done, _ = wait(attempts, timeout=self._time_left(expires, delay))
+            if not done and self._time_left(expires) != 0 and self.budget.try_acquire():
+                logger.info(f"[LLMInvoker] {name} call exceeded p{self.percentile:g} ({delay:.2f}s), sending hedge")
+                hedge, closed = self._submit(chain, prompt_input, 'hedge', self._time_left(expires), streamed=True)
+                attempts[hedge] = closed
+                current_span().set_attribute('hedged', True)
+
+        error: Optional[BaseException] = None
+        pending = set(attempts)
+        while pending:
+            done, pending = wait(pending, timeout=self._time_left(expires), return_when=FIRST_COMPLETED)
+            if not done:
+                # Out of time: the calls still running are closed, or stop at their own timeout
+                for late in pending:
+                    self._cancel(late, attempts[late])
+                with self._lock:
+                    self.timed_out += 1
+                raise DeadlineExceeded(f"{name} LLM call did not finish within {timeout:.2f}s")
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                # First successful result wins; the loser is closed
+                for loser in pending:
+                    self._cancel(loser, attempts[loser])
+                result, _ = future.result()
+                tracker.record(time.perf_counter() - started)
+                if future is not primary:
+                    current_span().set_attribute('hedge_won', True)
+                    with self._lock:
+                        self.hedge_wins += 1
+                return result
+        if self._time_left(expires) == 0:
+            # The attempts ran into the timeout bound to their requests
+            with self._lock:
+                self.timed_out += 1
+            raise DeadlineExceeded(f"{name} LLM call did not finish within {timeout:.2f}s") from error
+        raise error
+
+    @staticmethod
+    def _time_left(expires: Optional[float], cap: Optional[float] = None) -> Optional[float]:
+        """Seconds until `expires` (None for no limit), capped at `cap`."""
+        left = None if expires is None else max(expires - time.monotonic(), 0.0)
+        if cap is None:
+            return left
+        return cap if left is None else min(cap, left)
+
+    def _cancel(self, future: Future, closed: threading.Event) -> None:
+        # A streamed attempt stops at its next chunk; a plain one runs until its request timeout
+        future.cancel()
+        closed.set()
+        with self._lock:
+            self.cancelled += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Hedging counters and the current latency percentiles per caller."""
+        with self._lock:
+            trackers = dict(self._trackers)
+            counters = {'hedge_wins': self.hedge_wins, 'cancelled': self.cancelled, 'timed_out': self.timed_out}
+        return {
+            'hedging_enabled': self.hedging_enabled,
+            **self.budget.snapshot(),
+            **counters,
+            'latency_s': {
+                name: {
+                    'samples': len(tracker),
+                    'p50': tracker.percentile(50),
+                    f'p{self.percentile:g}': tracker.percentile(self.percentile),
+                    'p99': tracker.percentile(99)
+                }
+                for name, tracker in trackers.items()
+            }
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executors = (self._executor, self._primary_executor)
+            self._executor = self._primary_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_invoker() -> LLMInvoker:
+    """Return the process-shared invoker, configured from the environment on first use."""
+    global _invoker
+    with _lock:
+        if _invoker is None:
+            _invoker = LLMInvoker.from_env()
+            register_metrics('llm_hedging', _invoker.snapshot)
+        return _invoker
+
+
+def invoke_llm(chain, prompt_input: Dict[str, Any], name: str):
+    """
+    Invoke `chain` through the process-shared LLMInvoker and the LLM circuit breaker.
+
+    The call's timeout, which also bounds its requests, is the time left before the
+    current deadline (see utils.deadline).
+
+    Raises:
+        CircuitOpenError: If the LLM provider's breaker is open
+        DeadlineExceeded: If the deadline passes before the call returns
+    """
+    timeout = check_deadline(f"{name} LLM call")
+    with span('llm', agent=name, timeout_s=timeout), get_breaker('llm').guard():
+        return get_invoker().invoke(chain, prompt_input, name, timeout=timeout)
+
+
+def stream_llm(chain, prompt_input: Dict[str, Any], name: str, fields: Iterable[str]) -> Tuple[Dict[str, Any], LLMStream]:
+    """
+    Stream `chain`'s JSON completion through the process-shared LLMInvoker and
+    return as soon as `fields` are parsed.
+
+    The stream keeps running in the background; LLMStream.result() returns the
+    whole completion. The wait for the fields is bounded by the current deadline
+    (see utils.deadline).
+
+    Returns:
+        Tuple of the parsed `fields` and the running stream
+
+    Raises:
+        CircuitOpenError: If the LLM provider's breaker is open
+        DeadlineExceeded: If the deadline passes before the fields arrive; the stream is cancelled
+    """
+    timeout = check_deadline(f"{name} LLM call")
+    with span('llm', agent=name, timeout_s=timeout, streamed=True):
+        return get_invoker().stream(chain, prompt_input, name, fields, timeout=timeout)
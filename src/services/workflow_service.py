@@ -1,49 +1,90 @@
 from utils.s3_client import S3Client
+from utils.circuit_breaker import CircuitOpenError
 from workflows.resume_processor.state import ResumeProcessorState
+from workflows.resume_processor.job_context import (
+    JOB_DOCUMENT_KEYS,
+    STATE_MODE_FULL,
+    STATE_MODE_SLIM,
+    compute_version,
+    job_context_store
+)
+from workflows.resume_processor.resume_cache import compute_resume_version
+from workflows.resume_processor.consts import ANALYSIS_DETAIL_FULL, EVALUATION_MODE_TWO_CALL
 from models.workflow_request import WorkflowRequest
+from utils.deadline import deadline_from_timeout
+from typing import Any, Dict, List, Optional
+from decimal import Decimal
 import json
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
 class WorkflowService:
     @staticmethod
-    def build_state(request: WorkflowRequest) -> ResumeProcessorState:
+    def build_state(
+        request: WorkflowRequest,
+        s3_client: Optional[S3Client] = None,
+        state_mode: Optional[str] = None,
+        deadline: Optional[float] = None
+    ) -> ResumeProcessorState:
         """ 
         Build the state for the workflow using the request information.
+
+        In 'full' state mode every document is carried in the state. In 'slim' mode the
+        job-level documents are stored once in the shared job context store and the
+        state only carries a reference to them.
         
         Args:
             request: WorkflowRequest containing all necessary S3 URLs and configuration
+            s3_client: S3 client to fetch documents with; a new one is created when omitted
+            state_mode: 'full' or 'slim'; defaults to the WORKFLOW_STATE_MODE environment variable
+            deadline: Unix timestamp the run must finish by; defaults to request.timeout_seconds from now
             
         Returns:
             ResumeProcessorState: Initialized state with all required data
             
         Raises:
+            CircuitOpenError: If the S3 circuit breaker is open
             Exception: If any required data cannot be fetched or parsed
         """
         try:
             # Initialize clients
-            s3_client = S3Client()
+            s3_client = s3_client or S3Client()
 
             # Fetch all required JSON files from S3
-            s3_urls = [
-                request.resume_s3_url,
-                request.jd_s3_url,
-                request.core_values_s3_url, 
-                request.uniqueness_description_s3_url,
-                request.custom_criteria_s3_url
-            ]
+            job_document_urls = {
+                'jd_data': request.jd_s3_url,
+                'core_values_data': request.core_values_s3_url,
+                'uniqueness_data': request.uniqueness_description_s3_url,
+                'custom_criteria_data': request.custom_criteria_s3_url
+            }
+            s3_urls = [request.resume_s3_url, *job_document_urls.values()]
 
             # Get all objects in one batch request
             s3_objects = s3_client.batch_get_objects(s3_urls)
             
+            state_mode = state_mode or os.getenv('WORKFLOW_STATE_MODE', STATE_MODE_FULL)
+
             # Parse each JSON file into a dict
             try:
-                resume_data = json.loads(s3_objects[request.resume_s3_url]['Body'].read().decode('utf-8'))
-                jd_data = json.loads(s3_objects[request.jd_s3_url]['Body'].read().decode('utf-8'))
-                core_values_data = json.loads(s3_objects[request.core_values_s3_url]['Body'].read().decode('utf-8'))
-                uniqueness_data = json.loads(s3_objects[request.uniqueness_description_s3_url]['Body'].read().decode('utf-8'))
-                custom_criteria_data = json.loads(s3_objects[request.custom_criteria_s3_url]['Body'].read().decode('utf-8'))
+                raw_resume = s3_objects[request.resume_s3_url]['Body'].read()
+                resume_data = json.loads(raw_resume.decode('utf-8'))
+                raw_job_documents = {key: s3_objects[url]['Body'].read() for key, url in job_document_urls.items()}
+
+                if state_mode == STATE_MODE_SLIM:
+                    # Job documents are parsed once per job version and shared by reference
+                    version = compute_version(raw_job_documents)
+                    job_context = job_context_store.get(request.job_id, version)
+                    if job_context is None:
+                        job_context = job_context_store.put(request.job_id, version, {
+                            key: json.loads(raw.decode('utf-8')) for key, raw in raw_job_documents.items()
+                        }, job_document_urls)
+                    job_state = {'job_context_ref': job_context.ref}
+                else:
+                    job_state = {
+                        key: json.loads(raw_job_documents[key].decode('utf-8')) for key in JOB_DOCUMENT_KEYS
+                    }
             except json.JSONDecodeError as e:
                 logger.error(f"Failed to parse JSON data: {str(e)}")
                 raise Exception(f"Invalid JSON data in S3 objects: {str(e)}")
@@ -53,14 +94,14 @@ class WorkflowService:
 
             # Add all data to state
             return ResumeProcessorState({
-                'messages': [],
                 'job_id': request.job_id,
                 'candidate_id': request.candidate_id,
                 'resume_data': resume_data,
-                'jd_data': jd_data,
-                'core_values_data': core_values_data,
-                'uniqueness_data': uniqueness_data,
-                'custom_criteria_data': custom_criteria_data,
+                'resume_version': compute_resume_version(raw_resume),
+                **job_state,
+                'evaluation_mode': request.evaluation_mode or os.getenv('EVALUATION_MODE', EVALUATION_MODE_TWO_CALL),
+                'analysis_detail': request.analysis_detail or os.getenv('ANALYSIS_DETAIL', ANALYSIS_DETAIL_FULL),
+                'deadline': deadline if deadline is not None else deadline_from_timeout(request.timeout_seconds),
                 'weights': request.weights,
                 'jd_threshold': request.jd_threshold,
                 'absolute_grading_error_boundary': request.absolute_grading_error_boundary,
@@ -70,6 +111,91 @@ class WorkflowService:
                 'next_node': 'jd_analysis_agent'
             })
 
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Failed to build workflow state: {str(e)}")
-            raise Exception(f"Failed to initialize workflow state: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to initialize workflow state: {str(e)}")
+
+    @staticmethod
+    def project_state(state: ResumeProcessorState, fields: Optional[List[str]]) -> Dict[str, Any]:
+        """
+        Select the fields of a final workflow state to return to the caller.
+
+        Args:
+            state: Final workflow state
+            fields: State fields to keep, or None to keep everything
+
+        Returns:
+            Dict[str, Any]: The selected fields that are present in the state
+        """
+        if fields is None:
+            return dict(state)
+        return {field: state[field] for field in fields if field in state}
+
+    @staticmethod
+    def apply_recorded_scores(state: ResumeProcessorState, item: Dict[str, Any]) -> ResumeProcessorState:
+        """
+        Copy the scores and decision recorded in a candidate's DynamoDB item into a state.
+
+        Args:
+            state: Workflow state built for the candidate
+            item: The candidate's DynamoDB item
+
+        Returns:
+            ResumeProcessorState: The state, with the recorded scores, status and analysis urls
+        """
+        item = WorkflowService._from_dynamo(item)
+        for field in ('jd_score', 'cultural_fit_score', 'uniqueness_score', 'custom_criteria_scores', 'absolute_score', 'status', 'jd_analysis_url'):
+            if field in item:
+                state[field] = item[field]
+        if 'analysis_url' in item:
+            state['cultural_analysis_url'] = item['analysis_url']
+        # Items recorded before the fast mode existed hold full analyses
+        state['analysis_detail'] = item.get('analysis_detail', ANALYSIS_DETAIL_FULL)
+        return state
+
+    @staticmethod
+    def load_stored_results(request: WorkflowRequest, dynamo_client) -> Optional[Dict[str, Any]]:
+        """
+        Read the results recorded for the request's candidate, for a re-evaluation.
+
+        Args:
+            request: WorkflowRequest of the re-evaluation
+            dynamo_client: DynamoDB client to read the candidate's item with
+
+        Returns:
+            Optional[Dict[str, Any]]: The candidate's item with Decimals converted, or None if never evaluated
+        """
+        item = dynamo_client.get_item({'candidate_id': request.candidate_id, 'job_id': request.job_id})
+        return WorkflowService._from_dynamo(item) if item else None
+
+    @staticmethod
+    def to_candidate_results(items: List[Dict[str, Any]], candidate_ids: List[str]) -> Dict[str, Any]:
+        """
+        Order DynamoDB candidate items by the requested ids and convert their Decimals.
+
+        Args:
+            items: Items returned by DynamoClient.batch_get_items
+            candidate_ids: Candidate ids in the order the caller asked for them
+
+        Returns:
+            Dict with 'results' (one entry per found candidate) and 'missing_candidate_ids'
+        """
+        by_candidate = {item['candidate_id']: WorkflowService._from_dynamo(item) for item in items}
+        requested = list(dict.fromkeys(candidate_ids))
+        return {
+            'results': [by_candidate[candidate_id] for candidate_id in requested if candidate_id in by_candidate],
+            'missing_candidate_ids': [candidate_id for candidate_id in requested if candidate_id not in by_candidate]
+        }
+
+    @staticmethod
+    def _from_dynamo(value: Any) -> Any:
+        """Recursively convert DynamoDB Decimals to int/float."""
+        if isinstance(value, Decimal):
+            return int(value) if value == value.to_integral_value() else float(value)
+        if isinstance(value, dict):
+            return {key: WorkflowService._from_dynamo(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [WorkflowService._from_dynamo(item) for item in value]
+        return value
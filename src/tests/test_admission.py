@@ -0,0 +1,87 @@
+"""
+Tests for admission control on the workflow API.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import build_request, load_fixture_objects
+from controllers.workflow_controller import get_s3_client, get_workflow
+from main import app
+from utils.admission import AdmissionController, AdmissionRejected, get_admission_controller
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+RUN_URL = "/api/v1/workflows/resume_processor/run"
+
+
+def test_queue_hands_slots_over_in_order():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+        assert await controller.acquire() == 0.0
+
+        waiting = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0.05)
+        assert controller.snapshot()['queued'] == 1
+
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire()
+
+        controller.release()
+        assert await waiting >= 0.05
+        assert controller.in_flight == 1
+        controller.release()
+        return controller.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot['in_flight'] == 0
+    assert (snapshot['admitted'], snapshot['rejected']) == (2, 1)
+    assert snapshot['wait_s']['p99'] >= 0.05
+
+
+def test_wait_times_out():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=0.05)
+        await controller.acquire()
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire()
+        controller.release()
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.timed_out == 1
+    assert (controller.in_flight, controller.queued) == (0, 0)
+
+
+@pytest.fixture
+def slow_app():
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=10, retry_after=3)
+    app.dependency_overrides[get_s3_client] = lambda: s3_client
+    app.dependency_overrides[get_workflow] = lambda: ResumeProcessorWorkflow(
+        llm=FakeChatModel(latency_ms=100), s3_client=s3_client, dynamo_client=InMemoryDynamoClient()
+    )
+    app.dependency_overrides[get_admission_controller] = lambda: controller
+    yield controller
+    app.dependency_overrides.clear()
+    controller.shutdown()
+
+
+def test_burst_beyond_queue_is_rejected_with_429(slow_app):
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return await asyncio.gather(*[
+                client.post(RUN_URL, json=build_request(f"candidate-{i}").model_dump())
+                for i in range(1, 4)
+            ])
+
+    responses = asyncio.run(burst())
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200, 200, 429]
+    rejected = next(response for response in responses if response.status_code == 429)
+    assert rejected.headers['Retry-After'] == '3'
+    assert slow_app.snapshot()['rejected'] == 1
+    assert slow_app.snapshot()['in_flight'] == 0
@@ -0,0 +1,119 @@
+"""
+Tests for the offline batch runner, using in-process fakes for OpenAI, S3 and DynamoDB.
+"""
+import csv
+import json
+import os
+
+import pytest
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import FIXTURE_DIR, FIXTURE_FILES, JOB_ID, load_fixture_objects
+from services.batch_runner import load_checkpoint, run_batch
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+
+def manifest_row(candidate_id):
+    return {
+        'job_id': JOB_ID,
+        'candidate_id': candidate_id,
+        **{field: f"{JOB_ID}/config/{file_name}" for field, file_name in FIXTURE_FILES.items()}
+    }
+
+
+@pytest.fixture
+def scoring_config():
+    with open(os.path.join(FIXTURE_DIR, 'scoring-weights.json')) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def fakes():
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    llm = FakeChatModel()
+    workflow = ResumeProcessorWorkflow(llm=llm, s3_client=s3_client, dynamo_client=InMemoryDynamoClient())
+    return {'workflow': workflow, 's3_client': s3_client, 'llm': llm}
+
+
+def read_results(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_jsonl_manifest_writes_one_result_per_candidate(tmp_path, scoring_config, fakes):
+    manifest = tmp_path / 'manifest.jsonl'
+    manifest.write_text(''.join(json.dumps(manifest_row(f"c-{i}")) + '\n' for i in range(5)))
+    output = str(tmp_path / 'results.jsonl')
+
+    summary = run_batch(str(manifest), output, scoring_config, concurrency=2, workflow=fakes['workflow'], s3_client=fakes['s3_client'])
+
+    results = read_results(output)
+    assert sorted(result['candidate_id'] for result in results) == [f"c-{i}" for i in range(5)]
+    assert all(result['absolute_score'] > 0 for result in results)
+    assert summary['completed'] == 5
+
+
+def test_csv_manifest_is_supported(tmp_path, scoring_config, fakes):
+    manifest = tmp_path / 'manifest.csv'
+    with open(manifest, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(manifest_row('x')))
+        writer.writeheader()
+        writer.writerows(manifest_row(f"c-{i}") for i in range(3))
+    output = str(tmp_path / 'results.jsonl')
+
+    run_batch(str(manifest), output, scoring_config, concurrency=2, workflow=fakes['workflow'], s3_client=fakes['s3_client'])
+
+    assert len(read_results(output)) == 3
+
+
+def test_rerun_resumes_after_crash(tmp_path, scoring_config, fakes):
+    manifest = tmp_path / 'manifest.jsonl'
+    manifest.write_text(''.join(json.dumps(manifest_row(f"c-{i}")) + '\n' for i in range(4)))
+    output = tmp_path / 'results.jsonl'
+    # Two finished candidates and a line torn by a crash mid-write
+    output.write_text(
+        json.dumps({'job_id': JOB_ID, 'candidate_id': 'c-0', 'status': 'COMPLETED'}) + '\n'
+        + json.dumps({'job_id': JOB_ID, 'candidate_id': 'c-1', 'status': 'COMPLETED'}) + '\n'
+        + '{"job_id": "' + JOB_ID
+    )
+
+    summary = run_batch(str(manifest), str(output), scoring_config, concurrency=2, workflow=fakes['workflow'], s3_client=fakes['s3_client'])
+
+    results = read_results(output)
+    assert [result['candidate_id'] for result in results[:2]] == ['c-0', 'c-1']
+    assert sorted(result['candidate_id'] for result in results[2:]) == ['c-2', 'c-3']
+    assert summary['skipped'] == 2
+    assert fakes['llm'].stats['calls'] == 4
+
+
+def test_failed_rows_are_recorded_and_retried(tmp_path, scoring_config, fakes):
+    manifest = tmp_path / 'manifest.jsonl'
+    manifest.write_text(json.dumps({**manifest_row('c-0'), 'resume_s3_url': 'missing.json'}) + '\n')
+    output = str(tmp_path / 'results.jsonl')
+
+    run_batch(str(manifest), output, scoring_config, workflow=fakes['workflow'], s3_client=fakes['s3_client'])
+
+    assert read_results(output)[0]['status'] == 'ERROR'
+    assert load_checkpoint(output) == {(JOB_ID, 'c-0')}
+    assert load_checkpoint(output, retry_failed=True) == set()
+
+
+class UnparseableChatModel(FakeChatModel):
+    """Fake chat model whose completions are not JSON."""
+
+    def _respond(self, prompt):
+        return 'not json'
+
+
+def test_node_failures_are_recorded_as_failed_and_retried(tmp_path, scoring_config, fakes):
+    manifest = tmp_path / 'manifest.jsonl'
+    manifest.write_text(json.dumps(manifest_row('c-0')) + '\n')
+    output = str(tmp_path / 'results.jsonl')
+    failing = ResumeProcessorWorkflow(llm=UnparseableChatModel(), s3_client=fakes['s3_client'], dynamo_client=InMemoryDynamoClient())
+
+    summary = run_batch(str(manifest), output, scoring_config, workflow=failing, s3_client=fakes['s3_client'])
+    assert read_results(output)[0]['status'] == 'FAILED'
+    assert summary['failed'] == 1
+
+    run_batch(str(manifest), output, scoring_config, retry_failed=True, workflow=fakes['workflow'], s3_client=fakes['s3_client'])
+    assert [result['status'] for result in read_results(output)] == ['FAILED', 'COMPLETED']
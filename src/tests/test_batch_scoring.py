@@ -0,0 +1,160 @@
+"""
+Tests for batched scoring, run end to end through the local batch transport.
+"""
+import json
+import os
+
+import pytest
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import FIXTURE_DIR, load_fixture_objects
+from services.batch_runner import run_batch
+from services.batch_scoring import BatchScoringJob, LocalBatchTransport, response_content
+from tests.test_batch_runner import manifest_row, read_results
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+CANDIDATES = [f"c-{i}" for i in range(3)]
+
+
+@pytest.fixture
+def scoring_config():
+    with open(os.path.join(FIXTURE_DIR, 'scoring-weights.json')) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    path = tmp_path / 'manifest.jsonl'
+    path.write_text(''.join(json.dumps(manifest_row(candidate_id)) + '\n' for candidate_id in CANDIDATES))
+    return str(path)
+
+
+class HeldTransport(LocalBatchTransport):
+    """Local transport whose batches stay in progress until released."""
+
+    released = False
+
+    def status(self, batch_id):
+        return super().status(batch_id) if self.released else 'in_progress'
+
+
+class FailingChatModel(FakeChatModel):
+    """Fake chat model failing every request."""
+
+    def _respond(self, prompt):
+        raise RuntimeError('rate limited')
+
+
+class FlakyTransport(LocalBatchTransport):
+    """Local transport whose second submission fails."""
+
+    submissions = 0
+
+    def submit(self, input_path):
+        self.submissions += 1
+        if self.submissions == 2:
+            raise ConnectionError('upload interrupted')
+        return super().submit(input_path)
+
+
+class UnparseableChatModel(FakeChatModel):
+    """Fake chat model whose completions are not JSON."""
+
+    def _respond(self, prompt):
+        return 'not json'
+
+
+def batch_job(tmp_path, llm, transport_class=LocalBatchTransport):
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    dynamo_client = InMemoryDynamoClient()
+    transport = transport_class(str(tmp_path / 'batches'), llm)
+    return BatchScoringJob(str(tmp_path / 'work'), transport, s3_client, dynamo_client), dynamo_client
+
+
+def test_batched_run_matches_a_live_run(tmp_path, manifest, scoring_config):
+    live_dynamo = InMemoryDynamoClient()
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    workflow = ResumeProcessorWorkflow(llm=FakeChatModel(), s3_client=s3_client, dynamo_client=live_dynamo)
+    run_batch(manifest, str(tmp_path / 'live.jsonl'), scoring_config, workflow=workflow, s3_client=s3_client)
+    job, dynamo_client = batch_job(tmp_path, FakeChatModel())
+
+    job.submit(manifest, scoring_config)
+    progress = job.advance()
+
+    assert progress['status'] == 'done'
+    assert progress['stages']['cultural_agent']['requests'] == len(CANDIDATES)
+    live = {result['candidate_id']: {**result, 'duration_s': None} for result in read_results(str(tmp_path / 'live.jsonl'))}
+    batched = {result['candidate_id']: {**result, 'duration_s': None} for result in read_results(str(tmp_path / 'work' / 'results.jsonl'))}
+    assert batched == live
+    assert dynamo_client.items == live_dynamo.items
+
+
+def test_rejected_candidates_skip_the_cultural_stage(tmp_path, manifest, scoring_config):
+    llm = FakeChatModel(jd_score=3.0, jd_verdict=False)
+    job, _ = batch_job(tmp_path, llm)
+
+    job.submit(manifest, scoring_config)
+    progress = job.advance()
+
+    assert progress['status'] == 'done'
+    assert progress['stages']['cultural_agent']['requests'] == 0
+    assert llm.stats['calls'] == len(CANDIDATES)
+    results = read_results(str(tmp_path / 'work' / 'results.jsonl'))
+    assert {result['jd_score'] for result in results} == {3.0}
+    assert all('absolute_score' not in result for result in results)
+
+
+def test_unfinished_batches_are_polled_again(tmp_path, manifest, scoring_config):
+    job, _ = batch_job(tmp_path, FakeChatModel(), HeldTransport)
+
+    progress = job.submit(manifest, scoring_config)
+    assert job.advance()['stages'] == progress['stages']
+    assert progress['stages']['jd_analysis']['pending'] == 1 and progress['results'] == 0
+
+    job.transport.released = True
+    assert job.advance()['results'] == len(CANDIDATES)
+
+
+def test_failed_requests_are_recorded_as_errors(tmp_path, manifest, scoring_config):
+    job, dynamo_client = batch_job(tmp_path, FailingChatModel())
+
+    job.submit(manifest, scoring_config)
+    progress = job.advance()
+
+    assert progress['status'] == 'done' and progress['results'] == len(CANDIDATES)
+    results = read_results(str(tmp_path / 'work' / 'results.jsonl'))
+    assert {result['status'] for result in results} == {'ERROR'}
+    assert results[0]['error_message'] == 'rate limited'
+    assert not dynamo_client.items
+
+
+def test_response_content_reads_provider_errors():
+    result = {'custom_id': 'x', 'response': {'status_code': 429, 'body': {'error': {'message': 'quota exceeded'}}}, 'error': None}
+
+    assert response_content(result) == (None, 'quota exceeded')
+
+
+def test_interrupted_submission_is_resumed_by_advance(monkeypatch, tmp_path, manifest, scoring_config):
+    monkeypatch.setenv('BATCH_MAX_REQUESTS', '1')
+    job, _ = batch_job(tmp_path, FakeChatModel(), FlakyTransport)
+
+    with pytest.raises(ConnectionError):
+        job.submit(manifest, scoring_config)
+    progress = job.advance()
+
+    assert progress['status'] == 'done'
+    assert progress['stages']['jd_analysis']['batches'] == len(CANDIDATES)
+    results = read_results(str(tmp_path / 'work' / 'results.jsonl'))
+    assert sorted(result['candidate_id'] for result in results) == CANDIDATES
+    assert {result['status'] for result in results} == {'COMPLETED'}
+
+
+def test_unparseable_analyses_are_recorded_as_failed(tmp_path, manifest, scoring_config):
+    job, _ = batch_job(tmp_path, UnparseableChatModel())
+
+    job.submit(manifest, scoring_config)
+    job.advance()
+
+    results = read_results(str(tmp_path / 'work' / 'results.jsonl'))
+    assert {result['status'] for result in results} == {'FAILED'}
+    assert all(result['error_message'] for result in results)
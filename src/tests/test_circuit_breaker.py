@@ -0,0 +1,185 @@
+"""
+Tests for the dependency circuit breakers and the fast-fail path through the workflow API.
+"""
+import pytest
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import build_request, load_fixture_objects
+from controllers.workflow_controller import get_s3_client, get_workflow
+from main import app
+from utils.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    get_breaker,
+    is_dependency_failure,
+    reset_breakers
+)
+from utils.s3_client import S3Client
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+RUN_URL = "/api/v1/workflows/resume_processor/run"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+def make_breaker(clock, **kwargs):
+    options = {'failure_rate': 0.5, 'min_calls': 4, 'window_seconds': 10, 'open_seconds': 5, 'clock': clock}
+    return CircuitBreaker('test', **{**options, **kwargs})
+
+
+def fail(breaker, times=1):
+    for _ in range(times):
+        with pytest.raises(TimeoutError):
+            with breaker.guard():
+                raise TimeoutError("read timed out")
+
+
+def client_error(code, status):
+    return ClientError({'Error': {'Code': code, 'Message': code}, 'ResponseMetadata': {'HTTPStatusCode': status}}, 'GetObject')
+
+
+def test_only_dependency_failures_count():
+    assert is_dependency_failure(TimeoutError())
+    assert is_dependency_failure(client_error('InternalError', 500))
+    assert is_dependency_failure(client_error('SlowDown', 503))
+    assert is_dependency_failure(client_error('ProvisionedThroughputExceededException', 400))
+    assert not is_dependency_failure(client_error('NoSuchKey', 404))
+    assert not is_dependency_failure(client_error('ValidationException', 400))
+    assert is_dependency_failure(ConnectionResetError())
+    assert not is_dependency_failure(KeyError('job_title'))
+    assert not is_dependency_failure(ValueError('Failed to parse jd_analysis result'))
+
+
+def test_local_errors_do_not_open_the_breaker(clock):
+    breaker = make_breaker(clock)
+
+    for _ in range(10):
+        with pytest.raises(KeyError):
+            with breaker.guard():
+                raise KeyError('job_title')
+
+    assert breaker.state == STATE_CLOSED
+
+
+def test_interrupted_probe_frees_its_slot(clock):
+    breaker = make_breaker(clock)
+    fail(breaker, 4)
+    clock.now += 5
+
+    with pytest.raises(KeyboardInterrupt):
+        with breaker.guard():
+            raise KeyboardInterrupt
+
+    assert breaker.state == STATE_HALF_OPEN
+    with breaker.guard():
+        pass
+    assert breaker.state == STATE_CLOSED
+
+
+def test_opens_on_failure_rate_and_fails_fast(clock):
+    breaker = make_breaker(clock)
+    with breaker.guard():
+        pass
+    fail(breaker, 2)
+    assert breaker.state == STATE_CLOSED  # below min_calls
+    fail(breaker)
+    assert breaker.state == STATE_OPEN
+
+    clock.now = 2
+    with pytest.raises(CircuitOpenError) as error:
+        with breaker.guard():
+            pytest.fail("call should not run while the breaker is open")
+    assert error.value.retry_after == pytest.approx(3)
+    assert breaker.snapshot()['rejected'] == 1
+
+
+def test_old_failures_leave_the_window(clock):
+    breaker = make_breaker(clock)
+    fail(breaker, 3)
+    clock.now = 11
+    with breaker.guard():
+        pass
+    fail(breaker)
+    assert breaker.state == STATE_CLOSED
+
+
+def test_half_open_probe_closes_or_reopens(clock):
+    breaker = make_breaker(clock)
+    fail(breaker, 4)
+    clock.now = 5
+    assert breaker.state == STATE_HALF_OPEN
+
+    # A failed probe opens the breaker for another full cool-down
+    fail(breaker)
+    assert breaker.state == STATE_OPEN
+    clock.now = 10
+    with breaker.guard():
+        # Only one probe at a time
+        with pytest.raises(CircuitOpenError):
+            with breaker.guard():
+                pass
+    assert breaker.state == STATE_CLOSED
+
+
+def test_s3_client_fails_fast_once_open():
+    class TimingOutS3:
+        calls = 0
+
+        def get_object(self, **kwargs):
+            TimingOutS3.calls += 1
+            raise TimeoutError("read timed out")
+
+    client = S3Client.__new__(S3Client)
+    client.s3 = TimingOutS3()
+    client.breaker = CircuitBreaker('s3', min_calls=3)
+
+    for _ in range(3):
+        assert client.get_object('bucket', 'key') is None
+    with pytest.raises(CircuitOpenError):
+        client.get_object('bucket', 'key')
+    assert TimingOutS3.calls == 3
+
+
+def test_open_llm_breaker_returns_retryable_503():
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    llm = FakeChatModel()
+    app.dependency_overrides[get_s3_client] = lambda: s3_client
+    app.dependency_overrides[get_workflow] = lambda: ResumeProcessorWorkflow(
+        llm=llm, s3_client=s3_client, dynamo_client=InMemoryDynamoClient()
+    )
+    breaker = get_breaker('llm')
+    for _ in range(breaker.min_calls):
+        breaker.after_call(failed=True)
+
+    try:
+        response = TestClient(app).post(RUN_URL, json=build_request('candidate-1').model_dump())
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
+    assert response.json()['data']['status'] == 'DEPENDENCY_UNAVAILABLE'
+    assert llm.stats['calls'] == 0
@@ -0,0 +1,50 @@
+"""
+Tests for the single-call combined evaluation mode.
+"""
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import JOB_ID, build_request, load_fixture_objects
+from services.workflow_service import WorkflowService
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+
+def run(evaluation_mode, **llm_options):
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    dynamo_client = InMemoryDynamoClient()
+    llm = FakeChatModel(**llm_options)
+    workflow = ResumeProcessorWorkflow(llm=llm, s3_client=s3_client, dynamo_client=dynamo_client)
+    request = build_request('candidate-1').model_copy(update={'evaluation_mode': evaluation_mode})
+    final_state = workflow.process_resume(WorkflowService.build_state(request, s3_client))
+    item = dynamo_client.get_item({'candidate_id': 'candidate-1', 'job_id': request.job_id})
+    return final_state, llm, s3_client, item
+
+
+def test_combined_mode_scores_everything_in_one_call():
+    final_state, llm, s3_client, item = run('combined')
+
+    assert llm.stats['calls'] == 1
+    assert final_state['jd_score'] == 7.5
+    assert final_state['cultural_fit_score'] == 7.0
+    assert final_state['absolute_score'] is not None
+    assert {f"{JOB_ID}/candidate-1/jd_analysis.json", f"{JOB_ID}/candidate-1/cultural_analysis.json"} <= set(s3_client.objects)
+    assert item['status'] in ('SELECTED', 'IN_CONSIDERATION', 'REJECTED')
+
+
+def test_combined_mode_matches_two_call_scores():
+    combined, combined_llm, _, _ = run('combined')
+    two_call, two_call_llm, _, _ = run('two_call')
+
+    assert two_call_llm.stats['calls'] == 2
+    assert combined['absolute_score'] == two_call['absolute_score']
+    assert combined_llm.stats['input_tokens'] < two_call_llm.stats['input_tokens']
+
+
+def test_combined_mode_still_applies_jd_threshold():
+    final_state, llm, s3_client, item = run('combined', jd_score=1.0)
+
+    assert llm.stats['calls'] == 1
+    assert final_state.get('absolute_score') is None
+    assert item['status'] == 'JD_REJECTED'
+    # Cultural scores are not applicable to JD rejections, as in the two-call mode
+    assert final_state.get('cultural_fit_score') is None
+    assert 'cultural_fit_score' not in item and 'cultural_fingerprint' not in item
+    assert f"{JOB_ID}/candidate-1/cultural_analysis.json" not in s3_client.objects
@@ -0,0 +1,51 @@
+"""
+Tests for the cultural agent's fan-out mode.
+"""
+import json
+import time
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import JOB_ID, build_request, load_fixture_objects
+from services.workflow_service import WorkflowService
+from workflows.resume_processor.nodes.cultural_agent import CulturalAgent
+
+
+def run_cultural_agent(fanout, latency_ms=0.0):
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    dynamo_client = InMemoryDynamoClient()
+    llm = FakeChatModel(latency_ms=latency_ms)
+    agent = CulturalAgent(llm, s3_client, dynamo_client, fanout=fanout)
+    state = WorkflowService.build_state(build_request('candidate-1'), s3_client)
+
+    started = time.perf_counter()
+    state = agent.analyze_cultural_fit(state)
+    elapsed = time.perf_counter() - started
+
+    artifact = json.loads(s3_client.objects[f"{JOB_ID}/candidate-1/cultural_analysis.json"])
+    item = dynamo_client.get_item({'candidate_id': 'candidate-1', 'job_id': JOB_ID})
+    return state, llm, artifact, item, elapsed
+
+
+def test_fanout_issues_one_call_per_part():
+    state, llm, _, _, _ = run_cultural_agent(fanout=True)
+
+    # Cultural fit, uniqueness and the two custom criteria of the fixture job
+    assert llm.stats['calls'] == 4
+    assert state['next_node'] == 'absolute_rating'
+
+
+def test_fanout_matches_single_call_shape_and_fields():
+    fanout_state, _, fanout_artifact, fanout_item, _ = run_cultural_agent(fanout=True)
+    single_state, _, single_artifact, single_item, _ = run_cultural_agent(fanout=False)
+
+    assert set(fanout_artifact) == set(single_artifact)
+    assert fanout_state['custom_criteria_scores'] == single_state['custom_criteria_scores']
+    assert [criterion['name'] for criterion in fanout_artifact['custom_criteria_scores']] == ['Past Success', 'Diversity Hiring']
+    assert set(fanout_item) == set(single_item)
+
+
+def test_fanout_latency_is_the_slowest_call():
+    _, llm, _, _, elapsed = run_cultural_agent(fanout=True, latency_ms=200)
+
+    assert llm.stats['calls'] == 4
+    assert elapsed < 0.6
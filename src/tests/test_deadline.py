@@ -0,0 +1,133 @@
+"""
+Tests for deadline propagation through the resume processor workflow.
+"""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.prompts import PromptTemplate
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import build_request, load_fixture_objects
+from controllers.workflow_controller import get_s3_client, get_workflow
+from main import app
+from services.llm_invoker import LLMInvoker, get_invoker
+from services.workflow_service import WorkflowService
+from utils.circuit_breaker import is_dependency_failure
+from utils.deadline import DeadlineExceeded
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+RUN_URL = "/api/v1/workflows/resume_processor/run"
+
+
+def run_with_timeout(timeout_seconds, latency_ms=0.0, deadline=None):
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    llm = FakeChatModel(latency_ms=latency_ms)
+    workflow = ResumeProcessorWorkflow(llm=llm, s3_client=s3_client, dynamo_client=InMemoryDynamoClient())
+    request = build_request('candidate-1').model_copy(update={'timeout_seconds': timeout_seconds})
+    state = WorkflowService.build_state(request, s3_client, deadline=deadline)
+    started = time.perf_counter()
+    final_state = workflow.process_resume(state)
+    return final_state, llm, time.perf_counter() - started
+
+
+def test_run_without_deadline_completes():
+    final_state, _, _ = run_with_timeout(None)
+
+    assert final_state['deadline'] is None
+    assert final_state['status'] == 'COMPLETED'
+
+
+def test_expired_deadline_aborts_before_any_llm_call():
+    final_state, llm, _ = run_with_timeout(None, deadline=time.time() - 1)
+
+    assert final_state['status'] == 'DEADLINE_EXCEEDED'
+    assert llm.stats['calls'] == 0
+
+
+def test_slow_llm_call_is_abandoned_at_the_deadline():
+    final_state, _, elapsed = run_with_timeout(0.15, latency_ms=500)
+
+    assert final_state['status'] == 'DEADLINE_EXCEEDED'
+    assert 'did not finish' in final_state['error_message']
+    assert elapsed < 0.45
+
+
+def test_node_is_skipped_when_its_typical_latency_exceeds_the_budget(monkeypatch):
+    monkeypatch.setattr(get_invoker(), 'typical_latency', lambda name: 30.0)
+
+    final_state, llm, _ = run_with_timeout(5)
+
+    assert final_state['status'] == 'DEADLINE_EXCEEDED'
+    assert final_state['error_message'].startswith('[jd_analysis]')
+    assert llm.stats['calls'] == 0
+
+
+def test_fanout_node_is_skipped_on_the_latency_of_its_parts(monkeypatch):
+    monkeypatch.setenv('CULTURAL_AGENT_FANOUT', 'true')
+    latencies = {'cultural_agent.uniqueness': 30.0}
+    monkeypatch.setattr(get_invoker(), 'typical_latency', latencies.get)
+
+    final_state, llm, _ = run_with_timeout(5)
+
+    assert final_state['status'] == 'DEADLINE_EXCEEDED'
+    assert final_state['error_message'].startswith('[cultural_agent]')
+    assert llm.stats['calls'] == 1
+
+
+def test_invoker_timeout_is_not_a_dependency_failure():
+    invoker = LLMInvoker()
+    chain = PromptTemplate.from_template("{text}") | FakeChatModel(latency_ms=300)
+
+    with pytest.raises(DeadlineExceeded) as error:
+        invoker.invoke(chain, {'text': 'hello'}, name='slow', timeout=0.05)
+
+    assert invoker.snapshot()['timed_out'] == 1
+    assert not is_dependency_failure(error.value)
+    invoker.shutdown()
+
+
+class RecordingChatModel(FakeChatModel):
+    """Fake chat model recording the timeout of each request and when it ended."""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        try:
+            return super()._generate(messages, stop, run_manager, **kwargs)
+        finally:
+            REQUESTS.append((kwargs.get('timeout'), time.perf_counter()))
+
+
+REQUESTS = []
+
+
+def test_deadline_bounds_the_request_itself():
+    invoker = LLMInvoker()
+    chain = PromptTemplate.from_template("{text}") | RecordingChatModel(latency_ms=2000)
+    REQUESTS.clear()
+
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        invoker.invoke(chain, {'text': 'hello'}, name='slow', timeout=0.1)
+    time.sleep(0.1)
+
+    # The request was given the time left and ended with it, not after its 2s latency
+    [(timeout, ended)] = REQUESTS
+    assert 0 < timeout <= 0.1
+    assert ended - started < 0.5
+    invoker.shutdown()
+
+
+def test_api_answers_504_when_the_deadline_passes():
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    app.dependency_overrides[get_s3_client] = lambda: s3_client
+    app.dependency_overrides[get_workflow] = lambda: ResumeProcessorWorkflow(
+        llm=FakeChatModel(latency_ms=500), s3_client=s3_client, dynamo_client=InMemoryDynamoClient()
+    )
+    try:
+        payload = {**build_request('candidate-2').model_dump(), 'timeout_seconds': 0.1}
+        response = TestClient(app).post(RUN_URL, json=payload)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 504
+    assert response.json()['data']['status'] == 'DEADLINE_EXCEEDED'
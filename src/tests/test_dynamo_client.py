@@ -0,0 +1,68 @@
+"""
+Tests for DynamoClient.batch_get_items against a stubbed DynamoDB resource.
+"""
+from decimal import Decimal
+
+from utils.circuit_breaker import CircuitBreaker
+from utils.dynamo_client import DynamoClient
+
+
+class StubDynamoResource:
+    """Returns the first key of each request as unprocessed once, then serves it."""
+
+    def __init__(self, table_name):
+        self.table_name = table_name
+        self.requests = []
+        self.deferred = set()
+
+    def batch_get_item(self, RequestItems):
+        request = RequestItems[self.table_name]
+        self.requests.append(request)
+        keys = request['Keys']
+        unprocessed = []
+        if keys[0]['candidate_id'] not in self.deferred:
+            self.deferred.add(keys[0]['candidate_id'])
+            unprocessed, keys = keys[:1], keys[1:]
+        response = {'Responses': {self.table_name: [{**key, 'status': 'SELECTED', 'absolute_score': Decimal('71.5')} for key in keys]}}
+        if unprocessed:
+            response['UnprocessedKeys'] = {self.table_name: {**request, 'Keys': unprocessed}}
+        return response
+
+
+def make_client():
+    # Bypass __init__, which would build a real boto3 resource
+    client = DynamoClient.__new__(DynamoClient)
+    client.table_name = 'candidates'
+    client.dynamo = StubDynamoResource('candidates')
+    client.breaker = CircuitBreaker('dynamodb')
+    return client
+
+
+def test_batch_get_items_chunks_and_retries_unprocessed_keys():
+    client = make_client()
+    keys = [{'candidate_id': f"c-{i}", 'job_id': 'job-1'} for i in range(250)]
+
+    items = client.batch_get_items(keys + keys[:10], base_backoff=0)
+
+    assert len(items) == 250
+    assert {item['candidate_id'] for item in items} == {key['candidate_id'] for key in keys}
+    # 3 chunks of at most 100 keys, each retried once for its unprocessed key
+    assert [len(request['Keys']) for request in client.dynamo.requests] == [100, 1, 100, 1, 50, 1]
+
+
+def test_batch_get_items_uses_projection_placeholders():
+    client = make_client()
+
+    client.batch_get_items([{'candidate_id': 'c-1', 'job_id': 'job-1'}], projection=['candidate_id', 'status'], base_backoff=0)
+
+    request = client.dynamo.requests[0]
+    assert request['ProjectionExpression'] == '#p0, #p1'
+    assert request['ExpressionAttributeNames'] == {'#p0': 'candidate_id', '#p1': 'status'}
+
+
+def test_batch_get_items_gives_up_after_max_retries():
+    client = make_client()
+    client.dynamo.deferred = set()
+    client.dynamo.batch_get_item = lambda RequestItems: {'Responses': {}, 'UnprocessedKeys': RequestItems}
+
+    assert client.batch_get_items([{'candidate_id': 'c-1', 'job_id': 'job-1'}], max_retries=2, base_backoff=0) is None
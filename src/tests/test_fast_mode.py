@@ -0,0 +1,122 @@
+"""
+Tests for the score-first fast analysis mode and on-demand explanations.
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.fakes import InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import build_request, load_fixture_objects
+from controllers.workflow_controller import get_dynamo_client, get_s3_client, get_workflow
+from main import app
+from services.workflow_service import WorkflowService
+from tests.test_jd_digest import RecordingChatModel
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+EXPLAIN_URL = "/api/v1/workflows/resume_processor/explain"
+
+
+@pytest.fixture
+def fast_run():
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    dynamo_client = InMemoryDynamoClient()
+    llm = RecordingChatModel()
+    workflow = ResumeProcessorWorkflow(llm=llm, s3_client=s3_client, dynamo_client=dynamo_client)
+
+    def run(candidate_id='candidate-1', analysis_detail='scores'):
+        request = build_request(candidate_id).model_copy(update={'analysis_detail': analysis_detail})
+        return request, workflow.process_resume(WorkflowService.build_state(request, s3_client))
+
+    run.s3_client, run.dynamo_client, run.llm, run.workflow = s3_client, dynamo_client, llm, workflow
+    return run
+
+
+def artifact(run, state, name):
+    return json.loads(run.s3_client.objects[f"{state['job_id']}/{state['candidate_id']}/{name}.json"])
+
+
+def test_fast_mode_asks_only_for_scores(monkeypatch, fast_run):
+    monkeypatch.setenv('EXPLAIN_STATUSES', '')
+
+    _, state = fast_run()
+
+    jd_prompt, cultural_prompt = fast_run.llm._prompts
+    assert 'Detailed Scoring' not in jd_prompt and 'Key Strengths' not in jd_prompt
+    assert 'Do not write any justification' in cultural_prompt
+    assert state['status'] == 'COMPLETED' and state['analysis_detail'] == 'scores'
+    item = next(iter(fast_run.dynamo_client.items.values()))
+    assert item['analysis_detail'] == 'scores' and item['status'] == 'IN_CONSIDERATION'
+
+
+def test_selected_candidates_are_explained_at_the_end_of_the_run(fast_run):
+    _, state = fast_run()
+
+    assert len(fast_run.llm._prompts) == 4
+    assert 'ASSIGNED SCORES' in fast_run.llm._prompts[2]
+    assert state['analysis_detail'] == 'full'
+    assert 'Detailed Scoring' in artifact(fast_run, state, 'jd_analysis')
+    cultural = artifact(fast_run, state, 'cultural_analysis')
+    assert cultural['cultural_fit_score'] == state['cultural_fit_score']
+    assert all('justification' in criterion for criterion in cultural['custom_criteria_scores'])
+    assert next(iter(fast_run.dynamo_client.items.values()))['analysis_detail'] == 'full'
+
+
+def test_full_mode_is_unchanged(fast_run):
+    _, state = fast_run(analysis_detail='full')
+
+    assert len(fast_run.llm._prompts) == 2
+    assert 'Detailed Scoring' in fast_run.llm._prompts[0]
+    assert state['analysis_detail'] == 'full'
+
+
+@pytest.fixture
+def client(fast_run):
+    app.dependency_overrides[get_s3_client] = lambda: fast_run.s3_client
+    app.dependency_overrides[get_dynamo_client] = lambda: fast_run.dynamo_client
+    app.dependency_overrides[get_workflow] = lambda: fast_run.workflow
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_explain_endpoint_keeps_the_recorded_scores(monkeypatch, fast_run, client):
+    monkeypatch.setenv('EXPLAIN_STATUSES', '')
+    request, state = fast_run()
+
+    response = client.post(EXPLAIN_URL, json=request.model_dump())
+
+    assert response.status_code == 200
+    data = response.json()['data']
+    assert data['analysis_detail'] == 'full'
+    assert (data['jd_score'], data['absolute_score']) == (state['jd_score'], state['absolute_score'])
+    assert artifact(fast_run, state, 'jd_analysis')['Normalized Score (out of 10)'] == state['jd_score']
+    assert len(fast_run.llm._prompts) == 4
+
+    # Already explained: nothing is generated again
+    assert client.post(EXPLAIN_URL, json=request.model_dump()).status_code == 200
+    assert len(fast_run.llm._prompts) == 4
+
+
+def test_explain_endpoint_explains_jd_rejections_with_their_recorded_verdict(fast_run, client):
+    fast_run.llm.jd_score, fast_run.llm.jd_verdict = 3.0, False
+    request, state = fast_run()
+    assert next(iter(fast_run.dynamo_client.items.values()))['status'] == 'JD_REJECTED'
+    # The explaining model disagrees with the recorded decision
+    fast_run.llm.jd_score, fast_run.llm.jd_verdict = 9.0, True
+
+    response = client.post(EXPLAIN_URL, json=request.model_dump())
+
+    assert response.status_code == 200
+    assert response.json()['data']['analysis_detail'] == 'full'
+    jd_analysis = artifact(fast_run, state, 'jd_analysis')
+    assert 'Detailed Scoring' in jd_analysis
+    assert jd_analysis['Verdict'] is False
+    assert (jd_analysis['Normalized Score (out of 10)'], jd_analysis['Raw Score (out of 100)']) == (3.0, 30)
+    assert len(fast_run.llm._prompts) == 2
+    assert 'cultural_analysis.json' not in ''.join(fast_run.s3_client.objects)
+
+
+def test_explain_endpoint_needs_recorded_scores(client):
+    response = client.post(EXPLAIN_URL, json=build_request('candidate-2').model_dump())
+
+    assert response.status_code == 404
@@ -0,0 +1,62 @@
+"""
+Import-time benchmark for the API entry point.
+Runs `python -X importtime -c "import main"` in a fresh interpreter and checks
+that heavy SDKs stay lazy and that startup stays within budget.
+"""
+import os
+import subprocess
+import sys
+from typing import Dict
+
+# Modules that must only be imported on first use, never by `import main`
+LAZY_MODULES = ['langchain', 'langchain_core', 'langchain_openai', 'langgraph', 'openai', 'boto3', 'botocore']
+
+# Cumulative import budget for `main`, overridable for slow CI machines
+IMPORT_TIME_BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', '1500'))
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def measure_import_times(module: str) -> Dict[str, int]:
+    """
+    Import a module in a fresh interpreter and parse the -X importtime report.
+
+    Args:
+        module: Module to import
+
+    Returns:
+        Dict mapping each imported module to its cumulative import time in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_main_does_not_import_heavy_sdks():
+    times = measure_import_times('main')
+    eager = sorted(
+        name for name in times
+        if name.split('.')[0] in LAZY_MODULES
+    )
+    assert not eager, f"Heavy modules imported eagerly by main: {eager[:10]}"
+
+
+def test_main_import_time_within_budget():
+    times = measure_import_times('main')
+    total_ms = times['main'] / 1000
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:10]
+    assert total_ms <= IMPORT_TIME_BUDGET_MS, (
+        f"`import main` took {total_ms:.0f}ms (budget {IMPORT_TIME_BUDGET_MS:.0f}ms); "
+        f"slowest imports: {slowest}"
+    )
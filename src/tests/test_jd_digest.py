@@ -0,0 +1,113 @@
+"""
+Tests for the job-level JD requirement digest.
+"""
+import json
+
+import pytest
+from pydantic import PrivateAttr
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import build_request, load_fixture_objects
+from services.workflow_service import WorkflowService
+from workflows.resume_processor.jd_digest import (
+    JDDigestCache,
+    build_jd_digest,
+    compute_jd_hash,
+    parse_degree_level,
+    parse_years
+)
+from workflows.resume_processor.nodes.jd_analysis_agent import JDAnalysisAgent
+
+
+def fixture_jd():
+    objects = load_fixture_objects()
+    return json.loads(objects[build_request('candidate-1').jd_s3_url])
+
+
+class RecordingChatModel(FakeChatModel):
+    """Fake chat model keeping the prompts it was sent."""
+    _prompts: list = PrivateAttr(default_factory=list)
+
+    def _respond(self, prompt):
+        self._prompts.append(prompt)
+        return super()._respond(prompt)
+
+
+def test_digest_keeps_requirements_and_drops_the_rest():
+    jd = fixture_jd()
+    digest = build_jd_digest(jd)
+
+    assert digest['required_skills'] == jd['required_skills']
+    assert digest['preferred_skills'] == jd['preferred_skills']
+    assert digest['experience'] == {'text': '6-10 years', 'years': {'min': 6, 'max': 10}}
+    assert digest['education']['degree_level'] == 'bachelor'
+    for dropped in ('location', 'reporting_to', 'culture_fit'):
+        assert dropped not in digest and dropped not in digest.get('other', {})
+
+
+@pytest.mark.parametrize('text, years', [
+    ('6-10 years', {'min': 6, 'max': 10}),
+    ('5+ years of backend experience', {'min': 5}),
+    ('3 to 5 yrs', {'min': 3, 'max': 5}),
+    ('Senior', None),
+    ('Worked 3 years ago; need 5+ years', {'min': 5}),
+    ('At least 4 years in payments', {'min': 4}),
+    ('Shipped our platform 2 years ago', None),
+    (4, {'min': 4})
+])
+def test_parse_years(text, years):
+    assert parse_years(text) == years
+
+
+def test_degree_level_is_the_lowest_accepted():
+    assert parse_degree_level("Master's or PhD in Statistics") == 'master'
+    assert parse_degree_level('No degree required') is None
+
+
+@pytest.mark.parametrize('text, level', [
+    ('Master degree in CS required; PhD would be a plus', 'master'),
+    ('PhD in Machine Learning; must be published', 'doctorate'),
+    ('BE in Computer Science or B.Sc. Physics', 'bachelor'),
+    ('M.S. or Ph.D. preferred', 'master'),
+    ('Must be comfortable with MS Office and made-to-order tooling', None)
+])
+def test_abbreviated_degrees_need_their_dots_or_a_degree(text, level):
+    assert parse_degree_level(text) == level
+
+
+def test_unknown_fields_are_kept_and_free_text_is_passed_through():
+    assert build_jd_digest({'title': 'SRE', 'on_call': 'Weekly rotation'})['other'] == {'on_call': 'Weekly rotation'}
+    assert build_jd_digest('Backend engineer, 5 years of Go') == {'description': 'Backend engineer, 5 years of Go'}
+
+
+def test_digest_is_built_once_per_jd_version():
+    cache = JDDigestCache()
+    jd = fixture_jd()
+
+    first = cache.get_or_build(jd)
+    assert cache.get_or_build(dict(reversed(list(jd.items())))) is first
+    cache.get_or_build({**jd, 'experience': '8+ years'})
+
+    assert cache.snapshot() == {'entries': 2, 'hits': 1, 'misses': 2}
+    assert compute_jd_hash(jd) != compute_jd_hash({**jd, 'experience': '8+ years'})
+
+
+def run_jd_agent(monkeypatch, enabled):
+    monkeypatch.setenv('JD_DIGEST_ENABLED', enabled)
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    llm = RecordingChatModel()
+    agent = JDAnalysisAgent(llm, s3_client, InMemoryDynamoClient())
+    state = agent.analyze_resume(WorkflowService.build_state(build_request('candidate-1'), s3_client))
+    assert state['next_node'] == 'router'
+    return llm
+
+
+def test_jd_prompt_consumes_the_digest(monkeypatch):
+    digest_llm = run_jd_agent(monkeypatch, 'true')
+    raw_llm = run_jd_agent(monkeypatch, 'false')
+
+    [digest_prompt], [raw_prompt] = digest_llm._prompts, raw_llm._prompts
+    assert '"years":{"min":6,"max":10}' in digest_prompt
+    assert 'Director of Engineering' not in digest_prompt
+    assert 'Director of Engineering' in raw_prompt
+    assert digest_llm.stats['input_tokens'] < raw_llm.stats['input_tokens']
@@ -0,0 +1,89 @@
+"""
+Tests for the slim workflow state and the shared job context store.
+"""
+import pytest
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import build_request, load_fixture_objects
+from services.workflow_service import WorkflowService
+from workflows.resume_processor.job_context import JOB_DOCUMENT_KEYS, get_job_documents, job_context_store
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+
+@pytest.fixture(autouse=True)
+def empty_store():
+    job_context_store.clear()
+    yield
+    job_context_store.clear()
+
+
+def test_slim_state_carries_reference_only():
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    state = WorkflowService.build_state(build_request('candidate-1'), s3_client, state_mode='slim')
+
+    assert not any(key in state for key in JOB_DOCUMENT_KEYS)
+    assert state['job_context_ref']['job_id'] == state['job_id']
+    assert 'resume_data' in state
+    assert get_job_documents(state)['jd_data']['title'] == 'Technical Lead'
+
+
+def test_job_documents_are_shared_between_candidates():
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    first = WorkflowService.build_state(build_request('candidate-1'), s3_client, state_mode='slim')
+    second = WorkflowService.build_state(build_request('candidate-2'), s3_client, state_mode='slim')
+
+    assert first['job_context_ref'] == second['job_context_ref']
+    assert get_job_documents(first) is get_job_documents(second)
+    assert len(job_context_store) == 1
+
+
+def test_changed_job_document_gets_new_version():
+    objects = load_fixture_objects()
+    s3_client = InMemoryS3Client(objects)
+    request = build_request('candidate-1')
+    before = WorkflowService.build_state(request, s3_client, state_mode='slim')
+
+    s3_client.objects[request.jd_s3_url] = b'{"title": "Staff Engineer"}'
+    after = WorkflowService.build_state(request, s3_client, state_mode='slim')
+
+    assert before['job_context_ref']['version'] != after['job_context_ref']['version']
+    assert get_job_documents(after)['jd_data'] == {'title': 'Staff Engineer'}
+
+
+def test_slim_state_runs_through_workflow():
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    llm = FakeChatModel()
+    workflow = ResumeProcessorWorkflow(llm=llm, s3_client=s3_client, dynamo_client=InMemoryDynamoClient())
+    state = WorkflowService.build_state(build_request('candidate-1'), s3_client, state_mode='slim')
+
+    final_state = workflow.process_resume(state)
+
+    assert final_state['error_message'] is None
+    assert final_state['absolute_score'] > 0
+    assert llm.stats['calls'] == 2
+
+
+def test_evicted_context_is_reloaded_for_runs_in_flight():
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    llm = FakeChatModel()
+    workflow = ResumeProcessorWorkflow(llm=llm, s3_client=s3_client, dynamo_client=InMemoryDynamoClient())
+    state = WorkflowService.build_state(build_request('candidate-1'), s3_client, state_mode='slim')
+    jd = get_job_documents(state)['jd_data']
+
+    job_context_store.clear()
+    final_state = workflow.process_resume(state)
+
+    assert final_state['status'] == 'COMPLETED'
+    assert get_job_documents(state)['jd_data'] == jd
+
+
+def test_evicted_context_is_not_reloaded_from_changed_documents():
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    request = build_request('candidate-1')
+    state = WorkflowService.build_state(request, s3_client, state_mode='slim')
+
+    job_context_store.clear()
+    s3_client.objects[request.jd_s3_url] = b'{"title": "Staff Engineer"}'
+
+    with pytest.raises(LookupError):
+        get_job_documents(state, s3_client)
@@ -0,0 +1,61 @@
+"""
+Tests for the shared LLM HTTP client, against a local keep-alive HTTP server.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services.llm_client import close_http_client, get_http_client, get_http_metrics
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    close_http_client()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    close_http_client()
+    server.shutdown()
+
+
+def test_client_is_shared_and_reuses_connections(server_url):
+    client = get_http_client()
+    assert get_http_client() is client
+
+    for _ in range(5):
+        assert client.post(f"{server_url}/v1/chat/completions", json={}).json() == {'ok': True}
+
+    metrics = get_http_metrics()
+    assert metrics['requests'] == 5
+    assert metrics['connections_opened'] == 1
+    assert metrics['status_codes'] == {200: 5}
+    assert metrics['in_flight'] == 0
+
+
+def test_metrics_endpoint_exposes_pool_metrics(server_url):
+    get_http_client().post(f"{server_url}/v1/chat/completions", json={})
+
+    metrics = TestClient(app).get('/api/v1/metrics').json()
+
+    assert metrics['llm_http']['requests'] == 1
+    assert metrics['llm_http']['pool_connections'] == 1
@@ -0,0 +1,169 @@
+"""
+Tests for hedged LLM invocation.
+"""
+import threading
+import time
+
+import pytest
+
+from services.llm_invoker import LLMInvoker
+from utils.hedging import HedgeBudget, LatencyTracker
+
+
+class ScriptedChain:
+    """
+    Chain whose n-th invocation sleeps for the n-th scripted latency and returns its index.
+
+    Streamed, the latency is spread over `chunks` chunks: the index, then zeros.
+    """
+
+    def __init__(self, latencies, chunks=10):
+        self.latencies = list(latencies)
+        self.chunks = chunks
+        self.calls = 0
+        self.closed = set()
+        self._lock = threading.Lock()
+
+    def _next(self):
+        with self._lock:
+            index = self.calls
+            self.calls += 1
+        return index, self.latencies[index] if index < len(self.latencies) else 0.005
+
+    def invoke(self, prompt_input):
+        index, latency = self._next()
+        time.sleep(latency)
+        return index
+
+    def stream(self, prompt_input):
+        index, latency = self._next()
+        sent = 0
+        try:
+            for sent in range(1, self.chunks + 1):
+                time.sleep(latency / self.chunks)
+                yield index if sent == 1 else 0
+        finally:
+            if sent < self.chunks:
+                self.closed.add(index)
+
+
+@pytest.fixture
+def invoker():
+    invoker = LLMInvoker(hedging_enabled=True, percentile=90, max_ratio=0.5, burst=1, min_samples=10)
+    yield invoker
+    invoker.shutdown()
+
+
+def warm_up(invoker, name='jd_analysis', samples=10):
+    chain = ScriptedChain([0.005] * samples)
+    for _ in range(samples):
+        invoker.invoke(chain, {}, name)
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(95) is None
+    for value in range(1, 101):
+        tracker.record(value)
+    assert tracker.percentile(50) == 50
+    assert tracker.percentile(99) == 99
+
+
+def test_hedge_budget_caps_rate():
+    budget = HedgeBudget(max_ratio=0.1, burst=1)
+    granted = 0
+    for _ in range(100):
+        budget.on_call()
+        granted += budget.try_acquire()
+    assert granted == 10
+    assert budget.snapshot()['hedge_rate'] == pytest.approx(0.1)
+
+
+def test_no_hedge_before_min_samples(invoker):
+    chain = ScriptedChain([0.05])
+    assert invoker.invoke(chain, {}, 'jd_analysis') == 0
+    assert chain.calls == 1
+    assert invoker.budget.hedges == 0
+
+
+def test_slow_call_is_hedged_and_first_result_wins(invoker):
+    warm_up(invoker)
+    chain = ScriptedChain([1.0, 0.005])
+
+    started = time.perf_counter()
+    result = invoker.invoke(chain, {}, 'jd_analysis')
+
+    assert result == 1
+    assert time.perf_counter() - started < 0.5
+    assert invoker.hedge_wins == 1
+    assert invoker.cancelled == 1
+
+
+def test_losing_attempt_is_closed(invoker):
+    warm_up(invoker)
+    chain = ScriptedChain([1.0, 0.005])
+
+    assert invoker.invoke(chain, {}, 'jd_analysis') == 1
+
+    # The primary stops at its next chunk instead of running for its full second
+    time.sleep(0.25)
+    assert chain.closed == {0}
+
+
+def test_hedge_win_records_the_latency_the_caller_saw(invoker):
+    warm_up(invoker)
+    for _ in range(10):
+        invoker._tracker('jd_analysis').record(0.1)
+
+    assert invoker.invoke(ScriptedChain([1.0, 0.005]), {}, 'jd_analysis') == 1
+
+    # The hedge took 5ms, but the caller waited for the 100ms hedge delay first
+    assert invoker.hedge_wins == 1
+    assert invoker._tracker('jd_analysis').percentile(100) > 0.1
+
+
+def test_primaries_do_not_queue_behind_the_hedge_pool():
+    invoker = LLMInvoker(hedging_enabled=True, percentile=90, max_ratio=0.0, min_samples=10, max_workers=1)
+    warm_up(invoker)
+    # Occupy the only hedge worker
+    blocker, _ = invoker._submit(ScriptedChain([0.3]), {}, 'hedge')
+
+    started = time.perf_counter()
+    assert invoker.invoke(ScriptedChain([0.005]), {}, 'jd_analysis', timeout=1.0) == 0
+
+    assert time.perf_counter() - started < 0.2
+    blocker.result()
+    invoker.shutdown()
+
+
+def test_hedge_failure_falls_back_to_primary(invoker):
+    warm_up(invoker)
+
+    class FailingHedgeChain(ScriptedChain):
+        def stream(self, prompt_input):
+            for chunk in super().stream(prompt_input):
+                if chunk == 1:
+                    raise RuntimeError("hedge failed")
+                yield chunk
+
+    assert invoker.invoke(FailingHedgeChain([0.1, 0.005]), {}, 'jd_analysis') == 0
+    assert invoker.hedge_wins == 0
+
+
+def test_exhausted_budget_waits_for_primary():
+    invoker = LLMInvoker(hedging_enabled=True, percentile=90, max_ratio=0.0, min_samples=10)
+    warm_up(invoker)
+    chain = ScriptedChain([0.1, 0.005])
+    assert invoker.invoke(chain, {}, 'jd_analysis') == 0
+    assert chain.calls == 1
+    assert invoker.budget.denied == 1
+    invoker.shutdown()
+
+
+def test_disabled_hedging_calls_inline():
+    invoker = LLMInvoker(hedging_enabled=False, min_samples=1)
+    warm_up(invoker)
+    chain = ScriptedChain([0.1])
+    assert invoker.invoke(chain, {}, 'jd_analysis') == 0
+    assert invoker._executor is None
+    assert invoker.snapshot()['latency_s']['jd_analysis']['samples'] == 11
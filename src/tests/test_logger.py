@@ -0,0 +1,92 @@
+"""
+Tests for the queue-based structured logging pipeline.
+"""
+import json
+import logging
+import queue
+
+from langchain_core.messages import AIMessage
+
+import utils.logger as logger_module
+from utils.logger import DeferredQueueHandler, JsonFormatter, Payload, PayloadSamplingFilter, configure_logging
+
+
+class CountingValue:
+    """Object that records how often it is rendered."""
+
+    def __init__(self):
+        self.renders = 0
+
+    def __str__(self):
+        self.renders += 1
+        return 'rendered'
+
+
+def make_record(msg, *args, **extra):
+    record = logging.LogRecord('test', logging.INFO, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_payload_truncates_and_uses_message_content():
+    payload = Payload(AIMessage(content='x' * 50), max_chars=10)
+
+    assert str(payload) == 'x' * 10 + '...[truncated 40 chars]'
+
+
+def test_payload_renders_dicts_compactly():
+    assert str(Payload({'score': 7, 'names': ['a', 'b']})) == '{"score":7,"names":["a","b"]}'
+
+
+def test_payload_is_not_rendered_until_the_record_is_written():
+    value = CountingValue()
+    log_queue = queue.Queue()
+    handler = DeferredQueueHandler(log_queue)
+
+    handler.handle(make_record('output: %s', Payload(value)))
+
+    assert value.renders == 0
+    assert log_queue.get_nowait().getMessage() == 'output: rendered'
+    assert value.renders == 1
+
+
+def test_sampled_out_payloads_are_replaced():
+    record = make_record('output: %s (%s)', Payload('secret'), 'kept')
+
+    PayloadSamplingFilter(sample_rate=0.0).filter(record)
+
+    assert record.getMessage() == 'output: [payload sampled out] (kept)'
+
+
+def test_full_queue_drops_records():
+    handler = DeferredQueueHandler(queue.Queue(maxsize=1))
+
+    handler.handle(make_record('first'))
+    handler.handle(make_record('second'))
+
+    assert handler.dropped == 1
+
+
+def test_json_formatter_includes_extra_fields():
+    entry = json.loads(JsonFormatter().format(make_record('hello %s', 'world', job_id='job-1')))
+
+    assert entry['message'] == 'hello world'
+    assert entry['level'] == 'INFO'
+    assert entry['job_id'] == 'job-1'
+
+
+def test_logging_is_reconfigured_when_its_environment_changes(monkeypatch):
+    configure_logging()
+    monkeypatch.setenv('LOG_LEVEL', 'DEBUG')
+    monkeypatch.setenv('LOG_FORMAT', 'text')
+    try:
+        configure_logging()
+
+        root = logging.getLogger()
+        assert root.level == logging.DEBUG
+        assert sum(isinstance(handler, DeferredQueueHandler) for handler in root.handlers) == 1
+        assert not isinstance(logger_module._listener.handlers[0].formatter, JsonFormatter)
+    finally:
+        monkeypatch.undo()
+        configure_logging()
+    assert logging.getLogger().level == logging.INFO
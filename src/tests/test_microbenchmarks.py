@@ -0,0 +1,102 @@
+"""
+Microbenchmarks for the per-candidate CPU hot path.
+Each benchmark is compared against benchmarks/baselines/microbenchmarks.json;
+see benchmarks.microbench for the threshold and how to re-record baselines.
+"""
+import json
+import logging
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from benchmarks.fakes import FakeChatModel, InMemoryS3Client, build_cultural_response, build_jd_response
+from benchmarks.microbench import check_against_baseline
+from benchmarks.throughput import build_request, load_fixture_objects
+from prompts.constants import JD_OUTPUT_FORMAT, SCORING_RUBRIC
+from prompts.cultural_agent_prompt import CULTURAL_AGENT_PROMPT
+from prompts.jd_agent_prompt import JD_AGENT_PROMPT
+from services.workflow_service import WorkflowService
+from workflows.resume_processor.resume_cache import get_rendered_resume
+from workflows.resume_processor.jd_digest import get_jd_prompt_input
+from workflows.resume_processor.nodes.absolute_rating import AbsoluteRatingNode
+from workflows.resume_processor.nodes.cultural_agent import CulturalAgent
+from workflows.resume_processor.nodes.jd_analysis_agent import JDAnalysisAgent
+
+
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    # Measure the code itself, not whatever logging pipeline other tests configured
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture(scope='module')
+def state():
+    return WorkflowService.build_state(build_request('bench-candidate'), InMemoryS3Client(load_fixture_objects()))
+
+
+def test_build_state(state):
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    request = build_request('bench-candidate')
+    check_against_baseline('build_state', lambda: WorkflowService.build_state(request, s3_client))
+
+
+def test_render_jd_prompt(state):
+    # Mirrors the prompt input built by JDAnalysisAgent.analyze_resume
+    def render():
+        return JD_AGENT_PROMPT.format(
+            resume=get_rendered_resume(state),
+            job_description=get_jd_prompt_input(state['jd_data']),
+            scoring_rubric=json.dumps(SCORING_RUBRIC, indent=2),
+            output_format=json.dumps(JD_OUTPUT_FORMAT, indent=2)
+        )
+    check_against_baseline('render_jd_prompt', render)
+
+
+def test_render_cultural_prompt(state):
+    # Mirrors the prompt input built by CulturalAgent.analyze_cultural_fit
+    def render():
+        return CULTURAL_AGENT_PROMPT.format(
+            resume_json=get_rendered_resume(state),
+            core_values_json=json.dumps(state['core_values_data'], indent=2),
+            uniqueness_definition=json.dumps(state['uniqueness_data']),
+            custom_criteria=json.dumps(state['custom_criteria_data'], indent=2)
+        )
+    check_against_baseline('render_cultural_prompt', render)
+
+
+def test_parse_jd_analysis_result():
+    agent = JDAnalysisAgent(FakeChatModel())
+    message = AIMessage(content=json.dumps(build_jd_response(7.5, skills=40), indent=2))
+    check_against_baseline('parse_jd_analysis_result', lambda: agent._parse_analysis_result(message))
+
+
+def test_parse_cultural_analysis_result():
+    agent = CulturalAgent(FakeChatModel())
+    criteria = [f"Criterion {i}" for i in range(20)]
+    message = AIMessage(content=json.dumps(build_cultural_response(7.0, 4.0, criteria), indent=2))
+    check_against_baseline('parse_cultural_analysis_result', lambda: agent._parse_analysis_result(message))
+
+
+def test_calculate_weighted_score(state):
+    node = AbsoluteRatingNode()
+    scored_state = {
+        **state,
+        'jd_score': 7.5,
+        'cultural_fit_score': 7.0,
+        'uniqueness_score': 4.0,
+        'custom_criteria_scores': build_cultural_response(7.0, 4.0, ['Past Success', 'Diversity Hiring'])['custom_criteria_scores']
+    }
+    check_against_baseline('calculate_weighted_score', lambda: node._calculate_weighted_score(scored_state, state['weights']))
+
+
+def test_serialize_analysis_artifacts():
+    # Both agents persist their parsed analysis with json.dumps(indent=2)
+    jd_analysis = build_jd_response(7.5, skills=40)
+    cultural_analysis = build_cultural_response(7.0, 4.0, [f"Criterion {i}" for i in range(20)])
+
+    def serialize():
+        json.dumps(jd_analysis, indent=2)
+        json.dumps(cultural_analysis, indent=2)
+    check_against_baseline('serialize_analysis_artifacts', serialize)
@@ -0,0 +1,116 @@
+"""
+Tests for on-demand run profiles and the profile endpoints.
+"""
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import JOB_ID, build_request, load_fixture_objects
+from controllers.workflow_controller import get_s3_client, get_workflow
+from main import app
+from utils.profiling import RunProfiler, get_profile_path, list_profiles, prune_profiles, should_profile
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+RUN_URL = "/api/v1/workflows/resume_processor/run"
+PROFILES_URL = "/api/v1/profiles"
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('PROFILE_DIR', str(tmp_path))
+    monkeypatch.setenv('PROFILE_SAMPLE_RATE', '0')
+    return tmp_path
+
+
+@pytest.fixture
+def client(profile_dir):
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    app.dependency_overrides[get_s3_client] = lambda: s3_client
+    app.dependency_overrides[get_workflow] = lambda: ResumeProcessorWorkflow(
+        llm=FakeChatModel(latency_ms=20), s3_client=s3_client, dynamo_client=InMemoryDynamoClient()
+    )
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        [str(i) for i in range(100)]
+
+
+def test_header_requires_profiling_enabled(monkeypatch):
+    monkeypatch.setenv('PROFILE_SAMPLE_RATE', '0')
+    monkeypatch.setenv('PROFILING_ENABLED', 'false')
+    assert not should_profile('true')
+
+    monkeypatch.setenv('PROFILING_ENABLED', 'true')
+    assert should_profile('true')
+    assert not should_profile(None)
+
+    monkeypatch.setenv('PROFILE_SAMPLE_RATE', '1')
+    assert should_profile(None)
+
+
+def test_profiler_writes_cpu_and_memory_profiles(profile_dir):
+    with RunProfiler('job/1', 'candidate-1', interval=0.001) as profiler:
+        busy_wait(0.1)
+        payload = [bytearray(1024) for _ in range(1000)]
+    del payload
+
+    job_part, candidate_part, stamp = profiler.profile_id.split('/')
+    assert job_part == 'job_1'
+    folded = (profile_dir / job_part / candidate_part / f"{stamp}.folded").read_text()
+    summary = json.loads((profile_dir / job_part / candidate_part / f"{stamp}.json").read_text())
+
+    assert 'busy_wait' in folded
+    assert summary['samples'] > 0
+    assert any('busy_wait' in row['function'] for row in summary['top_functions']['cumulative'])
+    assert summary['memory']['traced'] and summary['memory']['scope'] == 'process'
+    assert summary['memory']['peak_bytes'] >= 1000 * 1024
+
+
+def test_profiled_run_is_listed_and_downloadable(client, monkeypatch):
+    monkeypatch.setenv('PROFILING_ENABLED', 'true')
+
+    response = client.post(RUN_URL, json=build_request('candidate-1').model_dump(), headers={'X-Profile': 'true'})
+    assert response.status_code == 200
+    profile_id = response.headers['X-Profile-Id']
+
+    listed = client.get(PROFILES_URL, params={'job_id': JOB_ID}).json()['profiles']
+    assert {profile['name'] for profile in listed} == {f"{profile_id.split('/')[-1]}.folded", f"{profile_id.split('/')[-1]}.json"}
+
+    summary = client.get(f"{PROFILES_URL}/{profile_id}.json")
+    assert summary.status_code == 200
+    assert summary.json()['candidate_id'] == 'candidate-1'
+
+
+def test_unprofiled_run_writes_nothing(client, profile_dir):
+    response = client.post(RUN_URL, json=build_request('candidate-2').model_dump(), headers={'X-Profile': 'true'})
+
+    assert 'X-Profile-Id' not in response.headers
+    assert list_profiles() == []
+
+
+def test_download_rejects_paths_outside_profiles(client, profile_dir):
+    (profile_dir.parent / 'secret.json').write_text('{}')
+
+    assert get_profile_path('..', '..', 'secret.json') is None
+    assert client.get(f"{PROFILES_URL}/job/candidate/..%2Fsecret.json").status_code == 404
+
+
+def test_only_the_newest_profiles_are_kept(profile_dir, monkeypatch):
+    monkeypatch.setenv('PROFILE_MAX_RUNS', '2')
+    profile_ids = []
+    for candidate_id in ['candidate-1', 'candidate-2', 'candidate-2']:
+        with RunProfiler(JOB_ID, candidate_id, memory=False) as profiler:
+            pass
+        profile_ids.append(profiler.profile_id)
+
+    kept = {f"{profile['job_id']}/{profile['candidate_id']}/{profile['name']}" for profile in list_profiles()}
+    assert kept == {f"{profile_id}{extension}" for profile_id in profile_ids[1:] for extension in ('.folded', '.json')}
+    assert not (profile_dir / JOB_ID / 'candidate-1').exists()
+    assert prune_profiles(0) == 0
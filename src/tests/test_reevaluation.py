@@ -0,0 +1,123 @@
+"""
+Tests for incremental re-evaluation driven by node input fingerprints.
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import build_request, load_fixture_objects
+from controllers.workflow_controller import get_dynamo_client, get_s3_client, get_workflow
+from main import app
+from services.workflow_service import WorkflowService
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+REEVALUATE_URL = "/api/v1/workflows/resume_processor/reevaluate"
+
+
+@pytest.fixture
+def env():
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    dynamo_client = InMemoryDynamoClient()
+    llm = FakeChatModel()
+    workflow = ResumeProcessorWorkflow(llm=llm, s3_client=s3_client, dynamo_client=dynamo_client)
+
+    def run(request, reevaluate=True):
+        state = WorkflowService.build_state(request, s3_client)
+        if reevaluate:
+            state['stored_results'] = WorkflowService.load_stored_results(request, dynamo_client)
+        return workflow.process_resume(state)
+
+    run.s3_client, run.dynamo_client, run.llm, run.workflow = s3_client, dynamo_client, llm, workflow
+    return run
+
+
+def edit_document(s3_client, key, edit):
+    s3_client.objects[key] = json.dumps(edit(json.loads(s3_client.objects[key]))).encode('utf-8')
+
+
+def test_first_run_records_the_fingerprints(env):
+    env(build_request('candidate-1'), reevaluate=False)
+
+    item = next(iter(env.dynamo_client.items.values()))
+    assert item['jd_fingerprint'] and item['cultural_fingerprint']
+    assert item['jd_fingerprint'] != item['cultural_fingerprint']
+
+
+def test_weight_change_reuses_every_llm_result(env):
+    request = build_request('candidate-1')
+    first = env(request, reevaluate=False)
+    weights = {**request.weights, 'jd_score_weight': request.weights['jd_score_weight'] + 1.0}
+
+    final_state = env(request.model_copy(update={'weights': weights}))
+
+    assert env.llm.stats['calls'] == 2
+    assert final_state['reused_nodes'] == ['jd_analysis', 'cultural_agent']
+    assert final_state['jd_score'] == first['jd_score']
+    assert final_state['absolute_score'] != first['absolute_score']
+
+
+def test_custom_criteria_change_reruns_only_the_cultural_agent(env):
+    request = build_request('candidate-1')
+    env(request, reevaluate=False)
+    edit_document(env.s3_client, request.custom_criteria_s3_url, lambda criteria: {**criteria, 'revision': 2})
+
+    final_state = env(request)
+
+    assert env.llm.stats['calls'] == 3
+    assert final_state['reused_nodes'] == ['jd_analysis']
+    assert final_state['status'] == 'COMPLETED'
+
+
+def test_jd_change_reruns_only_the_jd_agent(env):
+    request = build_request('candidate-1')
+    env(request, reevaluate=False)
+    edit_document(env.s3_client, request.jd_s3_url, lambda jd: {**jd, 'experience': '8+ years'})
+
+    final_state = env(request)
+
+    assert env.llm.stats['calls'] == 3
+    assert final_state['reused_nodes'] == ['cultural_agent']
+
+
+def test_prompt_settings_changes_rerun_the_nodes_they_affect(monkeypatch, env):
+    request = build_request('candidate-1')
+    env(request, reevaluate=False)
+
+    monkeypatch.setenv('RESUME_TOKEN_BUDGET', '500')
+    assert not env(request).get('reused_nodes')
+
+    env.workflow.cultural_agent.fanout = True
+    assert env(request)['reused_nodes'] == ['jd_analysis']
+
+    monkeypatch.setenv('JD_DIGEST_ENABLED', 'false')
+    assert not env(request).get('reused_nodes')
+
+
+def test_score_only_results_are_not_reused_for_a_full_run(monkeypatch, env):
+    monkeypatch.setenv('EXPLAIN_STATUSES', '')
+    request = build_request('candidate-1')
+    env(request.model_copy(update={'analysis_detail': 'scores'}), reevaluate=False)
+
+    final_state = env(request.model_copy(update={'analysis_detail': 'full'}))
+
+    assert env.llm.stats['calls'] == 4
+    assert not final_state.get('reused_nodes')
+
+
+def test_reevaluate_endpoint_reports_the_reused_nodes(env):
+    app.dependency_overrides[get_s3_client] = lambda: env.s3_client
+    app.dependency_overrides[get_dynamo_client] = lambda: env.dynamo_client
+    app.dependency_overrides[get_workflow] = lambda: env.workflow
+    try:
+        payload = build_request('candidate-3').model_dump()
+        client = TestClient(app)
+        first = client.post(REEVALUATE_URL, json=payload).json()['data']
+        second = client.post(REEVALUATE_URL, json=payload).json()['data']
+    finally:
+        app.dependency_overrides.clear()
+
+    assert 'reused_nodes' not in first
+    assert second['reused_nodes'] == ['jd_analysis', 'cultural_agent']
+    assert env.llm.stats['calls'] == 2
@@ -0,0 +1,82 @@
+"""
+Tests for the rendered resume cache shared by the agents.
+"""
+import json
+
+import pytest
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import build_request, load_fixture_objects
+from services.workflow_service import WorkflowService
+from workflows.resume_processor.resume_cache import (
+    RenderedResumeCache,
+    get_rendered_resume,
+    render_resume,
+    resume_cache
+)
+from workflows.resume_processor.token_budget import budgeted_resume_cache
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    resume_cache.clear()
+    budgeted_resume_cache.clear()
+    yield
+    resume_cache.clear()
+    budgeted_resume_cache.clear()
+
+
+def test_render_is_compact_and_normalized():
+    rendered = render_resume({'name': '  Jane   Doe\n', 'links': [], 'summary': None, 'skills': ['Go', ' ', 'Rust']})
+
+    assert rendered == '{"name":"Jane Doe","skills":["Go","Rust"]}'
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    first = RenderedResumeCache(directory=str(tmp_path))
+    rendered = first.get_or_render('candidate-1', 'v1', {'name': 'Jane'})
+
+    second = RenderedResumeCache(directory=str(tmp_path))
+    assert second.get_or_render('candidate-1', 'v1', None) == rendered
+    assert second.snapshot()['disk_hits'] == 1
+
+
+def test_lru_evicts_oldest_entry():
+    cache = RenderedResumeCache(max_entries=2)
+    for candidate_id in ('c-1', 'c-2', 'c-3'):
+        cache.get_or_render(candidate_id, 'v1', {'id': candidate_id})
+    cache.get_or_render('c-1', 'v1', {'id': 'c-1'})
+
+    assert len(cache) == 2
+    assert cache.snapshot()['misses'] == 4
+
+
+def test_resume_is_rendered_once_per_candidate_across_agents_and_jobs():
+    objects = load_fixture_objects()
+    s3_client = InMemoryS3Client(objects)
+    workflow = ResumeProcessorWorkflow(llm=FakeChatModel(), s3_client=s3_client, dynamo_client=InMemoryDynamoClient())
+    before, budgeted_before = resume_cache.snapshot(), budgeted_resume_cache.snapshot()
+
+    for job_id in ('job-1', 'job-2'):
+        request = build_request('candidate-1').model_copy(update={'job_id': job_id})
+        workflow.process_resume(WorkflowService.build_state(request, s3_client))
+
+    # Two agents in two jobs with the same JD share one rendering, fitted to the budget once
+    after, budgeted_after = resume_cache.snapshot(), budgeted_resume_cache.snapshot()
+    assert after['misses'] - before['misses'] == 1
+    assert budgeted_after['misses'] - budgeted_before['misses'] == 1
+    assert budgeted_after['hits'] - budgeted_before['hits'] == 3
+
+
+def test_changed_resume_is_rendered_again():
+    objects = load_fixture_objects()
+    s3_client = InMemoryS3Client(objects)
+    request = build_request('candidate-1')
+    before = get_rendered_resume(WorkflowService.build_state(request, s3_client))
+
+    s3_client.objects[request.resume_s3_url] = json.dumps({'name': 'Updated'}).encode('utf-8')
+    after = get_rendered_resume(WorkflowService.build_state(request, s3_client))
+
+    assert before != after
+    assert after == '{"name":"Updated"}'
@@ -0,0 +1,102 @@
+"""
+Tests for the production server settings, warm-up and the health endpoints.
+"""
+import signal
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import server
+import utils.admission
+import utils.lifecycle
+from main import app
+from utils.admission import AdmissionController
+from utils.lifecycle import Lifecycle
+
+LIVE_URL = "/api/v1/health/live"
+READY_URL = "/api/v1/health/ready"
+
+
+@pytest.fixture
+def lifecycle(monkeypatch):
+    lifecycle = Lifecycle()
+    monkeypatch.setattr(utils.lifecycle, '_lifecycle', lifecycle)
+    return lifecycle
+
+
+def test_readiness_follows_the_lifecycle(lifecycle):
+    client = TestClient(app)
+
+    assert client.get(READY_URL).status_code == 503
+    lifecycle.mark_ready()
+    ready = client.get(READY_URL)
+    assert ready.status_code == 200 and ready.json()['state'] == 'ready'
+    lifecycle.mark_draining()
+    assert client.get(READY_URL).status_code == 503
+    assert client.get(LIVE_URL).json() == {'status': 'alive'}
+
+
+def test_warm_up_times_each_step_and_survives_failures(lifecycle):
+    built = []
+
+    def fail():
+        raise RuntimeError('no credentials')
+
+    lifecycle.warm_up({'workflow': lambda: built.append('workflow'), 's3_client': fail})
+
+    assert built == ['workflow']
+    assert set(lifecycle.warmup_ms) == {'workflow'}
+    assert lifecycle.warmup_errors == {'s3_client': 'no credentials'}
+
+
+def test_warm_up_can_be_disabled(monkeypatch, lifecycle):
+    monkeypatch.setenv('SERVER_WARMUP', 'false')
+
+    lifecycle.warm_up({'workflow': pytest.fail})
+
+    assert lifecycle.warmup_ms == {}
+
+
+def test_lifespan_is_ready_while_serving_and_drains_at_shutdown(monkeypatch, lifecycle):
+    monkeypatch.setattr(main, 'load_config', lambda: None)
+    monkeypatch.setattr(main, 'warm_up', lambda: None)
+    monkeypatch.setattr(utils.admission, '_controller', AdmissionController(max_in_flight=1))
+
+    with TestClient(app) as client:
+        assert client.get(READY_URL).status_code == 200
+
+    assert lifecycle.state == 'draining'
+
+
+def test_sigterm_marks_draining_before_the_server_stops(lifecycle):
+    received = []
+    original = signal.signal(signal.SIGTERM, lambda signum, frame: received.append(signum))
+    try:
+        lifecycle.mark_ready()
+        restore = lifecycle.drain_on_sigterm(grace_seconds=0.1)
+
+        signal.raise_signal(signal.SIGTERM)
+        assert lifecycle.state == 'draining' and received == []
+        time.sleep(0.3)
+        assert received == [signal.SIGTERM]
+
+        restore()
+        signal.raise_signal(signal.SIGTERM)
+        assert received == [signal.SIGTERM, signal.SIGTERM]
+    finally:
+        signal.signal(signal.SIGTERM, original)
+
+
+def test_server_options_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv('PORT', '8000')
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    monkeypatch.setenv('SERVER_PRELOAD', 'false')
+
+    options = server.build_options()
+
+    assert options['bind'] == '0.0.0.0:8000'
+    assert options['workers'] == 3
+    assert not options['preload_app']
+    assert options['worker_class'] == 'uvicorn_worker.UvicornWorker'
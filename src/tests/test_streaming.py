@@ -0,0 +1,157 @@
+"""
+Tests for streamed JD analyses and the background writes that finish them.
+"""
+import json
+import threading
+import time
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import build_request, load_fixture_objects
+from services.workflow_service import WorkflowService
+from utils.background import BackgroundWriter, get_background_writer
+from utils.json_stream import StreamingJSONObject
+from workflows.resume_processor.nodes.jd_analysis_agent import JDAnalysisAgent
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+
+def test_fields_are_parsed_as_soon_as_they_complete():
+    parser = StreamingJSONObject()
+
+    assert parser.feed('```json\n{"score": 7') == {}
+    assert parser.feed('.5, "note": "a, b} \\"c\\"", "items": [1, {"x"') == {'score': 7.5, 'note': 'a, b} "c"'}
+    assert parser.feed(': 2}]}\n```') == {'items': [1, {'x': 2}]}
+    assert parser.complete
+    assert json.loads(parser.text[8:-4]) == parser.fields
+
+
+class ScoresLastChatModel(FakeChatModel):
+    """Fake chat model returning its fields in reverse order."""
+
+    def _respond(self, prompt):
+        payload = json.loads(super()._respond(prompt))
+        return json.dumps(dict(reversed(list(payload.items()))))
+
+
+class ScoresFirstThenBrokenChatModel(FakeChatModel):
+    """Fake chat model whose completion breaks off after the scores."""
+
+    def _respond(self, prompt):
+        payload = json.loads(super()._respond(prompt))
+        return json.dumps(payload)[:120]
+
+
+def streamed_agent(llm):
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    dynamo_client = InMemoryDynamoClient()
+    agent = JDAnalysisAgent(llm, s3_client, dynamo_client, streaming=True)
+    return agent, s3_client, dynamo_client
+
+
+def test_jd_agent_routes_on_the_streamed_scores():
+    agent, s3_client, dynamo_client = streamed_agent(FakeChatModel(latency_ms=400))
+    state = WorkflowService.build_state(build_request('candidate-1'), s3_client)
+
+    started = time.perf_counter()
+    state = agent.analyze_resume(state)
+    elapsed = time.perf_counter() - started
+
+    assert state['next_node'] == 'router' and state['jd_score'] == 7.5
+    assert elapsed < 0.2
+    item = next(iter(dynamo_client.items.values()))
+    assert item['status'] == 'JD_APPROVED' and 'jd_analysis_url' not in item
+    assert state['jd_analysis_pending'] and not state.get('jd_analysis_url')
+
+    assert get_background_writer().flush(timeout=5)
+    analysis_url = next(iter(dynamo_client.items.values()))['jd_analysis_url']
+    assert 'Detailed Scoring' in json.loads(s3_client.objects[analysis_url])
+
+
+def test_scores_streamed_last_are_still_recorded():
+    agent, s3_client, dynamo_client = streamed_agent(ScoresLastChatModel())
+
+    state = agent.analyze_resume(WorkflowService.build_state(build_request('candidate-1'), s3_client))
+
+    assert state['next_node'] == 'router' and state['jd_score'] == 7.5
+    assert get_background_writer().flush(timeout=5)
+    analysis_url = next(iter(dynamo_client.items.values()))['jd_analysis_url']
+    assert 'Detailed Scoring' in json.loads(s3_client.objects[analysis_url])
+
+
+def test_failed_stream_leaves_no_analysis_url():
+    agent, s3_client, dynamo_client = streamed_agent(ScoresFirstThenBrokenChatModel())
+
+    state = agent.analyze_resume(WorkflowService.build_state(build_request('candidate-1'), s3_client))
+
+    assert state['next_node'] == 'router' and state['jd_analysis_pending']
+    get_background_writer().flush(timeout=5)
+    assert not any(key.endswith('jd_analysis.json') for key in s3_client.objects)
+    assert 'jd_analysis_url' not in next(iter(dynamo_client.items.values()))
+
+
+def test_hung_stream_does_not_hold_a_background_writer(monkeypatch):
+    monkeypatch.setenv('JD_STREAM_TIMEOUT', '0.05')
+    agent, s3_client, _ = streamed_agent(FakeChatModel(latency_ms=2000))
+    failed = get_background_writer().snapshot()['failed']
+
+    state = agent.analyze_resume(WorkflowService.build_state(build_request('candidate-1'), s3_client))
+
+    assert state['next_node'] == 'router'
+    assert get_background_writer().flush(timeout=1)
+    assert get_background_writer().snapshot()['failed'] == failed + 1
+    assert not any(key.endswith('jd_analysis.json') for key in s3_client.objects)
+
+
+def test_streamed_workflow_completes(monkeypatch):
+    monkeypatch.setenv('JD_STREAMING', 'true')
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    dynamo_client = InMemoryDynamoClient()
+    workflow = ResumeProcessorWorkflow(llm=FakeChatModel(), s3_client=s3_client, dynamo_client=dynamo_client)
+
+    final_state = workflow.process_resume(WorkflowService.build_state(build_request('candidate-2'), s3_client))
+
+    assert final_state['status'] == 'COMPLETED'
+    assert final_state['absolute_score'] is not None
+    assert get_background_writer().flush(timeout=5)
+    item = next(iter(dynamo_client.items.values()))
+    assert item['jd_analysis_url'] in s3_client.objects
+    assert item['analysis_detail'] == 'full' and item['jd_fingerprint'] == final_state['fingerprints']['jd_analysis']
+
+
+class FailingAnalysisS3Client(InMemoryS3Client):
+    """In-memory S3 client failing to store JD analyses."""
+
+    def put_object(self, key, data):
+        if key.endswith('jd_analysis.json'):
+            return False
+        return super().put_object(key, data)
+
+
+def test_failed_background_save_leaves_the_analysis_to_explain(monkeypatch):
+    monkeypatch.setenv('JD_STREAMING', 'true')
+    s3_client = FailingAnalysisS3Client(load_fixture_objects())
+    dynamo_client = InMemoryDynamoClient()
+    workflow = ResumeProcessorWorkflow(llm=FakeChatModel(), s3_client=s3_client, dynamo_client=dynamo_client)
+
+    final_state = workflow.process_resume(WorkflowService.build_state(build_request('candidate-3'), s3_client))
+    get_background_writer().flush(timeout=5)
+
+    assert final_state['status'] == 'COMPLETED'
+    item = next(iter(dynamo_client.items.values()))
+    assert item['analysis_detail'] == 'scores'
+    assert 'jd_analysis_url' not in item and 'jd_fingerprint' not in item
+
+
+def test_flush_waits_for_pending_writes_and_counts_failures():
+    writer = BackgroundWriter(max_workers=2)
+    release = threading.Event()
+
+    def fail():
+        raise ValueError('boom')
+
+    writer.submit('slow', release.wait)
+    writer.submit('failing', fail)
+    assert not writer.flush(timeout=0.05)
+
+    release.set()
+    writer.shutdown(timeout=5)
+    assert writer.snapshot() == {'pending': 0, 'submitted': 2, 'failed': 1}
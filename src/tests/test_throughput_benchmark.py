@@ -0,0 +1,53 @@
+"""
+Smoke tests for the end-to-end throughput benchmark harness.
+Runs a handful of candidates through the workflow and the app with in-process fakes.
+"""
+import json
+import os
+
+from benchmarks.fakes import FakeChatModel
+from benchmarks.throughput import main, percentile, run_app_benchmark, run_workflow_benchmark
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_workflow_benchmark_reports_node_breakdown():
+    llm = FakeChatModel(latency_ms=1, jitter_ms=1, seed=7)
+    results = run_workflow_benchmark(llm, runs=4, concurrency=2)
+
+    assert results['runs'] == 4
+    assert results['statuses'] == {'IN_CONSIDERATION': 4}
+    assert set(results['nodes']) >= {'build_state', 'jd_analysis', 'router', 'cultural_agent', 'absolute_rating'}
+    assert results['llm']['calls'] == 8
+    assert results['p50_ms'] <= results['p95_ms'] <= results['p99_ms']
+
+
+def test_jd_rejection_skips_cultural_agent():
+    llm = FakeChatModel(jd_score=2.0, jd_verdict=False)
+    results = run_workflow_benchmark(llm, runs=2, concurrency=1)
+
+    assert 'cultural_agent' not in results['nodes']
+    assert results['llm']['calls'] == 2
+
+
+def test_app_benchmark_serves_requests():
+    llm = FakeChatModel()
+    results = run_app_benchmark(llm, runs=3, concurrency=3)
+
+    assert results['http_statuses'] == {'200': 3}
+    assert results['throughput_per_s'] > 0
+
+
+def test_main_writes_results_json(tmp_path):
+    output = os.path.join(tmp_path, 'results.json')
+    main(['--runs', '2', '--concurrency', '2', '--output', output])
+
+    with open(output) as f:
+        report = json.load(f)
+    assert report['config']['runs'] == 2
+    assert report['results']['runs'] == 2
@@ -0,0 +1,96 @@
+"""
+Tests for the token budget applied to the resume before prompting.
+"""
+import json
+
+import pytest
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import JOB_ID, build_request, load_fixture_objects
+from services.workflow_service import WorkflowService
+from workflows.resume_processor.resume_cache import render_resume
+from workflows.resume_processor.token_budget import (
+    OMITTED_KEY, budgeted_resume_cache, count_tokens, fit_resume_to_budget, get_budgeted_resume
+)
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+JD = {'title': 'Backend Lead', 'required_skills': ['Java', 'Kafka', 'Kubernetes', 'microservices']}
+
+
+def academic_cv(publications=200):
+    return {
+        'name': 'Jane Doe',
+        'summary': 'Backend engineer building Java microservices.',
+        'skills': ['Java', 'Kafka'],
+        'experience': [{'company': 'Acme', 'responsibilities': ['Built Java microservices on Kubernetes with Kafka.']}],
+        'publications': [
+            {'title': f"On the migratory patterns of songbirds, part {i}", 'venue': 'Journal of Ornithology', 'year': 2000 + i % 20}
+            for i in range(publications)
+        ]
+    }
+
+
+def test_resume_within_budget_is_untouched():
+    resume = academic_cv(publications=2)
+    rendered, report = fit_resume_to_budget(resume, JD, budget=100000)
+
+    assert rendered == render_resume(resume)
+    assert report is None
+
+
+def test_least_relevant_entries_are_dropped_first():
+    resume = academic_cv()
+    budget = count_tokens(render_resume(academic_cv(publications=10)))
+
+    rendered, report = fit_resume_to_budget(resume, JD, budget)
+    trimmed = json.loads(rendered)
+
+    assert count_tokens(rendered) <= budget
+    assert report['original_tokens'] > budget >= report['final_tokens']
+    assert trimmed['experience'] == resume['experience']
+    assert trimmed['skills'] == resume['skills']
+    assert len(trimmed['publications']) < 200
+    assert {entry['section'] for entry in report['dropped']} == {'publications'}
+    assert trimmed[OMITTED_KEY] == {'publications': f"{len(report['dropped'])} entries"}
+
+
+def test_dropped_entries_are_recorded_in_artifacts(monkeypatch):
+    objects = load_fixture_objects()
+    request = build_request('candidate-1')
+    resume = json.loads(objects[request.resume_s3_url])
+    resume['publications'] = academic_cv()['publications']
+    objects[request.resume_s3_url] = json.dumps(resume).encode('utf-8')
+    monkeypatch.setenv('RESUME_TOKEN_BUDGET', str(count_tokens(render_resume(resume)) // 2))
+
+    s3_client = InMemoryS3Client(objects)
+    workflow = ResumeProcessorWorkflow(llm=FakeChatModel(), s3_client=s3_client, dynamo_client=InMemoryDynamoClient())
+    final_state = workflow.process_resume(WorkflowService.build_state(request, s3_client))
+
+    assert final_state['resume_truncation']['dropped']
+    for artifact in ('jd_analysis.json', 'cultural_analysis.json'):
+        saved = json.loads(s3_client.objects[f"{JOB_ID}/candidate-1/{artifact}"])
+        assert saved['resume_truncation'] == final_state['resume_truncation']
+
+
+@pytest.mark.parametrize('budget', [0, -1])
+def test_non_positive_budget_disables_trimming(budget):
+    rendered, report = fit_resume_to_budget(academic_cv(), JD, budget)
+
+    assert report is None
+    assert len(json.loads(rendered)['publications']) == 200
+
+
+def test_budgeted_resume_is_fitted_once_per_budget(monkeypatch):
+    state = {'candidate_id': 'candidate-budget', 'resume_data': academic_cv()}
+    budget = count_tokens(render_resume(academic_cv(publications=10)))
+    monkeypatch.setenv('RESUME_TOKEN_BUDGET', str(budget))
+    before = budgeted_resume_cache.snapshot()
+
+    first = get_budgeted_resume(state, {'jd_data': JD})
+    assert get_budgeted_resume(state, {'jd_data': JD}) == first
+    monkeypatch.setenv('RESUME_TOKEN_BUDGET', str(budget * 2))
+    wider, _ = get_budgeted_resume(state, {'jd_data': JD})
+
+    after = budgeted_resume_cache.snapshot()
+    assert (after['hits'] - before['hits'], after['misses'] - before['misses']) == (1, 2)
+    assert first[1]['dropped'] and len(wider) > len(first[0])
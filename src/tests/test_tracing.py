@@ -0,0 +1,106 @@
+"""
+Tests for per-run traces of the resume processor workflow.
+"""
+import json
+
+import pytest
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import build_request, load_fixture_objects
+from services.workflow_service import WorkflowService
+from tests.test_dynamo_client import make_client
+from utils.tracing import OtlpHttpExporter, get_tracer, reset_tracer, span, start_trace
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / 'traces.jsonl'
+    monkeypatch.setenv('TRACE_EXPORTER', 'jsonl')
+    monkeypatch.setenv('TRACE_FILE', str(path))
+    reset_tracer()
+    yield path
+    reset_tracer()
+
+
+def read_traces(path):
+    get_tracer().flush()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def run_workflow(candidate_id='candidate-1', fanout=None):
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    workflow = ResumeProcessorWorkflow(llm=FakeChatModel(), s3_client=s3_client, dynamo_client=InMemoryDynamoClient())
+    if fanout is not None:
+        workflow.cultural_agent.fanout = fanout
+    return workflow.process_resume(WorkflowService.build_state(build_request(candidate_id), s3_client))
+
+
+def test_run_is_traced_as_a_waterfall(trace_file):
+    final_state = run_workflow()
+
+    [trace] = read_traces(trace_file)
+    spans = {span['name']: span for span in trace['spans']}
+    assert trace['trace_id'] == final_state['trace_id']
+    assert trace['attributes']['candidate_id'] == 'candidate-1'
+    assert [span['name'] for span in trace['spans'] if span['name'].startswith('node.')] == [
+        'node.jd_analysis', 'node.router', 'node.cultural_agent', 'node.absolute_rating'
+    ]
+
+    root_id = spans['process_resume']['span_id']
+    assert all(spans[name]['parent_id'] == root_id for name in spans if name.startswith('node.'))
+    llm_spans = [span for span in trace['spans'] if span['name'] == 'llm']
+    assert {span['attributes']['agent'] for span in llm_spans} == {'jd_analysis', 'cultural_agent'}
+    chain_span = spans['chain.invoke']
+    assert chain_span['attributes']['input_tokens'] > 0
+    assert chain_span['parent_id'] in {span['span_id'] for span in llm_spans}
+    assert all(span['offset_ms'] >= 0 for span in trace['spans'])
+
+
+def test_fanout_calls_nest_under_the_cultural_node(trace_file):
+    run_workflow(fanout=True)
+
+    [trace] = read_traces(trace_file)
+    node_id = next(span['span_id'] for span in trace['spans'] if span['name'] == 'node.cultural_agent')
+    part_spans = [span for span in trace['spans'] if span['attributes'].get('agent', '').startswith('cultural_agent.')]
+    assert len(part_spans) == 4
+    assert all(span['parent_id'] == node_id for span in part_spans)
+
+
+def test_dynamo_retries_are_recorded(trace_file):
+    client = make_client()
+    with start_trace('batch'):
+        client.batch_get_items([{'candidate_id': f"c{i}", 'job_id': 'job-1'} for i in range(3)])
+
+    [trace] = read_traces(trace_file)
+    calls = [span for span in trace['spans'] if span['name'] == 'dynamodb.batch_get_item']
+    assert [call['attributes']['attempt'] for call in calls] == [0, 1]
+    assert calls[0]['attributes']['unprocessed_keys'] == 1
+
+
+def test_tracing_is_disabled_by_default(monkeypatch):
+    monkeypatch.delenv('TRACE_EXPORTER', raising=False)
+    reset_tracer()
+    try:
+        final_state = run_workflow()
+        with span('outside') as outside:
+            outside.set_attribute('ignored', True)
+    finally:
+        reset_tracer()
+
+    assert 'trace_id' not in final_state
+    assert outside.trace_id is None
+
+
+def test_otlp_payload_keeps_the_span_tree(trace_file):
+    with start_trace('root') as root:
+        with span('child', size_bytes=10):
+            pass
+    spans = root.trace.close()
+
+    payload = OtlpHttpExporter('http://localhost:4318', 'pickwise').payload(spans)
+    otlp_spans = payload['resourceSpans'][0]['scopeSpans'][0]['spans']
+    child = next(otlp_span for otlp_span in otlp_spans if otlp_span['name'] == 'child')
+    assert child['parentSpanId'] == root.span_id
+    assert child['traceId'] == root.trace_id
+    assert child['attributes'] == [{'key': 'size_bytes', 'value': {'intValue': '10'}}]
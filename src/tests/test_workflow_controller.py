@@ -0,0 +1,94 @@
+"""
+Tests for the workflow API endpoint, using in-process fakes for OpenAI, S3 and DynamoDB.
+"""
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.fakes import FakeChatModel, InMemoryDynamoClient, InMemoryS3Client
+from benchmarks.throughput import build_request, load_fixture_objects
+from controllers.workflow_controller import get_dynamo_client, get_s3_client, get_workflow
+from main import app
+from models.workflow_response import DEFAULT_RESPONSE_FIELDS
+from workflows.resume_processor.workflow import ResumeProcessorWorkflow
+
+RUN_URL = "/api/v1/workflows/resume_processor/run"
+RESULTS_URL = "/api/v1/workflows/resume_processor/results"
+
+
+@pytest.fixture
+def client():
+    s3_client = InMemoryS3Client(load_fixture_objects())
+    dynamo_client = InMemoryDynamoClient()
+    app.dependency_overrides[get_s3_client] = lambda: s3_client
+    app.dependency_overrides[get_workflow] = lambda: ResumeProcessorWorkflow(
+        llm=FakeChatModel(), s3_client=s3_client, dynamo_client=dynamo_client
+    )
+    # Not used as a context manager, so the lifespan (and load_config) is not run
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_default_response_is_compact(client):
+    response = client.post(RUN_URL, json=build_request('candidate-1').model_dump())
+
+    assert response.status_code == 200
+    data = response.json()['data']
+    assert set(data) <= set(DEFAULT_RESPONSE_FIELDS)
+    assert data['status'] == 'COMPLETED'
+    assert 'resume_data' not in data
+
+
+def test_fields_selects_state_fields(client):
+    response = client.post(RUN_URL, params={'fields': 'candidate_id,jd_score'}, json=build_request('candidate-2').model_dump())
+
+    assert response.json()['data'] == {'candidate_id': 'candidate-2', 'jd_score': 7.5}
+
+
+def test_star_returns_full_state(client):
+    response = client.post(RUN_URL, params={'fields': '*'}, json=build_request('candidate-3').model_dump())
+
+    assert 'resume_data' in response.json()['data']
+
+
+def test_empty_fields_return_full_state(client):
+    response = client.post(RUN_URL, params={'fields': ''}, json=build_request('candidate-6').model_dump())
+
+    data = response.json()['data']
+    assert 'resume_data' in data and data['candidate_id'] == 'candidate-6'
+
+
+def test_unknown_field_is_rejected(client):
+    response = client.post(RUN_URL, params={'fields': 'jd_score,not_a_field'}, json=build_request('candidate-4').model_dump())
+
+    assert response.status_code == 400
+    assert 'not_a_field' in response.json()['detail']
+
+
+def test_large_responses_are_gzipped(client):
+    response = client.post(
+        RUN_URL,
+        params={'fields': '*'},
+        headers={'Accept-Encoding': 'gzip'},
+        json=build_request('candidate-5').model_dump()
+    )
+
+    assert response.headers.get('content-encoding') == 'gzip'
+
+
+def test_results_endpoint_returns_scores_for_candidates():
+    dynamo_client = InMemoryDynamoClient()
+    dynamo_client.put_item({'candidate_id': 'c-1', 'job_id': 'job-1', 'status': 'SELECTED', 'absolute_score': Decimal('82.5'), 'resume': 'not returned'})
+    dynamo_client.put_item({'candidate_id': 'c-2', 'job_id': 'job-1', 'status': 'JD_REJECTED', 'jd_score': Decimal('3')})
+    app.dependency_overrides[get_dynamo_client] = lambda: dynamo_client
+    try:
+        response = TestClient(app).post(RESULTS_URL, json={'job_id': 'job-1', 'candidate_ids': ['c-2', 'c-1', 'c-3']})
+    finally:
+        app.dependency_overrides.clear()
+
+    body = response.json()
+    assert [result['candidate_id'] for result in body['results']] == ['c-2', 'c-1']
+    assert body['results'][1]['absolute_score'] == 82.5
+    assert 'resume' not in body['results'][1]
+    assert body['missing_candidate_ids'] == ['c-3']
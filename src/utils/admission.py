@@ -0,0 +1,202 @@
+"""
+Admission control for workflow runs served by the API.
+
+At most MAX_IN_FLIGHT_EVALUATIONS runs execute at once, each on a worker
+thread of a pool of that size, so the event loop stays free. Further requests
+wait in a bounded FIFO queue. When the queue is full, or a request waits longer
+than ADMISSION_QUEUE_TIMEOUT, it is rejected at once with AdmissionRejected,
+which the API turns into 429 with Retry-After. Accepted work then keeps a
+predictable latency instead of every request slowing down under bursts.
+
+Environment variables:
+    MAX_IN_FLIGHT_EVALUATIONS: Runs executing at once per process; 0 disables the limit (default 16)
+    ADMISSION_QUEUE_SIZE: Requests waiting for a slot before new ones are rejected (default 64)
+    ADMISSION_QUEUE_TIMEOUT: Seconds a request may wait for a slot (default 30)
+    ADMISSION_RETRY_AFTER: Retry-After, in seconds, sent with rejections (default 5)
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+from utils.hedging import LatencyTracker
+from utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+_controller: Optional["AdmissionController"] = None
+_lock = threading.Lock()
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; the caller should retry after `retry_after` seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Request rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounded concurrency with a bounded wait queue, for one event loop.
+
+    Slots are only taken and released on the event loop, so no lock is needed;
+    a released slot is handed directly to the oldest waiter.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 16,
+        max_queue: int = 64,
+        queue_timeout: float = 30.0,
+        retry_after: float = 5.0
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.wait_times = LatencyTracker(1000)
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_in_flight=int(os.getenv('MAX_IN_FLIGHT_EVALUATIONS', 16)),
+            max_queue=int(os.getenv('ADMISSION_QUEUE_SIZE', 64)),
+            queue_timeout=float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 30)),
+            retry_after=float(os.getenv('ADMISSION_RETRY_AFTER', 5))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    async def acquire(self) -> float:
+        """
+        Take an execution slot, waiting in the queue if none is free.
+
+        Returns:
+            float: Seconds spent waiting for the slot
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait timed out
+        """
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self.in_flight += 1
+            self.admitted += 1
+            self.wait_times.record(0.0)
+            return 0.0
+
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected('evaluation queue is full', self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # The slot was handed over as the wait timed out: give it back
+                self.release()
+            waiter.cancel()
+            self.timed_out += 1
+            raise AdmissionRejected(f"no evaluation slot within {self.queue_timeout:g}s", self.retry_after)
+        except asyncio.CancelledError:
+            # The client went away while waiting
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            waiter.cancel()
+            raise
+        waited = time.perf_counter() - started
+        self.admitted += 1
+        self.wait_times.record(waited)
+        return waited
+
+    def release(self) -> None:
+        """Free a slot, handing it to the oldest request still waiting."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run `func(*args)` on a worker thread once admitted.
+
+        Returns:
+            The result of `func`
+
+        Raises:
+            AdmissionRejected: If the request could not be admitted
+        """
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the caller's context so context-local state follows the call
+        context = contextvars.copy_context()
+        if not self.enabled:
+            return await loop.run_in_executor(None, context.run, func, *args)
+
+        waited = await self.acquire()
+        if waited:
+            logger.info(f"[Admission] Admitted after waiting {waited:.3f}s")
+        try:
+            return await loop.run_in_executor(self._get_executor(), context.run, func, *args)
+        finally:
+            self.release()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='evaluation')
+            return self._executor
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Slots in use, queue depth and how long admitted requests waited."""
+        return {
+            'enabled': self.enabled,
+            'max_in_flight': self.max_in_flight,
+            'max_queue': self.max_queue,
+            'in_flight': self.in_flight,
+            'queued': self.queued,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+            'wait_s': {
+                'p50': self.wait_times.percentile(50),
+                'p95': self.wait_times.percentile(95),
+                'p99': self.wait_times.percentile(99)
+            }
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-shared admission controller. Overridable via app.dependency_overrides."""
+    global _controller
+    with _lock:
+        if _controller is None:
+            _controller = AdmissionController.from_env()
+            register_metrics('admission', _controller.snapshot)
+        return _controller
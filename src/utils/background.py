@@ -0,0 +1,138 @@
+"""
+Writes that finish after the run that started them has returned.
+
+Work submitted here (e.g. persisting the tail of a streamed analysis) runs on a
+small thread pool in a copy of the submitter's context. The pending writes are
+counted, and flush() waits for them: the API flushes at shutdown so no accepted
+analysis is lost when the process stops.
+
+Environment variables:
+    BACKGROUND_WRITE_WORKERS: Threads running background writes (default 4)
+    BACKGROUND_FLUSH_TIMEOUT: Seconds shutdown waits for pending writes (default 30)
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+
+from utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+_writer: Optional["BackgroundWriter"] = None
+_lock = threading.Lock()
+
+
+class BackgroundWriter:
+    """Runs writes on a thread pool and keeps track of the ones still pending."""
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Set[Future] = set()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls) -> "BackgroundWriter":
+        return cls(max_workers=int(os.getenv('BACKGROUND_WRITE_WORKERS', 4)))
+
+    def submit(self, name: str, func: Callable[..., Any], *args: Any) -> Future:
+        """
+        Run `func(*args)` in the background.
+
+        Args:
+            name: Name of the write, used in logs
+            func: Function performing the write; its errors are logged and counted
+
+        Returns:
+            Future: Completes when the write has finished
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='background-write')
+            self.submitted += 1
+            # Run in a copy of the submitter's context so context-local state follows the write
+            future = self._executor.submit(contextvars.copy_context().run, self._run, name, func, *args)
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _run(self, name: str, func: Callable[..., Any], *args: Any) -> Any:
+        try:
+            return func(*args)
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            logger.error(f"[BackgroundWriter] {name} failed: {str(e)}")
+            raise
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the pending writes.
+
+        Args:
+            timeout: Seconds to wait at most; waits indefinitely when None
+
+        Returns:
+            bool: True if every pending write finished in time
+        """
+        expires = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                return True
+            for future in pending:
+                left = None if expires is None else expires - time.monotonic()
+                if left is not None and left <= 0:
+                    logger.warning(f"[BackgroundWriter] {self.pending} writes still pending after {timeout}s")
+                    return False
+                try:
+                    future.result(timeout=left)
+                except Exception:
+                    # Already logged by _run; a timeout is checked on the next pass
+                    pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'pending': len(self._pending), 'submitted': self.submitted, 'failed': self.failed}
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Flush the pending writes, then stop the pool."""
+        self.flush(timeout)
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_background_writer() -> BackgroundWriter:
+    """Return the process-shared background writer, configured from the environment on first use."""
+    global _writer
+    with _lock:
+        if _writer is None:
+            _writer = BackgroundWriter.from_env()
+            register_metrics('background_writes', _writer.snapshot)
+        return _writer
+
+
+def flush_background_writes() -> None:
+    """Wait up to BACKGROUND_FLUSH_TIMEOUT for pending writes and stop the shared writer, if it was created."""
+    with _lock:
+        writer = _writer
+    if writer is not None:
+        writer.shutdown(float(os.getenv('BACKGROUND_FLUSH_TIMEOUT', 30)))
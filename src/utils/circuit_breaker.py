@@ -0,0 +1,273 @@
+"""
+Per-dependency circuit breakers for S3, DynamoDB and the LLM provider.
+
+A breaker watches the failure rate of calls to its dependency over a sliding
+time window. Once enough calls have failed it opens and rejects calls right away
+with CircuitOpenError instead of letting every candidate wait for full client
+timeouts. After a cool-down it lets a few probe calls through (half-open) and
+closes again when they succeed.
+
+Only failures of the dependency itself count: timeouts, connection errors,
+throttling and 5xx responses. Client errors such as a missing key do not, nor
+do calls abandoned because the caller's deadline passed, nor errors raised by
+our own code around the call (a prompt that fails to format, a parse bug).
+
+Environment variables:
+    CIRCUIT_BREAKER_ENABLED: Turn breakers on (default true)
+    CIRCUIT_FAILURE_RATE: Failure rate in the window that opens a breaker (default 0.5)
+    CIRCUIT_MIN_CALLS: Calls needed in the window before the rate is trusted (default 10)
+    CIRCUIT_WINDOW_SECONDS: Length of the sliding window (default 30)
+    CIRCUIT_OPEN_SECONDS: Time a breaker stays open before probing (default 15)
+    CIRCUIT_HALF_OPEN_PROBES: Concurrent probe calls allowed while half-open (default 1)
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from utils.deadline import DeadlineExceeded
+from utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+# Error codes that mean the dependency is overloaded rather than the request being wrong
+THROTTLING_ERROR_CODES = {
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestLimitExceeded',
+    'ProvisionedThroughputExceededException',
+    'SlowDown',
+    'ServiceUnavailable',
+    'InternalError',
+    'InternalServerError'
+}
+
+# Timeout and connection error classes of the clients the dependencies are called
+# with (builtins, botocore, requests, httpx, openai), matched by name so none of
+# them has to be imported here
+TRANSIENT_ERROR_NAMES = {
+    'TimeoutError',
+    'ConnectionError',
+    'Timeout',
+    'TimeoutException',
+    'TransportError',
+    'HTTPClientError',
+    'APIConnectionError'
+}
+
+_breakers: Dict[str, "CircuitBreaker"] = {}
+_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, dependency: str, retry_after: float):
+        self.dependency = dependency
+        self.retry_after = retry_after
+        super().__init__(f"{dependency} is unavailable (circuit open), retry after {retry_after:.0f}s")
+
+
+def is_dependency_failure(error: BaseException) -> bool:
+    """
+    Whether an exception means the dependency is unhealthy.
+
+    botocore ClientErrors and provider API errors count only for throttling and
+    5xx responses; timeouts and connection errors always count. Any other
+    exception is a local error and does not count.
+    """
+    if isinstance(error, DeadlineExceeded):
+        # The caller ran out of time; that says nothing about the dependency
+        return False
+    status = getattr(error, 'status_code', None)
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        if response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES:
+            return True
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode', status)
+    if status is None:
+        return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+    return status == 429 or status >= 500
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker with a sliding time window and half-open probes."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 10,
+        window_seconds: float = 30.0,
+        open_seconds: float = 15.0,
+        half_open_probes: int = 1,
+        enabled: bool = True,
+        clock=time.monotonic
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.enabled = enabled
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (timestamp, failed) per call in the window
+        self._calls: deque = deque()
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    @classmethod
+    def from_env(cls, name: str) -> "CircuitBreaker":
+        return cls(
+            name,
+            failure_rate=float(os.getenv('CIRCUIT_FAILURE_RATE', 0.5)),
+            min_calls=int(os.getenv('CIRCUIT_MIN_CALLS', 10)),
+            window_seconds=float(os.getenv('CIRCUIT_WINDOW_SECONDS', 30)),
+            open_seconds=float(os.getenv('CIRCUIT_OPEN_SECONDS', 15)),
+            half_open_probes=int(os.getenv('CIRCUIT_HALF_OPEN_PROBES', 1)),
+            enabled=os.getenv('CIRCUIT_BREAKER_ENABLED', 'true').lower() == 'true'
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def _refresh(self) -> None:
+        # Caller holds the lock
+        if self._state == STATE_OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = STATE_HALF_OPEN
+            self._probes_in_flight = 0
+            logger.info(f"[CircuitBreaker] {self.name} half-open, probing")
+
+    def _open(self) -> None:
+        # Caller holds the lock
+        self._state = STATE_OPEN
+        self._opened_at = self._clock()
+        self._calls.clear()
+        self.times_opened += 1
+        logger.error(f"[CircuitBreaker] {self.name} opened for {self.open_seconds:g}s")
+
+    def before_call(self) -> bool:
+        """
+        Admit a call or reject it.
+
+        Returns:
+            True if the call is a half-open probe
+
+        Raises:
+            CircuitOpenError: If the breaker is open or its probe slots are taken
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._refresh()
+            if self._state == STATE_CLOSED:
+                return False
+            if self._state == STATE_HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self.rejected += 1
+            retry_after = max(self.open_seconds - (self._clock() - self._opened_at), 1.0)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def after_call(self, failed: bool, probe: bool = False) -> None:
+        """Record the outcome of an admitted call."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if probe:
+                self._probes_in_flight -= 1
+                if failed:
+                    self._open()
+                elif self._state == STATE_HALF_OPEN:
+                    self._state = STATE_CLOSED
+                    logger.info(f"[CircuitBreaker] {self.name} closed")
+                return
+            if self._state != STATE_CLOSED:
+                return
+
+            now = self._clock()
+            self._calls.append((now, failed))
+            while self._calls and now - self._calls[0][0] > self.window_seconds:
+                self._calls.popleft()
+            if failed and len(self._calls) >= self.min_calls:
+                failures = sum(1 for _, call_failed in self._calls if call_failed)
+                if failures / len(self._calls) >= self.failure_rate:
+                    self._open()
+
+    def abandon_call(self, probe: bool = False) -> None:
+        """Release an admitted call that ended without an outcome."""
+        if not self.enabled or not probe:
+            return
+        with self._lock:
+            self._probes_in_flight -= 1
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        Run the enclosed dependency call through the breaker.
+
+        Raises:
+            CircuitOpenError: Before running the call, if the breaker rejects it
+        """
+        probe = self.before_call()
+        try:
+            yield
+        except Exception as e:
+            self.after_call(is_dependency_failure(e), probe)
+            raise
+        except BaseException:
+            # Interrupted or cancelled: no outcome to record, but the probe slot is freed
+            self.abandon_call(probe)
+            raise
+        self.after_call(False, probe)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            failures = sum(1 for _, failed in self._calls if failed)
+            return {
+                'state': self._state,
+                'window_calls': len(self._calls),
+                'window_failures': failures,
+                'rejected': self.rejected,
+                'times_opened': self.times_opened
+            }
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for a dependency, creating it from the environment on first use."""
+    with _lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker.from_env(name)
+            register_metrics('circuit_breakers', get_breaker_metrics)
+        return _breakers[name]
+
+
+def get_breaker_metrics() -> Dict[str, Dict[str, Any]]:
+    """State and counters of every breaker created so far."""
+    with _lock:
+        breakers = dict(_breakers)
+    return {name: breaker.snapshot() for name, breaker in breakers.items()}
+
+
+def reset_breakers() -> None:
+    """Forget every breaker; they are recreated from the environment on next use."""
+    with _lock:
+        _breakers.clear()
+
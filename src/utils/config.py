@@ -4,14 +4,25 @@ Configuration utility for loading environment variables.
 import os
 from dotenv import load_dotenv
 import logging
+from utils.logger import configure_logging
 
 logger = logging.getLogger(__name__)
 
+# Set once the environment has been validated so repeated calls are no-ops
+_config_loaded = False
+
 def load_config():
     """
     Load environment variables from .env file.
     Raises an error if required variables are missing.
+
+    Only the first successful call does any work; clients and nodes may call
+    this freely without re-reading .env or reconfiguring logging.
     """
+    global _config_loaded
+    if _config_loaded:
+        return
+
     # Load .env file
     load_dotenv()
     
@@ -40,9 +51,7 @@ def load_config():
         os.environ['LOG_LEVEL'] = 'INFO'
     
     # Configure logging
-    logging.basicConfig(
-        level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO')),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    configure_logging()
     
+    _config_loaded = True
     logger.info("Environment configuration loaded successfully") 
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Deadlines of the runs being executed, carried in a context variable.
+
+The workflow enters deadline_scope() around every node, so code deeper in the
+call stack (LLM calls, including those on thread pools that copy the caller's
+context) can derive its timeouts from the time the caller has left.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work cannot finish before the caller's deadline."""
+
+
+def deadline_from_timeout(timeout_seconds: Optional[float]) -> Optional[float]:
+    """Absolute deadline, as a Unix timestamp, `timeout_seconds` from now."""
+    if timeout_seconds is None:
+        return None
+    return time.time() + timeout_seconds
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """Make `deadline` (a Unix timestamp, or None for no deadline) current for the enclosed code."""
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_seconds(deadline: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds left before `deadline`, or the current deadline when omitted.
+
+    Returns:
+        Optional[float]: Seconds left (negative once passed), or None without a deadline
+    """
+    deadline = deadline if deadline is not None else _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.time()
+
+
+def check_deadline(operation: str) -> Optional[float]:
+    """
+    Seconds left for `operation` under the current deadline.
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    remaining = remaining_seconds()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"Deadline passed {-remaining:.2f}s before {operation}")
+    return remaining
@@ -1,20 +1,28 @@
 """
 DynamoDB client for AWS operations.
 """
-import boto3
 import os
+import random
+import time
 import logging
 from typing import Dict, Any, Optional, List
-from botocore.exceptions import ClientError
 from utils.config import load_config
+from utils.circuit_breaker import CircuitOpenError, get_breaker
+from utils.tracing import record_aws_response, span
 
 logger = logging.getLogger(__name__)
 
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_MAX_KEYS = 100
+
 class DynamoClient:
     def __init__(self):
         """Initialize DynamoDB client with AWS credentials from environment variables."""
         # Load environment configuration
         load_config()
+
+        # boto3 is slow to import, so defer it until a client is actually needed
+        import boto3
         
         aws_region = os.getenv('AWS_REGION', 'us-east-1')
         self.table_name = os.getenv('DYNAMODB_TABLE_NAME')
@@ -36,6 +44,8 @@ class DynamoClient:
             self.dynamo = boto3.resource('dynamodb', region_name=aws_region)
         
         self.table = self.dynamo.Table(self.table_name)
+        # Shared by every DynamoClient in the process
+        self.breaker = get_breaker('dynamodb')
         logger.info(f"DynamoDB client initialized successfully for table: {self.table_name}")
 
     def get_item(self, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -46,9 +56,15 @@ class DynamoClient:
         Returns:
             Dict containing item data or None if not found
         """
+        from botocore.exceptions import ClientError
         try:
-            response = self.table.get_item(Key=key)
+            with span('dynamodb.get_item', table=self.table_name) as call_span, self.breaker.guard():
+                response = self.table.get_item(Key=key)
+                record_aws_response(call_span, response)
+                call_span.set_attribute('found', 'Item' in response)
             return response.get('Item')
+        except CircuitOpenError:
+            raise
         except ClientError as e:
             logger.error(f"ClientError in get_item: {e.response['Error']['Message']}")
             return None
@@ -64,9 +80,14 @@ class DynamoClient:
         Returns:
             bool: True if successful, False otherwise
         """
+        from botocore.exceptions import ClientError
         try:
-            self.table.put_item(Item=item)
+            with span('dynamodb.put_item', table=self.table_name) as call_span, self.breaker.guard():
+                response = self.table.put_item(Item=item)
+                record_aws_response(call_span, response)
             return True
+        except CircuitOpenError:
+            raise
         except ClientError as e:
             logger.error(f"ClientError in put_item: {e.response['Error']['Message']}")
             return False
@@ -84,17 +105,89 @@ class DynamoClient:
         Returns:
             bool: True if successful, False otherwise
         """
+        from botocore.exceptions import ClientError
         try:
-            self.table.update_item(
-                Key=key,
-                UpdateExpression=update_expression,
-                ExpressionAttributeValues=expression_values,
-                ExpressionAttributeNames=expression_attribute_names
-            )
+            with span('dynamodb.update_item', table=self.table_name) as call_span, self.breaker.guard():
+                response = self.table.update_item(
+                    Key=key,
+                    UpdateExpression=update_expression,
+                    ExpressionAttributeValues=expression_values,
+                    ExpressionAttributeNames=expression_attribute_names
+                )
+                record_aws_response(call_span, response)
             return True
+        except CircuitOpenError:
+            raise
         except ClientError as e:
             logger.error(f"ClientError in update_item: {e.response['Error']['Message']}")
             return False
         except Exception as e:
             logger.exception("Failed to update item in DynamoDB")
             return False
+
+    def batch_get_items(
+        self,
+        keys: List[Dict[str, Any]],
+        projection: Optional[List[str]] = None,
+        max_retries: int = 5,
+        base_backoff: float = 0.05
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get many items from DynamoDB with BatchGetItem.
+        Keys are de-duplicated and sent in chunks of 100, and any UnprocessedKeys
+        are retried with exponential backoff and jitter.
+        Args:
+            keys: Primary keys of the items to get
+            projection: Attribute names to return; all attributes when omitted
+            max_retries: Maximum retries of unprocessed keys per chunk
+            base_backoff: Initial backoff in seconds, doubled on every retry
+        Returns:
+            List of found items (in no particular order), or None if the batch failed
+        """
+        from botocore.exceptions import ClientError
+
+        # BatchGetItem rejects requests containing duplicate keys
+        unique_keys = list({tuple(sorted(key.items())): key for key in keys}.values())
+
+        request_template: Dict[str, Any] = {}
+        if projection:
+            # Placeholders avoid clashes with reserved words such as "status"
+            names = {f"#p{i}": name for i, name in enumerate(projection)}
+            request_template['ProjectionExpression'] = ', '.join(names)
+            request_template['ExpressionAttributeNames'] = names
+
+        items: List[Dict[str, Any]] = []
+        try:
+            for start in range(0, len(unique_keys), BATCH_GET_MAX_KEYS):
+                request_items = {
+                    self.table_name: {**request_template, 'Keys': unique_keys[start:start + BATCH_GET_MAX_KEYS]}
+                }
+                attempt = 0
+                while request_items:
+                    requested = len(request_items[self.table_name]['Keys'])
+                    with span('dynamodb.batch_get_item', table=self.table_name, keys=requested, attempt=attempt) as call_span, self.breaker.guard():
+                        response = self.dynamo.batch_get_item(RequestItems=request_items)
+                        record_aws_response(call_span, response)
+                        call_span.set_attribute(
+                            'unprocessed_keys',
+                            len((response.get('UnprocessedKeys') or {}).get(self.table_name, {}).get('Keys', []))
+                        )
+                    items.extend(response.get('Responses', {}).get(self.table_name, []))
+                    request_items = response.get('UnprocessedKeys') or {}
+                    if not request_items:
+                        break
+                    if attempt >= max_retries:
+                        unprocessed = len(request_items.get(self.table_name, {}).get('Keys', []))
+                        logger.error(f"batch_get_items gave up with {unprocessed} unprocessed keys after {max_retries} retries")
+                        return None
+                    time.sleep(base_backoff * (2 ** attempt) * random.uniform(0.5, 1.0))
+                    attempt += 1
+            return items
+        except CircuitOpenError:
+            raise
+        except ClientError as e:
+            logger.error(f"ClientError in batch_get_items: {e.response['Error']['Message']}")
+            return None
+        except Exception as e:
+            logger.exception("Failed to batch get items from DynamoDB")
+            return None
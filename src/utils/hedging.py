@@ -0,0 +1,74 @@
+"""
+Building blocks for hedged requests: recent-latency percentiles and a hedge budget.
+"""
+import math
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies, in seconds."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of the window, or None when it is empty."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        rank = max(1, math.ceil(pct / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+
+class HedgeBudget:
+    """
+    Token bucket capping hedges to a fraction of primary calls.
+
+    Every primary call earns `max_ratio` tokens (up to `burst`), and every hedge
+    spends one, so over time hedges never exceed `max_ratio` of calls.
+    """
+
+    def __init__(self, max_ratio: float = 0.05, burst: float = 5.0):
+        self.max_ratio = max_ratio
+        self.burst = burst
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.denied = 0
+
+    def on_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self._tokens = min(self.burst, self._tokens + self.max_ratio)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            # Tolerate float drift from summing fractional ratios
+            if self._tokens >= 1.0 - 1e-9:
+                self._tokens = max(0.0, self._tokens - 1.0)
+                self.hedges += 1
+                return True
+            self.denied += 1
+            return False
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'hedges': self.hedges,
+                'denied': self.denied,
+                'hedge_rate': self.hedges / self.calls if self.calls else 0.0,
+                'tokens': self._tokens,
+            }
@@ -0,0 +1,85 @@
+"""
+Incremental parsing of a JSON object streamed in chunks.
+
+Each top-level field is decoded as soon as its value is complete, so a caller
+can act on the fields emitted first without waiting for the rest of the object.
+The text is scanned once, whatever the chunk sizes.
+"""
+import json
+from typing import Any, Dict, List
+
+
+class StreamingJSONObject:
+    """Top-level fields of a JSON object, parsed as its text arrives."""
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+        self._parts: List[str] = []
+        self._member: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def text(self) -> str:
+        """Text fed so far."""
+        return ''.join(self._parts)
+
+    def feed(self, text: str) -> Dict[str, Any]:
+        """
+        Add the next chunk of the streamed text.
+
+        Text before the opening brace (e.g. a markdown fence) is ignored.
+
+        Args:
+            text: Next chunk
+
+        Returns:
+            Dict[str, Any]: Top-level fields completed by this chunk
+        """
+        self._parts.append(text)
+        completed: Dict[str, Any] = {}
+        start = 0
+        for i, char in enumerate(text):
+            if self.complete:
+                break
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = self._depth > 0
+            elif char in '{[':
+                self._depth += 1
+                if self._depth == 1:
+                    start = i + 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._member.append(text[start:i])
+                    self._finish_member(completed)
+                    self.complete = True
+            elif char == ',' and self._depth == 1:
+                self._member.append(text[start:i])
+                self._finish_member(completed)
+                start = i + 1
+        if self._depth > 0 and not self.complete:
+            self._member.append(text[start:])
+        return completed
+
+    def _finish_member(self, completed: Dict[str, Any]) -> None:
+        member = ''.join(self._member).strip()
+        self._member = []
+        if not member:
+            return
+        try:
+            field = json.loads('{' + member + '}')
+        except json.JSONDecodeError:
+            # Left for the parse of the full text to report
+            return
+        self.fields.update(field)
+        completed.update(field)
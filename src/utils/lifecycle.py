@@ -0,0 +1,148 @@
+"""
+Lifecycle of an API process: warm-up, readiness and draining.
+
+A process starts in 'starting'. The app's lifespan warms it up, building the
+shared clients and the compiled workflow so the first evaluation does not pay
+for them, and then marks it 'ready'. On SIGTERM it is marked 'draining' right away and
+keeps serving for SERVER_DRAIN_SECONDS, so load balancers polling readiness stop
+routing to it, before the signal is passed on to the server, which then stops
+accepting connections, lets in-flight evaluations finish and flushes pending
+uploads. The readiness endpoint reports ready only in between; liveness only
+reports that the process answers.
+
+Environment variables:
+    SERVER_WARMUP: Warm up the clients and the workflow before reporting ready (default true)
+    SERVER_DRAIN_SECONDS: Seconds a process keeps serving, reported draining, after SIGTERM (default 10)
+"""
+import logging
+import os
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+STARTING = 'starting'
+READY = 'ready'
+DRAINING = 'draining'
+
+_lifecycle: Optional["Lifecycle"] = None
+_lock = threading.Lock()
+
+
+class Lifecycle:
+    """State of the process as reported by the readiness endpoint."""
+
+    def __init__(self):
+        self.state = STARTING
+        self.warmup_ms: Dict[str, float] = {}
+        self.warmup_errors: Dict[str, str] = {}
+        self._started = time.monotonic()
+        self._ready_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def warm_up(self, steps: Mapping[str, Callable[[], Any]]) -> None:
+        """
+        Run each warm-up step, timing it.
+
+        A failing step is logged and recorded, not raised: what it builds is
+        created on first use instead, so the process can still serve.
+
+        Args:
+            steps: Callables building a shared component, keyed by component name
+        """
+        if os.getenv('SERVER_WARMUP', 'true').lower() != 'true':
+            return
+        for name, step in steps.items():
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                logger.warning(f"[Lifecycle] Warm-up of {name} failed: {str(e)}")
+                with self._lock:
+                    self.warmup_errors[name] = str(e)
+                continue
+            with self._lock:
+                self.warmup_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"[Lifecycle] Warmed up in {sum(self.warmup_ms.values()):.0f}ms: {self.warmup_ms}")
+
+    def mark_ready(self) -> None:
+        with self._lock:
+            if self.state == STARTING:
+                self.state = READY
+                self._ready_at = time.monotonic()
+        logger.info(f"[Lifecycle] Process {os.getpid()} ready")
+
+    def mark_draining(self) -> None:
+        with self._lock:
+            self.state = DRAINING
+        logger.info(f"[Lifecycle] Process {os.getpid()} draining")
+
+    def drain_on_sigterm(self, grace_seconds: Optional[float] = None) -> Callable[[], None]:
+        """
+        Mark the process draining on SIGTERM and hold the signal back for a grace period.
+
+        The server only stops accepting connections once it gets the signal, so
+        readiness reports draining while the process still serves. A second
+        SIGTERM is passed on right away. Signal handlers can only be installed
+        from the main thread; elsewhere this does nothing.
+
+        Args:
+            grace_seconds: Seconds to keep serving; defaults to SERVER_DRAIN_SECONDS
+
+        Returns:
+            Callable restoring the previous SIGTERM handler
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return lambda: None
+        if grace_seconds is None:
+            grace_seconds = float(os.getenv('SERVER_DRAIN_SECONDS', 10))
+        previous = signal.getsignal(signal.SIGTERM)
+
+        def forward(signum: int, frame: Any) -> None:
+            if callable(previous):
+                previous(signum, frame)
+            elif previous != signal.SIG_IGN:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.raise_signal(signal.SIGTERM)
+
+        def on_sigterm(signum: int, frame: Any) -> None:
+            draining = self.state == DRAINING
+            self.mark_draining()
+            if draining or grace_seconds <= 0:
+                forward(signum, frame)
+                return
+            logger.info(f"[Lifecycle] Serving for {grace_seconds:g}s more before shutting down")
+            timer = threading.Timer(grace_seconds, forward, (signum, frame))
+            timer.daemon = True
+            timer.start()
+
+        signal.signal(signal.SIGTERM, on_sigterm)
+        return lambda: signal.signal(signal.SIGTERM, previous)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'pid': os.getpid(),
+                'startup_ms': round((self._ready_at - self._started) * 1000, 1) if self._ready_at else None,
+                'warmup_ms': dict(self.warmup_ms),
+                'warmup_errors': dict(self.warmup_errors)
+            }
+
+
+def get_lifecycle() -> Lifecycle:
+    """Return the lifecycle of this process."""
+    global _lifecycle
+    with _lock:
+        if _lifecycle is None:
+            _lifecycle = Lifecycle()
+            register_metrics('lifecycle', _lifecycle.snapshot)
+        return _lifecycle
@@ -1,11 +1,208 @@
+"""
+Logging pipeline for the service.
+
+Records are handed to a bounded in-memory queue on the request path and written
+by a background QueueListener thread, as JSON lines by default. Message formatting
+is deferred to the writer thread, and large payloads (LLM outputs, requests, score
+dumps) should be wrapped in `Payload` so they are only rendered when the record is
+actually written, truncated to a maximum size, and sampled at a configurable rate.
+
+Environment variables:
+    LOG_LEVEL: Root log level (default INFO)
+    LOG_FORMAT: 'json' or 'text' (default json)
+    LOG_QUEUE_SIZE: Maximum queued records before new ones are dropped (default 10000)
+    LOG_PAYLOAD_MAX_CHARS: Maximum rendered payload length (default 2000)
+    LOG_PAYLOAD_SAMPLE_RATE: Fraction of records whose payloads are written, 0-1 (default 1.0)
+"""
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional, Tuple
+
+# Attributes present on every LogRecord; anything else was passed via `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["DeferredQueueHandler"] = None
+_settings: Optional[Tuple[str, str, int, float]] = None
+_configure_lock = threading.Lock()
+
+
+class Payload:
+    """
+    Lazily rendered, truncated log payload.
+
+    Rendering (JSON encoding for dicts/lists, `.content` for LLM messages) happens
+    only when the record is written. The wrapped value must not be mutated after
+    logging, since it is rendered later on the writer thread.
+    """
+    __slots__ = ('value', 'max_chars')
+
+    def __init__(self, value: Any, max_chars: Optional[int] = None):
+        self.value = value
+        self.max_chars = max_chars if max_chars is not None else int(os.getenv('LOG_PAYLOAD_MAX_CHARS', 2000))
+
+    def render(self) -> str:
+        value = self.value
+        if hasattr(value, 'content'):
+            value = value.content
+        if isinstance(value, (dict, list)):
+            text = json.dumps(value, default=str, separators=(',', ':'))
+        else:
+            text = str(value)
+        if len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}...[truncated {len(text) - self.max_chars} chars]"
+        return text
+
+    def __str__(self) -> str:
+        return self.render()
+
+
+class PayloadSamplingFilter(logging.Filter):
+    """Replace payload arguments with a placeholder on records that are sampled out."""
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.sample_rate >= 1.0 or not isinstance(record.args, tuple):
+            return True
+        if any(isinstance(arg, Payload) for arg in record.args) and random.random() >= self.sample_rate:
+            record.args = tuple(
+                '[payload sampled out]' if isinstance(arg, Payload) else arg
+                for arg in record.args
+            )
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects, including any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves message formatting to the listener thread.
+
+    The stock QueueHandler formats every record on the calling thread before
+    enqueueing it; this one only captures the traceback text, and drops records
+    instead of blocking when the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            # Tracebacks reference live frames, so render them while they are still valid
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _logging_settings() -> Tuple[str, str, int, float]:
+    return (
+        os.getenv('LOG_LEVEL', 'INFO').upper(),
+        os.getenv('LOG_FORMAT', 'json').lower(),
+        int(os.getenv('LOG_QUEUE_SIZE', 10000)),
+        float(os.getenv('LOG_PAYLOAD_SAMPLE_RATE', 1.0))
+    )
+
+
+def configure_logging() -> None:
+    """
+    Install the queue-based logging pipeline on the root logger.
+
+    Safe to call repeatedly: later calls only rebuild the pipeline when the
+    logging environment variables changed since, e.g. once .env is loaded.
+    """
+    global _listener, _queue_handler, _settings
+    with _configure_lock:
+        settings = _logging_settings()
+        if _listener is not None and settings == _settings:
+            return
+        level, log_format, queue_size, sample_rate = settings
+
+        root = logging.getLogger()
+        first = _listener is None
+        if not first:
+            # Write out what the previous pipeline queued before replacing it
+            root.removeHandler(_queue_handler)
+            _listener.stop()
+
+        if log_format == 'json':
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+
+        log_queue = queue.Queue(maxsize=queue_size)
+        queue_handler = DeferredQueueHandler(log_queue)
+        queue_handler.addFilter(PayloadSamplingFilter(sample_rate))
+
+        root.addHandler(queue_handler)
+        root.setLevel(getattr(logging, level, logging.INFO))
+
+        _settings = settings
+        _queue_handler = queue_handler
+        _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        if first:
+            # Flush queued records on interpreter shutdown
+            atexit.register(_stop_listener)
+            # A forked worker (e.g. of a preloading server) does not inherit the listener thread
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(after_in_child=_restart_listener)
+
+
+def _stop_listener() -> None:
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def _restart_listener() -> None:
+    """Give a forked child its own queue and listener thread, writing to the same handlers."""
+    global _listener
+    if _listener is None or _queue_handler is None:
+        return
+    log_queue = queue.Queue(maxsize=_listener.queue.maxsize)
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
 
 def get_logger(name):
-    logger = logging.getLogger(name)
-    if not logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter('[%(levelname)s] %(name)s: %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-    logger.setLevel(logging.INFO)
-    return logger 
\ No newline at end of file
+    configure_logging()
+    return logging.getLogger(name)
@@ -0,0 +1,34 @@
+"""
+Process-wide registry of metrics providers exposed by the /metrics endpoint.
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+_lock = threading.Lock()
+
+
+def register_metrics(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """
+    Register a callable returning a snapshot of metrics under `name`.
+    Registering the same name again replaces the previous provider.
+    """
+    with _lock:
+        _providers[name] = provider
+
+
+def collect_metrics() -> Dict[str, Dict[str, Any]]:
+    """Snapshot every registered provider; a failing provider reports its error instead."""
+    with _lock:
+        providers = dict(_providers)
+    snapshot = {}
+    for name, provider in providers.items():
+        try:
+            snapshot[name] = provider()
+        except Exception as e:
+            logger.error(f"Failed to collect metrics from {name}: {str(e)}")
+            snapshot[name] = {'error': str(e)}
+    return snapshot
@@ -0,0 +1,352 @@
+"""
+On-demand CPU and memory profiles of single workflow runs.
+
+A profiled run gets a sampling CPU profile of the thread executing it (where
+the time went: JSON handling, prompt rendering, boto3, or waiting on the LLM)
+and, optionally, its tracemalloc peak and top allocation sites. Profiles are
+written under PROFILE_DIR/<job_id>/<candidate_id>/ as two files per run:
+
+    <profile_id>.folded  Collapsed stacks, one "frame;frame;... count" line per
+                         stack (flamegraph.pl, speedscope, ...)
+    <profile_id>.json    Summary: duration, samples, top functions, memory
+
+Work the run hands to other threads (hedged LLM calls, the cultural fan-out)
+shows up as the run thread waiting on it. tracemalloc, on the other hand, is
+process-wide: the memory figures include whatever requests ran concurrently
+with the profiled one, and are reported with scope 'process' to say so. For a
+clean memory profile, profile a run on an otherwise idle worker.
+
+Only the newest PROFILE_MAX_RUNS profiles are kept; older ones are deleted
+when a new profile is written.
+
+Environment variables:
+    PROFILING_ENABLED: Honour the X-Profile request header (default false)
+    PROFILE_SAMPLE_RATE: Fraction of runs profiled without the header (default 0)
+    PROFILE_DIR: Directory profiles are written to (default <tmp>/pickwise-profiles)
+    PROFILE_INTERVAL_MS: CPU sampling interval in milliseconds (default 5)
+    PROFILE_MEMORY: Also trace allocations with tracemalloc (default true)
+    PROFILE_MAX_RUNS: Profiles kept under PROFILE_DIR; 0 keeps all of them (default 200)
+"""
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILE_EXTENSIONS = ('.folded', '.json')
+
+_TOP_ENTRIES = 25
+_TRACEMALLOC_FRAMES = 25
+_UNSAFE = re.compile(r'[^A-Za-z0-9._-]')
+
+# tracemalloc is process-wide, so only one profiled run traces memory at a time
+_memory_lock = threading.Lock()
+
+
+def _is_true(value: Optional[str]) -> bool:
+    return (value or '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def get_profile_dir() -> str:
+    return os.getenv('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'pickwise-profiles')
+
+
+def should_profile(header_value: Optional[str] = None) -> bool:
+    """
+    Decide whether to profile a run.
+
+    Args:
+        header_value: Value of the request's X-Profile header, if any
+
+    Returns:
+        bool: True when the header asks for a profile and PROFILING_ENABLED is set,
+        or when the run is picked by PROFILE_SAMPLE_RATE
+    """
+    if _is_true(header_value) and _is_true(os.getenv('PROFILING_ENABLED', 'false')):
+        return True
+    sample_rate = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+def safe_path_part(value: str) -> str:
+    """Make an id usable as a single path component."""
+    cleaned = _UNSAFE.sub('_', str(value)).strip('.')
+    return cleaned or '_'
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get('__name__') or os.path.basename(code.co_filename)
+    return f"{module}:{code.co_name}"
+
+
+class StackSampler:
+    """Samples one thread's stack at a fixed interval from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.reverse()
+            self.stacks[';'.join(labels)] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        """Collapsed stacks, most sampled first."""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = _TOP_ENTRIES) -> Dict[str, List[Dict[str, Any]]]:
+        """Functions by self samples (leaf frame) and by cumulative samples (anywhere on the stack)."""
+        own: Counter = Counter()
+        cumulative: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for label in set(frames):
+                cumulative[label] += count
+
+        def rows(counter: Counter) -> List[Dict[str, Any]]:
+            return [
+                {'function': label, 'samples': count, 'share': round(count / max(self.samples, 1), 4)}
+                for label, count in counter.most_common(limit)
+            ]
+
+        return {'self': rows(own), 'cumulative': rows(cumulative)}
+
+
+class RunProfiler:
+    """
+    Context manager profiling the workflow run executed by the current thread.
+
+    Usage:
+        with RunProfiler(job_id, candidate_id) as profiler:
+            final_state = workflow.process_resume(state)
+        profiler.profile_id  # "<job_id>/<candidate_id>/<stamp>"
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        candidate_id: str,
+        directory: Optional[str] = None,
+        interval: Optional[float] = None,
+        memory: Optional[bool] = None
+    ):
+        self.job_id = job_id
+        self.candidate_id = candidate_id
+        self.directory = directory or get_profile_dir()
+        self.interval = interval if interval is not None else float(os.getenv('PROFILE_INTERVAL_MS', 5)) / 1000
+        self.memory = memory if memory is not None else _is_true(os.getenv('PROFILE_MEMORY', 'true'))
+        self.profile_id: Optional[str] = None
+        self._sampler: Optional[StackSampler] = None
+        self._tracing_memory = False
+        self._started_tracemalloc = False
+        self._started_at = 0.0
+
+    def __enter__(self) -> "RunProfiler":
+        if self.memory and _memory_lock.acquire(blocking=False):
+            self._tracing_memory = True
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start(_TRACEMALLOC_FRAMES)
+                self._started_tracemalloc = True
+        self._sampler = StackSampler(threading.get_ident(), self.interval)
+        self._started_at = time.perf_counter()
+        self._sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        duration = time.perf_counter() - self._started_at
+        self._sampler.stop()
+        memory = self._collect_memory()
+        try:
+            self._write(duration, memory)
+        except Exception as e:
+            # A profile must never fail the run it observed
+            logger.error(f"[Profiling] Failed to write profile for {self.job_id}/{self.candidate_id}: {str(e)}")
+
+    def _collect_memory(self) -> Dict[str, Any]:
+        if not self.memory:
+            return {'traced': False, 'reason': 'disabled'}
+        if not self._tracing_memory:
+            return {'traced': False, 'reason': 'another profiled run was tracing memory'}
+        try:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ))
+            top = [
+                {
+                    'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    'size_bytes': stat.size,
+                    'count': stat.count
+                }
+                for stat in snapshot.statistics('lineno')[:_TOP_ENTRIES]
+            ]
+            return {
+                'traced': True,
+                # Allocations of every thread, not only this run's
+                'scope': 'process',
+                'peak_bytes': peak,
+                'retained_bytes': current,
+                'top_allocations': top
+            }
+        finally:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            _memory_lock.release()
+
+    def _write(self, duration: float, memory: Dict[str, Any]) -> None:
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+        job_part, candidate_part = safe_path_part(self.job_id), safe_path_part(self.candidate_id)
+        target = os.path.join(self.directory, job_part, candidate_part)
+        os.makedirs(target, exist_ok=True)
+
+        summary = {
+            'job_id': self.job_id,
+            'candidate_id': self.candidate_id,
+            'created_at': stamp,
+            'duration_seconds': round(duration, 6),
+            'interval_seconds': self.interval,
+            'samples': self._sampler.samples,
+            'top_functions': self._sampler.top_functions(),
+            'memory': memory
+        }
+        with open(os.path.join(target, f"{stamp}.folded"), 'w', encoding='utf-8') as f:
+            f.write(self._sampler.folded())
+        with open(os.path.join(target, f"{stamp}.json"), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+        self.profile_id = f"{job_part}/{candidate_part}/{stamp}"
+        logger.info(
+            f"[Profiling] Wrote profile {self.profile_id}: {self._sampler.samples} samples "
+            f"over {duration:.3f}s, process peak {memory.get('peak_bytes', 'n/a')} bytes"
+        )
+        prune_profiles()
+
+
+def list_profiles(job_id: Optional[str] = None, candidate_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    List profile files, newest first, optionally for one job or one candidate.
+
+    Returns:
+        List of dicts with job_id, candidate_id, name, size_bytes and modified_at
+    """
+    root = get_profile_dir()
+    if not os.path.isdir(root):
+        return []
+
+    jobs = [safe_path_part(job_id)] if job_id else sorted(os.listdir(root))
+    profiles = []
+    for job in jobs:
+        job_dir = os.path.join(root, job)
+        if not os.path.isdir(job_dir):
+            continue
+        candidates = [safe_path_part(candidate_id)] if candidate_id else sorted(os.listdir(job_dir))
+        for candidate in candidates:
+            candidate_dir = os.path.join(job_dir, candidate)
+            if not os.path.isdir(candidate_dir):
+                continue
+            for name in os.listdir(candidate_dir):
+                if not name.endswith(PROFILE_EXTENSIONS):
+                    continue
+                stat = os.stat(os.path.join(candidate_dir, name))
+                profiles.append({
+                    'job_id': job,
+                    'candidate_id': candidate,
+                    'name': name,
+                    'size_bytes': stat.st_size,
+                    'modified_at': datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+                })
+    profiles.sort(key=lambda profile: profile['modified_at'], reverse=True)
+    return profiles
+
+
+def prune_profiles(max_runs: Optional[int] = None) -> int:
+    """
+    Delete all but the newest profiles, and the directories left empty.
+
+    Args:
+        max_runs: Profiles to keep; defaults to PROFILE_MAX_RUNS, 0 keeps all of them
+
+    Returns:
+        int: Number of profiles deleted
+    """
+    if max_runs is None:
+        max_runs = int(os.getenv('PROFILE_MAX_RUNS', 200))
+    if max_runs <= 0:
+        return 0
+
+    root = get_profile_dir()
+    runs: Dict[Tuple[str, str, str], List[str]] = {}
+    for profile in list_profiles():
+        stamp = os.path.splitext(profile['name'])[0]
+        path = os.path.join(root, profile['job_id'], profile['candidate_id'], profile['name'])
+        runs.setdefault((stamp, profile['job_id'], profile['candidate_id']), []).append(path)
+
+    # Stamps are UTC and sortable, so they order runs across jobs and candidates
+    expired = sorted(runs, reverse=True)[max_runs:]
+    for run in expired:
+        for path in runs[run]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Another run pruning at the same time
+                pass
+        _, job, candidate = run
+        for directory in (os.path.join(root, job, candidate), os.path.join(root, job)):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+    if expired:
+        logger.info(f"[Profiling] Deleted {len(expired)} profiles over the limit of {max_runs}")
+    return len(expired)
+
+
+def get_profile_path(job_id: str, candidate_id: str, name: str) -> Optional[str]:
+    """
+    Resolve a listed profile file to its path.
+
+    Returns:
+        Optional[str]: The file's path, or None when it does not exist or the
+        name does not refer to a profile file
+    """
+    if not name.endswith(PROFILE_EXTENSIONS) or safe_path_part(name) != name:
+        return None
+    path = os.path.join(get_profile_dir(), safe_path_part(job_id), safe_path_part(candidate_id), name)
+    return path if os.path.isfile(path) else None
@@ -1,12 +1,13 @@
 """
 S3 client for AWS operations.
 """
-import boto3
 import os
 import json
 import logging
 from typing import Dict, Any, Optional, List
 from utils.config import load_config
+from utils.circuit_breaker import CircuitOpenError, get_breaker
+from utils.tracing import record_aws_response, span
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,9 @@ class S3Client:
         """Initialize S3 client with AWS credentials from environment variables."""
         # Load environment configuration
         load_config()
+
+        # boto3 is slow to import, so defer it until a client is actually needed
+        import boto3
         
         # Get AWS credentials from environment variables
         aws_access_key = os.getenv('AWS_ACCESS_KEY_ID')
@@ -32,6 +36,8 @@ class S3Client:
 
         # Initialize S3 client
         self.s3 = session.client('s3')
+        # Shared by every S3Client in the process
+        self.breaker = get_breaker('s3')
         logger.info("S3 client initialized successfully")
 
     def batch_get_objects(self, keys: List[str]) -> Dict[str, Any]:
@@ -47,7 +53,10 @@ class S3Client:
         try:
             results = {}
             for key in keys:
-                response = self.s3.get_object(Bucket=os.getenv('S3_BUCKET_NAME'), Key=key)
+                with span('s3.get_object', key=key) as call_span, self.breaker.guard():
+                    response = self.s3.get_object(Bucket=os.getenv('S3_BUCKET_NAME'), Key=key)
+                    record_aws_response(call_span, response)
+                    call_span.set_attribute('size_bytes', response.get('ContentLength'))
                 results[key] = response
             return results
         except Exception as e:
@@ -66,13 +75,18 @@ class S3Client:
             bool: True if successful, False otherwise
         """
         try:
-            self.s3.put_object(
-                Bucket=os.getenv('S3_BUCKET_NAME'),
-                Key=key,
-                Body=json.dumps(analysis_data, indent=2),
-                ContentType='application/json'
-            )
+            body = json.dumps(analysis_data, indent=2)
+            with span('s3.put_object', key=key, size_bytes=len(body)) as call_span, self.breaker.guard():
+                response = self.s3.put_object(
+                    Bucket=os.getenv('S3_BUCKET_NAME'),
+                    Key=key,
+                    Body=body,
+                    ContentType='application/json'
+                )
+                record_aws_response(call_span, response)
             return True
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Failed to save analysis: {str(e)}")
             return False
@@ -89,8 +103,14 @@ class S3Client:
             Dict containing object data or None if not found
         """
         try:
-            response = self.s3.get_object(Bucket=bucket, Key=key)
-            return json.loads(response['Body'].read().decode('utf-8'))
+            with span('s3.get_object', bucket=bucket, key=key) as call_span, self.breaker.guard():
+                response = self.s3.get_object(Bucket=bucket, Key=key)
+                body = response['Body'].read()
+                record_aws_response(call_span, response)
+                call_span.set_attribute('size_bytes', len(body))
+            return json.loads(body.decode('utf-8'))
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get object {key} from bucket {bucket}: {str(e)}")
             return None
@@ -107,13 +127,17 @@ class S3Client:
             bool: True if successful, False otherwise
         """
         try:
-            self.s3.put_object(
-                Bucket=os.getenv('S3_BUCKET_NAME'),
-                Key=key,
-                Body=data,
-                ContentType='application/json'
-            )
+            with span('s3.put_object', key=key, size_bytes=len(data)) as call_span, self.breaker.guard():
+                response = self.s3.put_object(
+                    Bucket=os.getenv('S3_BUCKET_NAME'),
+                    Key=key,
+                    Body=data,
+                    ContentType='application/json'
+                )
+                record_aws_response(call_span, response)
             return True
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Failed to put object {key}: {str(e)}")
             return False
@@ -129,11 +153,15 @@ class S3Client:
             bool: True if successful, False otherwise
         """
         try:
-            self.s3.delete_object(
-                Bucket=os.getenv('S3_BUCKET_NAME'),
-                Key=key
-            )
+            with span('s3.delete_object', key=key) as call_span, self.breaker.guard():
+                response = self.s3.delete_object(
+                    Bucket=os.getenv('S3_BUCKET_NAME'),
+                    Key=key
+                )
+                record_aws_response(call_span, response)
             return True
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Error deleting object {key}: {str(e)}")
             return False 
\ No newline at end of file
@@ -0,0 +1,387 @@
+"""
+Lightweight in-process tracer for individual workflow runs.
+
+Every run gets a trace id and a tree of spans: one per graph node, LLM call,
+chain.invoke and S3/DynamoDB call, each carrying attributes such as token
+counts, object sizes and retries. The current span is kept in a context
+variable, so spans opened in thread pools that copy the caller's context
+(hedged LLM calls, the cultural fan-out) nest under the span that submitted
+them. Outside a trace, span() costs a context variable lookup.
+
+Finished traces are handed to a background thread and exported either as one
+JSON line per trace (a waterfall: spans ordered by start, with offsets) or as
+OTLP/JSON to a local collector.
+
+Environment variables:
+    TRACE_EXPORTER: none, jsonl or otlp (default none, tracing disabled)
+    TRACE_FILE: File the jsonl exporter appends to (default traces.jsonl)
+    OTEL_EXPORTER_OTLP_ENDPOINT: Collector base URL for otlp (default http://localhost:4318)
+    TRACE_SERVICE_NAME: service.name reported to the collector (default pickwise)
+    TRACE_QUEUE_SIZE: Finished traces waiting for export before new ones are dropped (default 1000)
+"""
+import contextvars
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar('current_span', default=None)
+
+_tracer: Optional["Tracer"] = None
+_lock = threading.Lock()
+
+
+class Span:
+    """One timed operation of a trace."""
+
+    __slots__ = (
+        'trace', 'trace_id', 'span_id', 'parent_id', 'name', 'attributes',
+        'start_ns', 'end_ns', '_started', 'status', 'error'
+    )
+
+    def __init__(self, trace: "_Trace", name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.trace_id = trace.trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = {key: value for key, value in attributes.items() if value is not None}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self._started = time.perf_counter_ns()
+        self.status = 'OK'
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = 'ERROR'
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        self.end_ns = self.start_ns + (time.perf_counter_ns() - self._started)
+        self.trace.add(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or self.start_ns) - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'duration_ms': round(self.duration_ms, 3),
+            'status': self.status,
+            'error': self.error,
+            'attributes': self.attributes
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span when no trace is active."""
+
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Trace:
+    """Spans finished so far for one trace id; spans finishing after the root are dropped."""
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self.closed = False
+        self.late_spans = 0
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            if self.closed:
+                self.late_spans += 1
+            else:
+                self.spans.append(span)
+
+    def close(self) -> List[Span]:
+        with self._lock:
+            self.closed = True
+            return sorted(self.spans, key=lambda span: span.start_ns)
+
+
+def waterfall(root: Span, spans: List[Span]) -> Dict[str, Any]:
+    """One trace as a JSON-ready waterfall: spans ordered by start with their offset from the root."""
+    return {
+        'trace_id': root.trace_id,
+        'name': root.name,
+        'start_ns': root.start_ns,
+        'duration_ms': round(root.duration_ms, 3),
+        'status': root.status,
+        'attributes': root.attributes,
+        'spans': [
+            {**span.to_dict(), 'offset_ms': round((span.start_ns - root.start_ns) / 1e6, 3)}
+            for span in spans
+        ]
+    }
+
+
+class JsonlExporter:
+    """Appends one waterfall per line to a local file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, root: Span, spans: List[Span]) -> None:
+        line = json.dumps(waterfall(root, spans), default=str)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+    def close(self) -> None:
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class OtlpHttpExporter:
+    """Posts spans as OTLP/JSON to a collector's /v1/traces endpoint."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        import httpx
+        self.url = endpoint.rstrip('/') + '/v1/traces'
+        self.service_name = service_name
+        self.client = httpx.Client(timeout=timeout)
+
+    def payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service_name}}]},
+                'scopeSpans': [{
+                    'scope': {'name': __name__},
+                    'spans': [
+                        {
+                            'traceId': span.trace_id,
+                            'spanId': span.span_id,
+                            **({'parentSpanId': span.parent_id} if span.parent_id else {}),
+                            'name': span.name,
+                            'kind': 1,
+                            'startTimeUnixNano': str(span.start_ns),
+                            'endTimeUnixNano': str(span.end_ns),
+                            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in span.attributes.items()],
+                            'status': {'code': 2, 'message': span.error} if span.status == 'ERROR' else {'code': 1}
+                        }
+                        for span in spans
+                    ]
+                }]
+            }]
+        }
+
+    def export(self, root: Span, spans: List[Span]) -> None:
+        response = self.client.post(self.url, json=self.payload(spans))
+        response.raise_for_status()
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class Tracer:
+    """Creates traces and exports finished ones from a background thread."""
+
+    def __init__(self, exporter=None, queue_size: int = 1000):
+        self.exporter = exporter
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.traces = 0
+        self.exported = 0
+        self.dropped = 0
+        self.export_errors = 0
+        self.late_spans = 0
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        kind = os.getenv('TRACE_EXPORTER', 'none').lower()
+        exporter = None
+        if kind == 'jsonl':
+            exporter = JsonlExporter(os.getenv('TRACE_FILE', 'traces.jsonl'))
+        elif kind == 'otlp':
+            exporter = OtlpHttpExporter(
+                os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT', 'http://localhost:4318'),
+                os.getenv('TRACE_SERVICE_NAME', 'pickwise')
+            )
+        elif kind != 'none':
+            logger.warning(f"[Tracing] Unknown TRACE_EXPORTER '{kind}', tracing disabled")
+        return cls(exporter, int(os.getenv('TRACE_QUEUE_SIZE', 1000)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def submit(self, root: Span, trace: _Trace) -> None:
+        spans = trace.close()
+        with self._lock:
+            self.traces += 1
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+                self._worker.start()
+        try:
+            self._queue.put_nowait((root, trace, spans))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            root, trace, spans = self._queue.get()
+            try:
+                self.exporter.export(root, spans)
+                with self._lock:
+                    self.exported += 1
+                    self.late_spans += trace.late_spans
+            except Exception as e:
+                with self._lock:
+                    self.export_errors += 1
+                logger.error(f"[Tracing] Failed to export trace {root.trace_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every submitted trace has been exported."""
+        self._queue.join()
+
+    def shutdown(self) -> None:
+        self.flush()
+        if self.exporter is not None:
+            self.exporter.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'exporter': type(self.exporter).__name__ if self.exporter else None,
+                'traces': self.traces,
+                'exported': self.exported,
+                'dropped': self.dropped,
+                'export_errors': self.export_errors,
+                'late_spans': self.late_spans,
+                'queued': self._queue.qsize()
+            }
+
+
+def get_tracer() -> Tracer:
+    """Return the process-shared tracer, configured from the environment on first use."""
+    global _tracer
+    with _lock:
+        if _tracer is None:
+            _tracer = Tracer.from_env()
+            register_metrics('tracing', _tracer.snapshot)
+        return _tracer
+
+
+def reset_tracer() -> None:
+    """Flush and forget the shared tracer so the next use re-reads the environment."""
+    global _tracer
+    with _lock:
+        tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.shutdown()
+
+
+def record_aws_response(call_span, response: Any) -> None:
+    """Add the retries and HTTP status of a boto3 response to a span."""
+    metadata = response.get('ResponseMetadata', {}) if isinstance(response, dict) else {}
+    call_span.set_attributes(
+        retries=metadata.get('RetryAttempts'),
+        http_status=metadata.get('HTTPStatusCode')
+    )
+
+
+def current_span():
+    """The innermost open span, or a no-op span outside a trace."""
+    return _current_span.get() or NOOP_SPAN
+
+
+@contextmanager
+def _open(span: Span) -> Iterator[Span]:
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+@contextmanager
+def start_trace(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Open the root span of a new trace, or a child span when a trace is already active.
+
+    The trace is exported when its root span closes. Yields a no-op span when
+    tracing is disabled.
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        with _open(Span(parent.trace, name, parent, attributes)) as child:
+            yield child
+        return
+
+    tracer = get_tracer()
+    if not tracer.enabled:
+        yield NOOP_SPAN
+        return
+
+    trace = _Trace()
+    root = Span(trace, name, None, attributes)
+    try:
+        with _open(root):
+            yield root
+    finally:
+        tracer.submit(root, trace)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Open a child of the current span; a no-op outside a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    with _open(Span(parent.trace, name, parent, attributes)) as child:
+        yield child
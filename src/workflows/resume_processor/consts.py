@@ -18,4 +18,26 @@ DEFAULT_ABSOLUTE_RATING_WEIGHTS = {
 DEFAULT_ABSOLUTE_RATING_THRESHOLD = 70.0  # 70% threshold
 
 # Default error boundary for absolute rating decisions
-DEFAULT_ABSOLUTE_RATING_ERROR_BOUNDARY = 10.0  # 10% boundary 
\ No newline at end of file
+DEFAULT_ABSOLUTE_RATING_ERROR_BOUNDARY = 10.0  # 10% boundary
+
+# Status of a run stopped early because a dependency's circuit breaker was open; safe to retry
+STATUS_DEPENDENCY_UNAVAILABLE = 'DEPENDENCY_UNAVAILABLE'
+
+# Status of a run aborted because it could no longer finish before the caller's deadline
+STATUS_DEADLINE_EXCEEDED = 'DEADLINE_EXCEEDED'
+
+# Statuses a finished run keeps instead of being marked COMPLETED
+ABORTED_STATUSES = (STATUS_DEPENDENCY_UNAVAILABLE, STATUS_DEADLINE_EXCEEDED)
+
+# Evaluation modes: 'two_call' runs the JD and cultural agents separately,
+# 'combined' scores everything with a single LLM call
+EVALUATION_MODE_TWO_CALL = 'two_call'
+EVALUATION_MODE_COMBINED = 'combined'
+
+# Analysis detail: 'full' analyses explain every score, 'scores' returns only the
+# scores and verdict, and the explanation is generated later on demand
+ANALYSIS_DETAIL_FULL = 'full'
+ANALYSIS_DETAIL_SCORES = 'scores'
+
+# Final statuses whose score-only analyses are explained at the end of the run
+DEFAULT_EXPLAIN_STATUSES = 'SELECTED,IN_CONSIDERATION'
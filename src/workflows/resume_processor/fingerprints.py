@@ -0,0 +1,204 @@
+"""
+Input fingerprints of the LLM nodes, for incremental re-evaluation.
+
+A node's fingerprint hashes everything its scores depend on: the resume, the
+job documents it reads, its prompts, the model and the settings that change
+what the prompts see (the JD digest and its version, the resume token budget,
+cultural fan-out). Fingerprints are computed once per run, before the first LLM
+node (so building the state stays cheap), and stored with the scores on the
+candidate's DynamoDB item. The job documents are hashed once per job context
+version, not once per run. A re-evaluation loads that item into the
+state as 'stored_results', and a node whose fingerprint is unchanged reuses the
+stored scores instead of calling the LLM. The router and absolute rating, which
+only apply weights and thresholds, always run again.
+
+In combined mode a single call scores both parts, so both fingerprints cover
+every document and the combined prompt.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional, Tuple, TYPE_CHECKING
+
+from workflows.resume_processor.consts import ANALYSIS_DETAIL_FULL, ANALYSIS_DETAIL_SCORES, EVALUATION_MODE_COMBINED
+from workflows.resume_processor.jd_digest import DIGEST_VERSION, digest_enabled
+from workflows.resume_processor.job_context import JOB_DOCUMENT_KEYS, get_job_documents
+from workflows.resume_processor.token_budget import get_token_budget
+
+if TYPE_CHECKING:
+    from utils.s3_client import S3Client
+
+# Job documents each node reads, besides the resume
+NODE_DOCUMENTS = {
+    'jd_analysis': ('jd_data',),
+    'cultural_agent': ('core_values_data', 'uniqueness_data', 'custom_criteria_data')
+}
+
+# State fields each node produces, as stored on the DynamoDB item
+NODE_OUTPUTS = {
+    'jd_analysis': ('jd_score',),
+    'cultural_agent': ('cultural_fit_score', 'uniqueness_score', 'custom_criteria_scores')
+}
+
+# DynamoDB attribute holding each node's fingerprint
+FINGERPRINT_ATTRIBUTES = {
+    'jd_analysis': 'jd_fingerprint',
+    'cultural_agent': 'cultural_fingerprint'
+}
+
+
+# document_version() of each job document, per job context (job_id, version)
+_context_versions: "OrderedDict[tuple, Dict[str, str]]" = OrderedDict()
+_context_versions_lock = threading.Lock()
+MAX_CONTEXT_VERSIONS = 256
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.blake2b('\0'.join(parts).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def document_version(document: Any) -> str:
+    """Content hash of a parsed job document, independent of key order and formatting."""
+    canonical = json.dumps(document, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def prompt_versions() -> Dict[str, str]:
+    """Hash of the prompts and output formats behind each node's scores, per node and for combined mode."""
+    from prompts.jd_agent_prompt import JD_AGENT_PROMPT
+    from prompts.constants import JD_OUTPUT_FORMAT, JD_SCORE_OUTPUT_FORMAT, SCORING_RUBRIC
+    from prompts.cultural_agent_prompt import CULTURAL_AGENT_PROMPT, CULTURAL_SCORE_PROMPT
+    from prompts.cultural_subagent_prompts import CULTURAL_FIT_PROMPT, UNIQUENESS_PROMPT, CUSTOM_CRITERION_PROMPT
+    from prompts.combined_agent_prompt import COMBINED_AGENT_PROMPT
+
+    return {
+        'jd_analysis': _digest(
+            JD_AGENT_PROMPT.template, json.dumps([JD_OUTPUT_FORMAT, JD_SCORE_OUTPUT_FORMAT, SCORING_RUBRIC])
+        ),
+        'cultural_agent': _digest(
+            CULTURAL_AGENT_PROMPT.template, CULTURAL_SCORE_PROMPT.template,
+            CULTURAL_FIT_PROMPT.template, UNIQUENESS_PROMPT.template, CUSTOM_CRITERION_PROMPT.template
+        ),
+        EVALUATION_MODE_COMBINED: _digest(COMBINED_AGENT_PROMPT.template, json.dumps([JD_OUTPUT_FORMAT, SCORING_RUBRIC]))
+    }
+
+
+def settings_versions(cultural_fanout: bool = False) -> Dict[str, str]:
+    """
+    Settings that change what each node's prompts see, per node and for combined mode.
+
+    The JD digest also ranks the resume entries kept under the token budget, so it
+    matters to every node.
+    """
+    shared = f"digest={DIGEST_VERSION if digest_enabled() else 'off'};resume_tokens={get_token_budget()}"
+    return {
+        'jd_analysis': shared,
+        'cultural_agent': f"{shared};fanout={cultural_fanout}",
+        EVALUATION_MODE_COMBINED: shared
+    }
+
+
+def compute_fingerprints(
+    resume_version: str,
+    document_versions: Mapping[str, str],
+    evaluation_mode: Optional[str] = None,
+    cultural_fanout: bool = False
+) -> Dict[str, str]:
+    """
+    Fingerprint the inputs of every LLM node.
+
+    Args:
+        resume_version: Content hash of the raw resume
+        document_versions: document_version() of each job document, keyed by its state key
+        evaluation_mode: 'two_call' or 'combined'
+        cultural_fanout: Whether the cultural agent scores each part with its own call
+
+    Returns:
+        Dict[str, str]: Fingerprint per node name
+    """
+    model = os.getenv('LLM_MODEL_NAME', 'gpt-4o-mini')
+    versions = prompt_versions()
+    settings = settings_versions(cultural_fanout)
+    if evaluation_mode == EVALUATION_MODE_COMBINED:
+        combined = _digest(
+            resume_version, *(document_versions[key] for key in sorted(document_versions)),
+            versions[EVALUATION_MODE_COMBINED], settings[EVALUATION_MODE_COMBINED], model
+        )
+        return {node: combined for node in NODE_DOCUMENTS}
+    return {
+        node: _digest(resume_version, *(document_versions[key] for key in documents), versions[node], settings[node], model)
+        for node, documents in NODE_DOCUMENTS.items()
+    }
+
+
+def job_document_versions(state: Mapping[str, Any], s3_client: Optional["S3Client"] = None) -> Dict[str, str]:
+    """document_version() of each job document, computed once per job context version."""
+    ref = state.get('job_context_ref')
+    key = (ref['job_id'], ref['version']) if ref else None
+    if key is not None:
+        with _context_versions_lock:
+            versions = _context_versions.get(key)
+            if versions is not None:
+                _context_versions.move_to_end(key)
+                return versions
+    job_documents = get_job_documents(state, s3_client)
+    versions = {name: document_version(job_documents[name]) for name in JOB_DOCUMENT_KEYS}
+    if key is not None:
+        with _context_versions_lock:
+            _context_versions[key] = versions
+            while len(_context_versions) > MAX_CONTEXT_VERSIONS:
+                _context_versions.popitem(last=False)
+    return versions
+
+
+def get_fingerprints(
+    state: Dict[str, Any],
+    cultural_fanout: bool = False,
+    s3_client: Optional["S3Client"] = None
+) -> Dict[str, str]:
+    """Fingerprints of the run's LLM nodes, computed on first use and kept in the state."""
+    if not state.get('fingerprints'):
+        state['fingerprints'] = compute_fingerprints(
+            state.get('resume_version') or document_version(state.get('resume_data')),
+            job_document_versions(state, s3_client),
+            state.get('evaluation_mode'),
+            cultural_fanout
+        )
+    return state['fingerprints']
+
+
+def reusable_nodes(state: Mapping[str, Any], nodes: Tuple[str, ...]) -> bool:
+    """
+    Whether the stored results of every one of `nodes` can stand in for running them.
+
+    They can when the stored fingerprints match the run's, every output was stored,
+    and the stored analyses are at least as detailed as the run asks for.
+    """
+    stored = state.get('stored_results')
+    if not stored:
+        return False
+    fingerprints = state.get('fingerprints') or {}
+    if state.get('analysis_detail') != ANALYSIS_DETAIL_SCORES and stored.get('analysis_detail', ANALYSIS_DETAIL_FULL) != ANALYSIS_DETAIL_FULL:
+        return False
+    return all(
+        fingerprints.get(node) is not None
+        and stored.get(FINGERPRINT_ATTRIBUTES[node]) == fingerprints[node]
+        and all(stored.get(field) is not None for field in NODE_OUTPUTS[node])
+        for node in nodes
+    )
+
+
+def apply_stored_results(state: Dict[str, Any], nodes: Tuple[str, ...]) -> Dict[str, Any]:
+    """Copy the stored outputs of `nodes` into the state and record them as reused."""
+    stored = state['stored_results']
+    for node in nodes:
+        for field in NODE_OUTPUTS[node]:
+            state[field] = stored[field]
+    state['reused_nodes'] = [*(state.get('reused_nodes') or []), *nodes]
+    if stored.get('analysis_detail'):
+        state['analysis_detail'] = stored['analysis_detail']
+    return state
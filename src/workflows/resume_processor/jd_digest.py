@@ -0,0 +1,249 @@
+"""
+Job-level requirement digest of the job description.
+
+The JD agent (and the combined agent) used to receive the full raw JD for every
+candidate and re-derive the required and preferred skills, years and degree from
+it. The digest extracts those requirements once per JD version into a compact
+structure, cached by the JD's content hash, and the prompts consume the digest
+instead. Fields that do not describe requirements (location, reporting line,
+culture fit, which the cultural agent covers) are left out; unrecognised fields
+are kept under 'other' so nothing requirement-like is lost. The digest's terms
+also drive the local ranking of resume entries for the token budget.
+
+Extraction is local and deterministic, so it costs no LLM call.
+
+Environment variables:
+    JD_DIGEST_ENABLED: Give the agents the digest instead of the raw JD (default true)
+    JD_DIGEST_MAX_ENTRIES: Digests kept in memory (default 256)
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the digest's extraction or rendering changes what the prompts see,
+# so stored scores computed from an older digest are not reused
+DIGEST_VERSION = 2
+
+# JD fields holding each requirement, by the names seen in job descriptions
+FIELD_ALIASES = {
+    'title': ('title', 'job_title', 'role', 'position'),
+    'required_skills': ('required_skills', 'requirements', 'must_have', 'must_have_skills', 'skills'),
+    'preferred_skills': ('preferred_skills', 'nice_to_have', 'good_to_have', 'bonus_skills'),
+    'experience': ('experience', 'experience_required', 'years_of_experience', 'min_experience'),
+    'education': ('education', 'degree', 'qualification', 'qualifications'),
+    'responsibilities': ('responsibilities', 'duties', 'role_responsibilities')
+}
+
+# JD fields that say nothing about the candidate's requirements
+IGNORED_FIELDS = (
+    'location', 'reporting_to', 'culture_fit', 'culture', 'values', 'benefits', 'perks',
+    'salary', 'compensation', 'about', 'about_company', 'company', 'how_to_apply'
+)
+
+_YEARS = re.compile(r'(\d+(?:\.\d+)?)\s*(?:(\+)|(?:-|–|to)\s*(\d+(?:\.\d+)?))?\s*\+?\s*(?:years?|yrs?)', re.IGNORECASE)
+# Phrasing that makes a plain 'N years' a requirement ('at least 5 years', '5 years of Go')
+_YEARS_PREFIX = re.compile(r'(?:at\s+least|minimum(?:\s+of)?|min\.?|over|more\s+than)\s*$', re.IGNORECASE)
+_YEARS_SUFFIX = re.compile(r'\s+(?:of|experience)\b', re.IGNORECASE)
+# Short abbreviations ('BE', 'MS') are also common words, so they only count with
+# their dots ('B.E.') or in capitals before 'degree' or 'in' ('BE in Computer Science')
+_DEGREE_LEVELS = (
+    ('doctorate', re.compile(r'\b(ph\.?d|doctorate|doctoral)\b', re.IGNORECASE)),
+    ('master', re.compile(
+        r"\b(?:master'?s?|m\.?sc|m\.?tech|mba)\b|\bm\.[se]\.|\b(?-i:M\.?[SE]\.?)\s+(?:degree|in)\b",
+        re.IGNORECASE
+    )),
+    ('bachelor', re.compile(
+        r"\b(?:bachelor'?s?|b\.?sc|b\.?tech|undergraduate)\b|\bb\.[sea]\.|\b(?-i:B\.?[SEA]\.?)\s+(?:degree|in)\b",
+        re.IGNORECASE
+    ))
+)
+
+
+def compute_jd_hash(jd_data: Any) -> str:
+    """Content hash of a parsed JD, independent of key order and formatting."""
+    canonical = json.dumps(jd_data, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def parse_years(text: Any) -> Optional[Dict[str, float]]:
+    """
+    Parse a years-of-experience requirement such as '6-10 years' or '5+ years'.
+
+    Years mentioned in passing ('worked 3 years ago') are skipped: a plain 'N years'
+    only counts with requirement phrasing ('at least N years', 'N years of Go') or
+    when it is the whole text.
+
+    Returns:
+        Dict with 'min' and, for a range, 'max'; None when no years are required
+    """
+    if isinstance(text, (int, float)):
+        return {'min': text}
+    text = str(text or '')
+    match = next((match for match in _YEARS.finditer(text) if _is_requirement(text, match)), None)
+    if not match:
+        return None
+    low, _, high = match.groups()
+    years = {'min': _number(low)}
+    if high:
+        years['max'] = _number(high)
+    return years
+
+
+def _is_requirement(text: str, match: "re.Match") -> bool:
+    _, plus, high = match.groups()
+    return bool(
+        plus or high
+        or _YEARS_PREFIX.search(text, 0, match.start())
+        or _YEARS_SUFFIX.match(text, match.end())
+        or match.group(0).strip() == text.strip()
+    )
+
+
+def _number(value: str):
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def parse_degree_level(text: Any) -> Optional[str]:
+    """Lowest degree level named in an education requirement: doctorate, master or bachelor."""
+    text = str(text or '')
+    levels = [level for level, pattern in _DEGREE_LEVELS if pattern.search(text)]
+    return levels[-1] if levels else None
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        return [part.strip() for part in re.split(r'[;\n]', value) if part.strip()]
+    return [value]
+
+
+def _field(jd_data: Mapping[str, Any], requirement: str) -> Tuple[Optional[str], Any]:
+    for key in FIELD_ALIASES[requirement]:
+        if key in jd_data:
+            return key, jd_data[key]
+    return None, None
+
+
+def build_jd_digest(jd_data: Any) -> Dict[str, Any]:
+    """
+    Extract the requirement digest of a job description.
+
+    Args:
+        jd_data: Parsed job description
+
+    Returns:
+        Dict with title, required_skills, preferred_skills, experience (text and
+        parsed years), education (text and degree level), responsibilities and
+        'other' unrecognised fields; a JD that is not a JSON object is kept as 'description'
+    """
+    if not isinstance(jd_data, dict):
+        return {'description': jd_data}
+
+    digest: Dict[str, Any] = {}
+    used = set()
+    for requirement in FIELD_ALIASES:
+        key, value = _field(jd_data, requirement)
+        if key is None or value in (None, '', []):
+            continue
+        used.add(key)
+        if requirement == 'experience':
+            digest['experience'] = {'text': value, 'years': parse_years(value)}
+        elif requirement == 'education':
+            digest['education'] = {'text': value, 'degree_level': parse_degree_level(value)}
+        elif requirement == 'title':
+            digest['title'] = value
+        else:
+            digest[requirement] = _as_list(value)
+
+    other = {
+        key: value for key, value in jd_data.items()
+        if key not in used and key.lower() not in IGNORED_FIELDS and value not in (None, '', [])
+    }
+    if other:
+        digest['other'] = other
+    return digest
+
+
+def render_jd_digest(digest: Mapping[str, Any]) -> str:
+    """Compact JSON rendering of a digest, as put into the prompts."""
+    return json.dumps(digest, ensure_ascii=False, separators=(',', ':'))
+
+
+class JDDigestCache:
+    """Thread-safe LRU of JD digests and their renderings, keyed by JD content hash."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, jd_data: Any) -> Tuple[Dict[str, Any], str]:
+        """
+        Return the digest of `jd_data` and its rendering, building them once per JD version.
+
+        The returned digest is shared and must not be mutated.
+        """
+        key = compute_jd_hash(jd_data)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        digest = build_jd_digest(jd_data)
+        entry = (digest, render_jd_digest(digest))
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logger.info(f"[JDDigest] Built digest {key}: {len(entry[1])} chars from a {len(json.dumps(jd_data, default=str))} char JD")
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Process-wide cache used by the agents
+jd_digest_cache = JDDigestCache(int(os.getenv('JD_DIGEST_MAX_ENTRIES', 256)))
+register_metrics('jd_digest', jd_digest_cache.snapshot)
+
+
+def digest_enabled() -> bool:
+    return os.getenv('JD_DIGEST_ENABLED', 'true').lower() == 'true'
+
+
+def get_jd_digest(jd_data: Any) -> Dict[str, Any]:
+    """Requirement digest of the job description (see build_jd_digest)."""
+    return jd_digest_cache.get_or_build(jd_data)[0]
+
+
+def get_jd_prompt_input(jd_data: Any) -> str:
+    """
+    Job description text for the prompts: the rendered digest, or the raw JD when
+    JD_DIGEST_ENABLED is false.
+    """
+    if not digest_enabled():
+        return json.dumps(jd_data)
+    return jd_digest_cache.get_or_build(jd_data)[1]
@@ -0,0 +1,174 @@
+"""
+Shared, read-only job context for the resume processor workflow.
+
+Job-level documents (JD, core values, uniqueness definition, custom criteria) are
+the same for every candidate of a job. In slim state mode they are stored once per
+process, keyed by job_id and a content version, and the workflow state only carries
+a reference that nodes resolve when they need the documents. The reference also
+names the S3 keys the documents were read from, so a context evicted while runs
+of the job are still in flight is reloaded rather than failing them.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utils.s3_client import S3Client
+
+logger = logging.getLogger(__name__)
+
+# State keys of the job-level documents held in the job context
+JOB_DOCUMENT_KEYS = ('jd_data', 'core_values_data', 'uniqueness_data', 'custom_criteria_data')
+
+# Workflow state modes: 'full' carries every document in the state, 'slim' carries a job context reference
+STATE_MODE_FULL = 'full'
+STATE_MODE_SLIM = 'slim'
+
+
+@dataclass(frozen=True)
+class JobContext:
+    """
+    Job-level documents shared by every run of a job.
+
+    The documents are shared between concurrent runs and must not be mutated.
+    """
+    job_id: str
+    version: str
+    documents: Mapping[str, Dict[str, Any]]
+    # S3 key of each document, keyed by state key
+    sources: Mapping[str, str] = field(default_factory=dict)
+
+    @property
+    def ref(self) -> Dict[str, Any]:
+        """Reference to this context, as stored in the workflow state."""
+        return {'job_id': self.job_id, 'version': self.version, 'sources': dict(self.sources)}
+
+
+def compute_version(raw_documents: Mapping[str, bytes]) -> str:
+    """
+    Compute a content version for a set of raw job documents.
+
+    Args:
+        raw_documents: Raw document bytes keyed by state key
+
+    Returns:
+        str: Short hex digest that changes whenever any document changes
+    """
+    digest = hashlib.sha256()
+    for key in JOB_DOCUMENT_KEYS:
+        digest.update(key.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(raw_documents[key])
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+class JobContextStore:
+    """Bounded, thread-safe LRU of job contexts keyed by (job_id, version)."""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._contexts: "OrderedDict[tuple, JobContext]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job_id: str, version: str) -> Optional[JobContext]:
+        with self._lock:
+            context = self._contexts.get((job_id, version))
+            if context is not None:
+                self._contexts.move_to_end((job_id, version))
+            return context
+
+    def put(
+        self,
+        job_id: str,
+        version: str,
+        documents: Mapping[str, Dict[str, Any]],
+        sources: Optional[Mapping[str, str]] = None
+    ) -> JobContext:
+        """
+        Store job documents, returning the existing context if another run stored it first.
+        """
+        with self._lock:
+            existing = self._contexts.get((job_id, version))
+            if existing is not None:
+                self._contexts.move_to_end((job_id, version))
+                return existing
+
+            context = JobContext(job_id=job_id, version=version, documents=dict(documents), sources=dict(sources or {}))
+            self._contexts[(job_id, version)] = context
+            while len(self._contexts) > self.max_entries:
+                evicted, _ = self._contexts.popitem(last=False)
+                logger.info(f"[JobContextStore] Evicted job context {evicted}")
+            return context
+
+    def clear(self) -> None:
+        with self._lock:
+            self._contexts.clear()
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+
+# Process-wide store used by WorkflowService and the nodes
+job_context_store = JobContextStore(int(os.getenv('JOB_CONTEXT_MAX_ENTRIES', 128)))
+
+
+def get_job_documents(state: Mapping[str, Any], s3_client: Optional["S3Client"] = None) -> Mapping[str, Dict[str, Any]]:
+    """
+    Resolve the job-level documents for a workflow state.
+
+    Works for both state modes: documents carried in the state are returned as is,
+    otherwise the state's job context reference is looked up in the shared store,
+    and reloaded from S3 if it was evicted.
+
+    Args:
+        state: Current workflow state
+        s3_client: S3 client to reload an evicted context with; a new one is created when omitted
+
+    Returns:
+        Mapping of state key (e.g. 'jd_data') to document
+
+    Raises:
+        LookupError: If the referenced job context was evicted and cannot be reloaded
+            as it was, e.g. because a document has changed since
+    """
+    ref = state.get('job_context_ref')
+    if not ref:
+        return {key: state.get(key) for key in JOB_DOCUMENT_KEYS}
+
+    context = job_context_store.get(ref['job_id'], ref['version'])
+    if context is None:
+        context = reload_job_context(ref, s3_client)
+    return context.documents
+
+
+def reload_job_context(ref: Mapping[str, Any], s3_client: Optional["S3Client"] = None) -> JobContext:
+    """
+    Read an evicted job context back from the S3 keys in its reference.
+
+    Raises:
+        LookupError: If the reference has no sources or the documents no longer match its version
+    """
+    sources = ref.get('sources') or {}
+    if set(sources) != set(JOB_DOCUMENT_KEYS):
+        raise LookupError(f"Job context {ref['job_id']}@{ref['version']} is not loaded")
+    if s3_client is None:
+        from utils.s3_client import S3Client
+        s3_client = S3Client()
+
+    objects = s3_client.batch_get_objects([sources[key] for key in JOB_DOCUMENT_KEYS])
+    raw_documents = {key: objects[sources[key]]['Body'].read() for key in JOB_DOCUMENT_KEYS}
+    if compute_version(raw_documents) != ref['version']:
+        raise LookupError(f"Job context {ref['job_id']}@{ref['version']} was evicted and its documents have changed since")
+    logger.info(f"[JobContextStore] Reloaded evicted job context {ref['job_id']}@{ref['version']}")
+    return job_context_store.put(
+        ref['job_id'],
+        ref['version'],
+        {key: json.loads(raw.decode('utf-8')) for key, raw in raw_documents.items()},
+        sources
+    )
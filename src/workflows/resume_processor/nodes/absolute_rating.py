@@ -4,24 +4,28 @@ Calculates final scores and makes decisions based on thresholds.
 """
 from decimal import Decimal
 import logging
-from typing import Dict, Any, Tuple
-from workflows.resume_processor.state import ResumeProcessorState
+from typing import Dict, Any, Optional, Tuple
+from workflows.resume_processor.state import ResumeProcessorState, mark_dependency_unavailable
 from workflows.resume_processor.consts import (
     DEFAULT_ABSOLUTE_RATING_WEIGHTS,
     DEFAULT_ABSOLUTE_RATING_THRESHOLD,
     DEFAULT_ABSOLUTE_RATING_ERROR_BOUNDARY
 )
-import json
-from utils.config import load_config
 from utils.dynamo_client import DynamoClient
-load_config()
+from utils.circuit_breaker import CircuitOpenError
+from utils.logger import Payload
 
 logger = logging.getLogger(__name__)
 
 class AbsoluteRatingNode:
-    def __init__(self):
-        """Initialize Absolute Rating node."""
-        pass
+    def __init__(self, dynamo_client: Optional[DynamoClient] = None):
+        """
+        Initialize Absolute Rating node.
+
+        Args:
+            dynamo_client: DynamoDB client to use; a new one is created per run when omitted
+        """
+        self.dynamo_client = dynamo_client
 
     def compute_rating(self, state: ResumeProcessorState) -> ResumeProcessorState:
         """
@@ -34,11 +38,14 @@ class AbsoluteRatingNode:
             Tuple[ResumeProcessorState, str]: Updated state and next node
         """
         try:
-            dynamo_client = DynamoClient()
+            dynamo_client = self.dynamo_client or DynamoClient()
             # Get weights from state or use defaults
             weights = state.get('weights') or DEFAULT_ABSOLUTE_RATING_WEIGHTS
 
-            logger.info(f"[scores from previous nodes] Cultural fit score: {state['cultural_fit_score']} Uniqueness score: {state['uniqueness_score']} JD score: {state['jd_score']} Custom criteria scores: {json.dumps(state['custom_criteria_scores'])}")
+            logger.info(
+                "[scores from previous nodes] Cultural fit score: %s Uniqueness score: %s JD score: %s Custom criteria scores: %s",
+                state['cultural_fit_score'], state['uniqueness_score'], state['jd_score'], Payload(state['custom_criteria_scores'])
+            )
             
             # Get threshold and error boundary from state or use defaults
             threshold = state.get('absolute_grading_threshold') or DEFAULT_ABSOLUTE_RATING_THRESHOLD
@@ -77,6 +84,8 @@ class AbsoluteRatingNode:
             state['next_node'] = 'end'
             return state
 
+        except CircuitOpenError as e:
+            return mark_dependency_unavailable(state, "[AbsoluteRatingNode]", e)
         except Exception as e:
             # Only set FAILED status for actual errors
             logger.error(f"[AbsoluteRatingNode] Error in absolute rating computation: {str(e)}")
@@ -0,0 +1,138 @@
+"""
+Combined Evaluation Agent node for the resume processor workflow.
+Runs the JD analysis and the cultural analysis as a single LLM call.
+"""
+import json
+import logging
+from typing import Dict, Any, TYPE_CHECKING
+from prompts.combined_agent_prompt import COMBINED_AGENT_PROMPT
+from prompts.constants import SCORING_RUBRIC, JD_OUTPUT_FORMAT
+from workflows.resume_processor.state import ResumeProcessorState, mark_dependency_unavailable, mark_deadline_exceeded
+from workflows.resume_processor.job_context import get_job_documents
+from workflows.resume_processor.token_budget import get_budgeted_resume
+from workflows.resume_processor.jd_digest import get_jd_prompt_input
+from workflows.resume_processor.consts import ANALYSIS_DETAIL_FULL
+from workflows.resume_processor.nodes.jd_analysis_agent import JDAnalysisAgent
+from workflows.resume_processor.nodes.cultural_agent import CulturalAgent
+from workflows.resume_processor.nodes.router import RouterNode
+from utils.logger import Payload
+from utils.circuit_breaker import CircuitOpenError
+from utils.deadline import DeadlineExceeded
+from services.llm_invoker import invoke_llm
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+logger = logging.getLogger(__name__)
+
+class CombinedEvaluationAgent:
+    def __init__(self, llm: "ChatOpenAI", jd_agent: JDAnalysisAgent, cultural_agent: CulturalAgent):
+        """
+        Initialize Combined Evaluation Agent.
+
+        Args:
+            llm: Configured LLM instance
+            jd_agent: JD agent whose record_analysis saves the JD part
+            cultural_agent: Cultural agent whose record_analysis saves the cultural part
+        """
+        self.llm = llm
+        self.prompt = COMBINED_AGENT_PROMPT
+        self.jd_agent = jd_agent
+        self.cultural_agent = cultural_agent
+
+    def evaluate(self, state: ResumeProcessorState) -> ResumeProcessorState:
+        """
+        Score JD match, cultural fit, uniqueness and custom criteria with one LLM call.
+
+        Both analyses are saved exactly as the separate agents save them. The router
+        still applies jd_threshold locally and then skips the cultural agent. The
+        cultural part of a candidate below jd_threshold is not applicable and is
+        discarded, as the two-call mode never scores it.
+
+        Args:
+            state: Current workflow state
+
+        Returns:
+            ResumeProcessorState: Updated state, routed to the router or, on failure, to the end
+        """
+        logger.info("[Combined Evaluation Agent] Starting Combined Evaluation Agent...")
+        try:
+            job_documents = get_job_documents(state, self.jd_agent.s3_client)
+            resume, truncation = get_budgeted_resume(state, job_documents)
+            if truncation:
+                state['resume_truncation'] = truncation
+
+            prompt_input = {
+                'resume': resume,
+                'job_description': get_jd_prompt_input(job_documents['jd_data']),
+                'scoring_rubric': json.dumps(SCORING_RUBRIC, indent=2),
+                'jd_output_format': json.dumps(JD_OUTPUT_FORMAT, indent=2),
+                'core_values_json': json.dumps(job_documents['core_values_data'], indent=2),
+                'uniqueness_definition': json.dumps(job_documents['uniqueness_data']),
+                'custom_criteria': json.dumps(job_documents['custom_criteria_data'], indent=2)
+            }
+
+            chain = self.prompt | self.llm
+            analysis_result = invoke_llm(chain, prompt_input, name='combined_evaluation')
+
+            logger.info("[Combined Evaluation Agent] LLM OUTPUT: %s", Payload(analysis_result))
+
+            try:
+                analysis_data = self._parse_analysis_result(analysis_result)
+            except Exception as e:
+                logger.error(f"[Combined Evaluation Agent] Failed to parse analysis result: {str(e)}")
+                state['error_message'] = f"[Combined Evaluation Agent] Failed to parse analysis result: {str(e)}"
+                state['status'] = 'FAILED'
+                state['next_node'] = 'end'
+                return state
+
+            # The combined call always writes the full analyses
+            state['analysis_detail'] = ANALYSIS_DETAIL_FULL
+            state = self.jd_agent.record_analysis(state, analysis_data['jd_analysis'])
+            if state['next_node'] == 'end':
+                return state
+
+            if not RouterNode.passes_jd_threshold(state):
+                logger.info("[Combined Evaluation Agent] Below jd_threshold, cultural scores not recorded")
+                state['next_node'] = 'router'
+                return state
+
+            state = self.cultural_agent.record_analysis(state, analysis_data['cultural_analysis'])
+            if state['next_node'] == 'end':
+                return state
+
+            state['next_node'] = 'router'
+            return state
+
+        except CircuitOpenError as e:
+            return mark_dependency_unavailable(state, "[Combined Evaluation Agent]", e)
+        except DeadlineExceeded as e:
+            return mark_deadline_exceeded(state, "[Combined Evaluation Agent]", str(e))
+        except Exception as e:
+            logger.error(f"Unexpected error in combined evaluation: {str(e)}")
+            state['error_message'] = f"[Combined Evaluation Agent] Unexpected error: {str(e)}"
+            state['status'] = 'FAILED'
+            state['next_node'] = 'end'
+            return state
+
+    def _parse_analysis_result(self, result: str) -> Dict[str, Any]:
+        """
+        Parse the combined LLM result into its JD and cultural parts.
+
+        Args:
+            result: Raw LLM analysis result
+
+        Returns:
+            Dict with 'jd_analysis' and 'cultural_analysis'
+
+        Raises:
+            ValueError: If either part is missing
+        """
+        if hasattr(result, 'content'):
+            result = result.content
+
+        result_dict = json.loads(result)
+        missing = [part for part in ('jd_analysis', 'cultural_analysis') if not isinstance(result_dict.get(part), dict)]
+        if missing:
+            raise ValueError(f"Missing {', '.join(missing)} in combined analysis")
+        return result_dict
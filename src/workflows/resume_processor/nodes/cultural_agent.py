@@ -1,38 +1,83 @@
 """
 Cultural Agent node for the resume processor workflow.
 Analyzes cultural fit, uniqueness, and custom criteria using LLM.
+
+In fan-out mode (CULTURAL_AGENT_FANOUT=true) cultural fit, uniqueness and each
+custom criterion are scored by concurrent, smaller LLM calls and merged into the
+same analysis shape, so latency is that of the slowest call rather than growing
+with the number of custom criteria.
+
+In the fast analysis mode (analysis_detail 'scores') a single call returns only
+the scores, fan-out or not; the justifications are generated on demand later.
 """
+import contextvars
 import logging
 import json
-from typing import Dict, Any, Tuple
-from langchain_openai import ChatOpenAI
-from ..state import ResumeProcessorState
-from utils.config import load_config
-from prompts.cultural_agent_prompt import CULTURAL_AGENT_PROMPT
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+from ..state import ResumeProcessorState, mark_dependency_unavailable, mark_deadline_exceeded, with_truncation_report
+from ..job_context import get_job_documents
+from ..token_budget import get_budgeted_resume
+from ..consts import ANALYSIS_DETAIL_SCORES
+from prompts.cultural_agent_prompt import CULTURAL_AGENT_PROMPT, CULTURAL_SCORE_PROMPT
+from prompts.cultural_subagent_prompts import CULTURAL_FIT_PROMPT, UNIQUENESS_PROMPT, CUSTOM_CRITERION_PROMPT
 from utils.s3_client import S3Client
 from utils.dynamo_client import DynamoClient
+from utils.logger import Payload
+from utils.circuit_breaker import CircuitOpenError
+from utils.deadline import DeadlineExceeded
+from services.llm_invoker import invoke_llm
 from decimal import Decimal
 
-load_config()
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 logger = logging.getLogger(__name__)
 
+# Parts scored by their own concurrent call in fan-out mode; each call's latency
+# is recorded by the invoker as 'cultural_agent.<part>'
+FANOUT_PARTS = ('cultural_fit', 'uniqueness', 'custom_criterion')
+
+# Shared by every CulturalAgent in the process; created on first fan-out
+_fanout_executor: Optional[ThreadPoolExecutor] = None
+_fanout_lock = threading.Lock()
+
+def _get_fanout_executor() -> ThreadPoolExecutor:
+    global _fanout_executor
+    with _fanout_lock:
+        if _fanout_executor is None:
+            _fanout_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv('CULTURAL_FANOUT_MAX_WORKERS', 16)),
+                thread_name_prefix='cultural-fanout'
+            )
+        return _fanout_executor
+
 class CulturalAgent:
     def __init__(
         self,
-        llm: ChatOpenAI
+        llm: "ChatOpenAI",
+        s3_client: Optional[S3Client] = None,
+        dynamo_client: Optional[DynamoClient] = None,
+        fanout: Optional[bool] = None
     ):
         """
         Initialize Cultural Agent.
         
         Args:
-            s3_client: S3 client instance
-            dynamo_client: DynamoDB client instance
-            model_name: LLM model name
-            temperature: LLM temperature setting
+            llm: Configured LLM instance
+            s3_client: S3 client instance; a new one is created per run when omitted
+            dynamo_client: DynamoDB client instance; a new one is created per run when omitted
+            fanout: Score each part with its own concurrent call; defaults to CULTURAL_AGENT_FANOUT
         """
         self.llm = llm
         self.prompt = CULTURAL_AGENT_PROMPT
+        self.s3_client = s3_client
+        self.dynamo_client = dynamo_client
+        if fanout is None:
+            fanout = os.getenv('CULTURAL_AGENT_FANOUT', 'false').lower() == 'true'
+        self.fanout = fanout
 
 
     def analyze_cultural_fit(self, state: ResumeProcessorState) -> Tuple[ResumeProcessorState, str]:
@@ -47,34 +92,27 @@ class CulturalAgent:
         """
         logger.info(f"[Cultural Agent] Starting Cultural Agent...")
         try:
-            s3_client = S3Client()
-            dynamo_client = DynamoClient()
+            job_documents = get_job_documents(state, self.s3_client)
+            resume, truncation = get_budgeted_resume(state, job_documents)
+            if truncation:
+                state['resume_truncation'] = truncation
+
+            fast = state.get('analysis_detail') == ANALYSIS_DETAIL_SCORES
+            if self.fanout and not fast:
+                return self.record_analysis(state, self._analyze_fanout(resume, job_documents))
 
             # Prepare input for LLM
-            prompt_input = {
-                'resume_json': json.dumps(state['resume_data'], indent=2),
-                'core_values_json': json.dumps(state['core_values_data'], indent=2),
-                'uniqueness_definition': json.dumps(state['uniqueness_data']),
-                'custom_criteria': json.dumps(state['custom_criteria_data'], indent=2)
-            }
+            prompt_input = self.build_prompt_input(resume, job_documents)
 
             # Get LLM analysis
-            chain = self.prompt | self.llm
-            analysis_result = chain.invoke(prompt_input)
+            chain = (CULTURAL_SCORE_PROMPT if fast else self.prompt) | self.llm
+            analysis_result = invoke_llm(chain, prompt_input, name='cultural_agent')
             
-            logger.info(f"[Cultural Agent] Cultural AGENT LLM OUTPUT: {analysis_result}")
+            logger.info("[Cultural Agent] Cultural AGENT LLM OUTPUT: %s", Payload(analysis_result))
 
-            # Parse and validate analysis result
+            # Parse analysis result
             try:
                 analysis_data = self._parse_analysis_result(analysis_result)
-
-                # update the state with scores
-                state['cultural_fit_score'] = analysis_data['cultural_fit_score']
-                state['uniqueness_score'] = analysis_data['uniqueness_score']
-                state['custom_criteria_scores'] = analysis_data['custom_criteria_scores']
-
-                logger.info(f"[Cultural Agent] Scores updated in state: cultural_fit_score: {state['cultural_fit_score']}, uniqueness_score: {state['uniqueness_score']}, custom_criteria_scores: {json.dumps(state['custom_criteria_scores'], indent=2)}")
-                
             except Exception as e:
                 logger.error(f"[Cultural Agent] Failed to parse cultural analysis result: {str(e)}")
                 state['error_message'] = f"[Cultural Agent] Failed to parse cultural analysis result: {str(e)}"
@@ -82,66 +120,211 @@ class CulturalAgent:
                 state['next_node'] = 'end'
                 return state
 
-            # Save analysis to S3 & DynamoDB
-            try:
-                analysis_key = f"{state['job_id']}/{state['candidate_id']}/cultural_analysis.json"
-                if not s3_client.put_object(analysis_key, json.dumps(analysis_data, indent=2)):
-                    logger.error(f"[Cultural Agent] Failed to save cultural analysis to S3: {analysis_key} with error: {str(e)}")
-                    state['error_message'] = f"[Cultural Agent] Failed to save cultural analysis to S3: {analysis_key} with error: {str(e)}"
-                    state['status'] = 'FAILED'
-                    state['next_node'] = 'end'
-                    return state
-                
-                logger.info(f"Cultural analysis saved successfully to S3: {analysis_key}")
-                state['cultural_analysis_url'] = analysis_key
+            return self.record_analysis(state, analysis_data)
 
+        except CircuitOpenError as e:
+            return mark_dependency_unavailable(state, "[Cultural Agent]", e)
+        except DeadlineExceeded as e:
+            return mark_deadline_exceeded(state, "[Cultural Agent]", str(e))
+        except Exception as e:
+            logger.error(f"Unexpected error in cultural analysis: {str(e)}")
+            state['error_message'] = f"[Cultural Agent] Unexpected error: {str(e)}"
+            state['status'] = 'FAILED'
+            state['next_node'] = 'end'
+            return state 
 
-            except Exception as e:
+    @staticmethod
+    def build_prompt_input(resume: str, job_documents: Dict[str, Any]) -> Dict[str, Any]:
+        """Input of CULTURAL_AGENT_PROMPT (and CULTURAL_SCORE_PROMPT) for a resume."""
+        return {
+            'resume_json': resume,
+            'core_values_json': json.dumps(job_documents['core_values_data'], indent=2),
+            'uniqueness_definition': json.dumps(job_documents['uniqueness_data']),
+            'custom_criteria': json.dumps(job_documents['custom_criteria_data'], indent=2)
+        }
+
+    def record_analysis(self, state: ResumeProcessorState, analysis_data: Dict[str, Any]) -> ResumeProcessorState:
+        """
+        Apply a parsed cultural analysis to the state and save it to S3 and DynamoDB.
+
+        Args:
+            state: Current workflow state
+            analysis_data: Parsed analysis in the CULTURAL_AGENT_PROMPT output format, or
+                the CULTURAL_SCORE_PROMPT one (no justifications) in the fast mode
+
+        Returns:
+            ResumeProcessorState: Updated state, routed to absolute rating or, on failure, to the end
+        """
+        s3_client = self.s3_client or S3Client()
+        dynamo_client = self.dynamo_client or DynamoClient()
+
+        try:
+            # update the state with scores
+            state['cultural_fit_score'] = analysis_data['cultural_fit_score']
+            state['uniqueness_score'] = analysis_data['uniqueness_score']
+            state['custom_criteria_scores'] = analysis_data['custom_criteria_scores']
+
+            logger.info(
+                "[Cultural Agent] Scores updated in state: cultural_fit_score: %s, uniqueness_score: %s, custom_criteria_scores: %s",
+                state['cultural_fit_score'], state['uniqueness_score'], Payload(state['custom_criteria_scores'])
+            )
+            
+        except Exception as e:
+            logger.error(f"[Cultural Agent] Failed to parse cultural analysis result: {str(e)}")
+            state['error_message'] = f"[Cultural Agent] Failed to parse cultural analysis result: {str(e)}"
+            state['status'] = 'FAILED'
+            state['next_node'] = 'end'
+            return state
+
+        # Save analysis to S3 & DynamoDB
+        try:
+            analysis_key = f"{state['job_id']}/{state['candidate_id']}/cultural_analysis.json"
+            if not s3_client.put_object(analysis_key, json.dumps(with_truncation_report(state, analysis_data), indent=2)):
                 logger.error(f"[Cultural Agent] Failed to save cultural analysis to S3: {analysis_key} with error: {str(e)}")
                 state['error_message'] = f"[Cultural Agent] Failed to save cultural analysis to S3: {analysis_key} with error: {str(e)}"
                 state['status'] = 'FAILED'
                 state['next_node'] = 'end'
                 return state
-
-            # Update status in DynamoDB to track progress
-            try:
-                if dynamo_client.update_item(
-                        key={'candidate_id': state['candidate_id'], 'job_id': state['job_id']},
-                        update_expression='SET analysis_url = :url, #cultural_fit_score = :cultural_fit_score, #uniqueness_score = :uniqueness_score, #custom_criteria_scores = :custom_criteria_scores, #cultural_fit_justification = :cultural_fit_justification, #uniqueness_justification = :uniqueness_justification',
-                        expression_values={
-                            ':url': analysis_key,
-                            ':cultural_fit_score': Decimal(str(state['cultural_fit_score'])),   # Only if float/int!
-                            ':uniqueness_score': Decimal(str(state['uniqueness_score'])),       # Only if float/int!
-                            ':custom_criteria_scores': state['custom_criteria_scores'],         # Dict/list? Pass as is!
-                            ':cultural_fit_justification': analysis_data['cultural_fit_justification'],
-                            ':uniqueness_justification': analysis_data['uniqueness_justification']
-                        },
-                        expression_attribute_names={
-                            '#cultural_fit_score': 'cultural_fit_score',
-                            '#uniqueness_score': 'uniqueness_score',
-                            '#custom_criteria_scores': 'custom_criteria_scores',
-                            '#cultural_fit_justification': 'cultural_fit_justification',
-                            '#uniqueness_justification': 'uniqueness_justification'
-                        }
-                ):
-                    logger.info(f"[Cultural Agent] Cultural analysis saved successfully to DynamoDB: {state['candidate_id']},{state['job_id']} with scores: {state['cultural_fit_score']}, {state['uniqueness_score']}, {state['custom_criteria_scores']}")
             
-            except Exception as e:
-                logger.error(f"[Cultural Agent] Failed to update analysis saved status in DynamoDB: {str(e)}")
-                state['error_message'] = f"[Cultural Agent] Failed to update analysis saved status in DynamoDB: {str(e)}"
-                state['status'] = 'FAILED'
-                state['next_node'] = 'end'
-                return state
-    
-            state['next_node'] = 'absolute_rating'
+            logger.info(f"Cultural analysis saved successfully to S3: {analysis_key}")
+            state['cultural_analysis_url'] = analysis_key
+
+
+        except CircuitOpenError as e:
+            return mark_dependency_unavailable(state, "[Cultural Agent]", e)
+        except Exception as e:
+            logger.error(f"[Cultural Agent] Failed to save cultural analysis to S3: {analysis_key} with error: {str(e)}")
+            state['error_message'] = f"[Cultural Agent] Failed to save cultural analysis to S3: {analysis_key} with error: {str(e)}"
+            state['status'] = 'FAILED'
+            state['next_node'] = 'end'
             return state
 
+        # Update status in DynamoDB to track progress
+        try:
+            if dynamo_client.update_item(
+                    key={'candidate_id': state['candidate_id'], 'job_id': state['job_id']},
+                    update_expression='SET analysis_url = :url, #cultural_fit_score = :cultural_fit_score, #uniqueness_score = :uniqueness_score, #custom_criteria_scores = :custom_criteria_scores, #cultural_fit_justification = :cultural_fit_justification, #uniqueness_justification = :uniqueness_justification, cultural_fingerprint = :fingerprint',
+                    expression_values={
+                        ':url': analysis_key,
+                        ':cultural_fit_score': Decimal(str(state['cultural_fit_score'])),   # Only if float/int!
+                        ':uniqueness_score': Decimal(str(state['uniqueness_score'])),       # Only if float/int!
+                        ':custom_criteria_scores': state['custom_criteria_scores'],         # Dict/list? Pass as is!
+                        ':cultural_fit_justification': analysis_data.get('cultural_fit_justification', ''),
+                        ':uniqueness_justification': analysis_data.get('uniqueness_justification', ''),
+                        ':fingerprint': (state.get('fingerprints') or {}).get('cultural_agent')
+                    },
+                    expression_attribute_names={
+                        '#cultural_fit_score': 'cultural_fit_score',
+                        '#uniqueness_score': 'uniqueness_score',
+                        '#custom_criteria_scores': 'custom_criteria_scores',
+                        '#cultural_fit_justification': 'cultural_fit_justification',
+                        '#uniqueness_justification': 'uniqueness_justification'
+                    }
+            ):
+                logger.info(
+                    "[Cultural Agent] Cultural analysis saved successfully to DynamoDB: %s,%s with scores: %s, %s, %s",
+                    state['candidate_id'], state['job_id'], state['cultural_fit_score'], state['uniqueness_score'], Payload(state['custom_criteria_scores'])
+                )
+        
+        except CircuitOpenError as e:
+            return mark_dependency_unavailable(state, "[Cultural Agent]", e)
         except Exception as e:
-            logger.error(f"Unexpected error in cultural analysis: {str(e)}")
-            state['error_message'] = f"[Cultural Agent] Unexpected error: {str(e)}"
+            logger.error(f"[Cultural Agent] Failed to update analysis saved status in DynamoDB: {str(e)}")
+            state['error_message'] = f"[Cultural Agent] Failed to update analysis saved status in DynamoDB: {str(e)}"
             state['status'] = 'FAILED'
             state['next_node'] = 'end'
-            return state 
+            return state
+
+        state['next_node'] = 'absolute_rating'
+        return state
+
+    def _analyze_fanout(self, resume: str, job_documents: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Score cultural fit, uniqueness and each custom criterion with concurrent LLM calls.
+
+        Args:
+            resume: Rendered resume for the prompts
+            job_documents: Job documents of the run
+
+        Returns:
+            Dict[str, Any]: Analysis in the CULTURAL_AGENT_PROMPT output format
+        """
+        criteria = self._split_criteria(job_documents['custom_criteria_data'])
+        calls = [
+            ('cultural_fit', CULTURAL_FIT_PROMPT, {
+                'resume_json': resume,
+                'core_values_json': json.dumps(job_documents['core_values_data'], indent=2)
+            }),
+            ('uniqueness', UNIQUENESS_PROMPT, {
+                'resume_json': resume,
+                'uniqueness_definition': json.dumps(job_documents['uniqueness_data'])
+            })
+        ]
+        for name, criterion in criteria:
+            calls.append(('custom_criterion', CUSTOM_CRITERION_PROMPT, {
+                'resume_json': resume,
+                'criterion_name': name,
+                'criterion_json': json.dumps(criterion, indent=2)
+            }))
+
+        executor = _get_fanout_executor()
+        futures = [
+            # Each call runs in a copy of the caller's context so context-local state follows it
+            executor.submit(contextvars.copy_context().run, self._invoke_part, part, prompt, prompt_input)
+            for part, prompt, prompt_input in calls
+        ]
+        try:
+            results = [future.result() for future in futures]
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+        cultural_fit, uniqueness, criterion_results = results[0], results[1], results[2:]
+        analysis_data = {
+            'cultural_fit_score': cultural_fit['cultural_fit_score'],
+            'cultural_fit_justification': cultural_fit['cultural_fit_justification'],
+            'core_value_scores': cultural_fit.get('core_value_scores', []),
+            'uniqueness_score': uniqueness['uniqueness_score'],
+            'uniqueness_justification': uniqueness['uniqueness_justification'],
+            # Keep the configured names, which the custom criteria weights are keyed by
+            'custom_criteria_scores': [
+                {'name': name, 'score': result['score'], 'justification': result.get('justification', '')}
+                for (name, _), result in zip(criteria, criterion_results)
+            ]
+        }
+        logger.info("[Cultural Agent] Merged %d fan-out results: %s", len(calls), Payload(analysis_data))
+        return analysis_data
+
+    def _invoke_part(self, part: str, prompt, prompt_input: Dict[str, Any]) -> Dict[str, Any]:
+        chain = prompt | self.llm
+        result = invoke_llm(chain, prompt_input, name=f'cultural_agent.{part}')
+        try:
+            return self._parse_analysis_result(result)
+        except Exception as e:
+            raise ValueError(f"Failed to parse {part} result: {str(e)}")
+
+    @staticmethod
+    def _split_criteria(custom_criteria_data: Any) -> List[Tuple[str, Any]]:
+        """
+        List the individual custom criteria as (name, criterion) pairs.
+
+        Accepts the `{"custom_criterias": [...]}` document or a bare list of criteria.
+        """
+        if not custom_criteria_data:
+            return []
+        criteria = custom_criteria_data
+        if isinstance(custom_criteria_data, dict):
+            criteria = next(
+                (value for key, value in custom_criteria_data.items() if isinstance(value, list)),
+                [custom_criteria_data]
+            )
+        if not isinstance(criteria, list):
+            criteria = [criteria]
+        return [
+            ((criterion.get('name') if isinstance(criterion, dict) else None) or f"criterion_{i + 1}", criterion)
+            for i, criterion in enumerate(criteria)
+        ]
 
     def _parse_analysis_result(self, result: str) -> Dict[str, Any]:
         """
@@ -159,7 +342,7 @@ class CulturalAgent:
 
             result_dict = json.loads(result)
 
-            logger.info(f"Parsed Analysis data: {result_dict}")
+            logger.info("Parsed Analysis data: %s", Payload(result_dict))
             
             return result_dict
             
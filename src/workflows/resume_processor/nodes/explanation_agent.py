@@ -0,0 +1,209 @@
+"""
+Explanation Agent node for the resume processor workflow.
+Writes the detailed JD and cultural analyses of a candidate scored in the fast
+analysis mode (analysis_detail 'scores').
+
+The scores already assigned, with the verdict and score breakdown of the
+recorded JD analysis, are given to the model and restored in its output, so the
+decision taken from them stands. The detailed analyses replace the score-only
+ones at the same jd_analysis.json and cultural_analysis.json keys, and the
+candidate's DynamoDB item is marked analysis_detail 'full'. Candidates rejected
+at the JD gate have no cultural scores; only their JD analysis is explained.
+
+Environment variables:
+    EXPLAIN_STATUSES: Final statuses explained at the end of a fast-mode run (default "SELECTED,IN_CONSIDERATION")
+"""
+import json
+import logging
+import os
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+from prompts.constants import JD_SCORE_OUTPUT_FORMAT
+from prompts.explain_prompts import JD_EXPLAIN_PROMPT, CULTURAL_EXPLAIN_PROMPT
+from workflows.resume_processor.state import ResumeProcessorState, with_truncation_report
+from workflows.resume_processor.job_context import get_job_documents
+from workflows.resume_processor.token_budget import get_budgeted_resume
+from workflows.resume_processor.consts import ANALYSIS_DETAIL_FULL, ANALYSIS_DETAIL_SCORES, DEFAULT_EXPLAIN_STATUSES
+from workflows.resume_processor.nodes.jd_analysis_agent import JDAnalysisAgent
+from workflows.resume_processor.nodes.cultural_agent import CulturalAgent
+from utils.s3_client import S3Client
+from utils.dynamo_client import DynamoClient
+from utils.logger import Payload
+from services.llm_invoker import invoke_llm
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+logger = logging.getLogger(__name__)
+
+# Names the explanation calls are invoked (and their latencies recorded) under, in call order
+EXPLANATION_CALLS = ('jd_explanation', 'cultural_explanation')
+
+def explain_statuses() -> List[str]:
+    """Final statuses whose score-only analyses are explained at the end of the run."""
+    return [status.strip() for status in os.getenv('EXPLAIN_STATUSES', DEFAULT_EXPLAIN_STATUSES).split(',') if status.strip()]
+
+class ExplanationAgent:
+    def __init__(self, llm: "ChatOpenAI", s3_client: Optional[S3Client] = None, dynamo_client: Optional[DynamoClient] = None):
+        """
+        Initialize Explanation Agent.
+
+        Args:
+            llm: Configured LLM instance
+            s3_client: S3 client to use; a new one is created per run when omitted
+            dynamo_client: DynamoDB client to use; a new one is created per run when omitted
+        """
+        self.llm = llm
+        self.s3_client = s3_client
+        self.dynamo_client = dynamo_client
+
+    def should_explain(self, state: ResumeProcessorState) -> bool:
+        """
+        Whether a finished run's scores are explained right away: the run was scored
+        in the fast mode and ended with one of EXPLAIN_STATUSES.
+        """
+        return state.get('analysis_detail') == ANALYSIS_DETAIL_SCORES and state.get('status') in explain_statuses()
+
+    def explain(self, state: ResumeProcessorState) -> ResumeProcessorState:
+        """
+        Workflow node explaining the scores at the end of a fast-mode run.
+
+        The decision is already recorded, so a failure only leaves the score-only
+        analyses in place (to be explained on demand) and does not fail the run.
+
+        Args:
+            state: Current workflow state, after absolute rating
+
+        Returns:
+            ResumeProcessorState: Updated state, routed to the end
+        """
+        logger.info("[Explanation Agent] Starting Explanation Agent...")
+        try:
+            state = self.explain_analyses(state)
+        except Exception as e:
+            logger.warning(f"[Explanation Agent] Scores left unexplained: {str(e)}")
+        state['next_node'] = 'end'
+        return state
+
+    def explain_analyses(self, state: ResumeProcessorState) -> ResumeProcessorState:
+        """
+        Generate the detailed analyses for the scores in the state and save them
+        in place of the score-only ones.
+
+        Args:
+            state: Workflow state holding the job documents and the assigned scores;
+                without a cultural_fit_score only the JD analysis is explained
+
+        Returns:
+            ResumeProcessorState: State with analysis_detail 'full' and the analysis urls
+
+        Raises:
+            CircuitOpenError: If the LLM, S3 or DynamoDB circuit breaker is open
+            DeadlineExceeded: If the explanation cannot finish before the deadline
+            Exception: If an analysis cannot be generated, parsed or saved
+        """
+        s3_client = self.s3_client or S3Client()
+        dynamo_client = self.dynamo_client or DynamoClient()
+
+        job_documents = get_job_documents(state, s3_client)
+        resume, truncation = get_budgeted_resume(state, job_documents)
+        if truncation:
+            state['resume_truncation'] = truncation
+
+        jd_scores = self._recorded_jd_scores(s3_client, state)
+        jd_analysis = self._invoke(
+            'jd_explanation',
+            JD_EXPLAIN_PROMPT,
+            {**JDAnalysisAgent.build_prompt_input(resume, job_documents), 'assigned_scores': json.dumps(jd_scores, indent=2)}
+        )
+        jd_analysis.update(jd_scores)
+        analyses = {'jd_analysis': jd_analysis}
+
+        if state.get('cultural_fit_score') is not None:
+            analyses['cultural_analysis'] = self._explain_cultural(state, resume, job_documents)
+
+        base_key = f"{state['job_id']}/{state['candidate_id']}"
+        for name, analysis in analyses.items():
+            key = f"{base_key}/{name}.json"
+            if not s3_client.put_object(key, json.dumps(with_truncation_report(state, analysis), indent=2)):
+                raise Exception(f"Failed to save {name} to S3: {key}")
+            state[f'{name}_url'] = key
+
+        cultural_analysis = analyses.get('cultural_analysis')
+        if cultural_analysis is None:
+            dynamo_client.update_item(
+                key={'candidate_id': state['candidate_id'], 'job_id': state['job_id']},
+                update_expression='SET #detail = :detail',
+                expression_values={':detail': ANALYSIS_DETAIL_FULL},
+                expression_attribute_names={'#detail': 'analysis_detail'}
+            )
+        else:
+            dynamo_client.update_item(
+                key={'candidate_id': state['candidate_id'], 'job_id': state['job_id']},
+                update_expression='SET analysis_detail = :detail, #cultural_fit_justification = :cultural_fit_justification, #uniqueness_justification = :uniqueness_justification',
+                expression_values={
+                    ':detail': ANALYSIS_DETAIL_FULL,
+                    ':cultural_fit_justification': cultural_analysis.get('cultural_fit_justification', ''),
+                    ':uniqueness_justification': cultural_analysis.get('uniqueness_justification', '')
+                },
+                expression_attribute_names={
+                    '#cultural_fit_justification': 'cultural_fit_justification',
+                    '#uniqueness_justification': 'uniqueness_justification'
+                }
+            )
+
+        state['analysis_detail'] = ANALYSIS_DETAIL_FULL
+        logger.info(f"[Explanation Agent] Detailed analyses saved for {state['candidate_id']},{state['job_id']}")
+        return state
+
+    def _recorded_jd_scores(self, s3_client: S3Client, state: ResumeProcessorState) -> Dict[str, Any]:
+        """
+        Scores of the recorded score-only JD analysis (raw score, verdict, breakdown),
+        with the normalized score the decision was taken on.
+        """
+        recorded = None
+        if state.get('jd_analysis_url'):
+            recorded = s3_client.get_object(os.getenv('S3_BUCKET_NAME'), state['jd_analysis_url'])
+        scores = {key: recorded[key] for key in JD_SCORE_OUTPUT_FORMAT if key in (recorded or {})}
+        scores['Normalized Score (out of 10)'] = state['jd_score']
+        return scores
+
+    def _explain_cultural(self, state: ResumeProcessorState, resume: str, job_documents: Dict[str, Any]) -> Dict[str, Any]:
+        cultural_scores = {
+            'cultural_fit_score': state['cultural_fit_score'],
+            'uniqueness_score': state['uniqueness_score'],
+            'custom_criteria_scores': [
+                {'name': criterion.get('name'), 'score': criterion.get('score')}
+                for criterion in state.get('custom_criteria_scores') or []
+            ]
+        }
+        cultural_analysis = self._invoke(
+            'cultural_explanation',
+            CULTURAL_EXPLAIN_PROMPT,
+            {**CulturalAgent.build_prompt_input(resume, job_documents), 'assigned_scores': json.dumps(cultural_scores, indent=2)}
+        )
+        self._restore_cultural_scores(cultural_analysis, cultural_scores)
+        return cultural_analysis
+
+    def _invoke(self, name: str, prompt, prompt_input: Dict[str, Any]) -> Dict[str, Any]:
+        result = invoke_llm(prompt | self.llm, prompt_input, name=name)
+        logger.info("[Explanation Agent] %s LLM OUTPUT: %s", name, Payload(result))
+        if hasattr(result, 'content'):
+            result = result.content
+        try:
+            return json.loads(result)
+        except Exception as e:
+            raise ValueError(f"Failed to parse {name} result: {str(e)}")
+
+    @staticmethod
+    def _restore_cultural_scores(analysis: Dict[str, Any], scores: Dict[str, Any]) -> None:
+        """Put the assigned scores back into the explained analysis, whatever the model wrote."""
+        analysis['cultural_fit_score'] = scores['cultural_fit_score']
+        analysis['uniqueness_score'] = scores['uniqueness_score']
+        explained = {
+            criterion.get('name'): criterion
+            for criterion in analysis.get('custom_criteria_scores') or [] if isinstance(criterion, dict)
+        }
+        analysis['custom_criteria_scores'] = [
+            {**explained.get(criterion['name'], {'justification': ''}), **criterion}
+            for criterion in scores['custom_criteria_scores']
+        ]
@@ -1,30 +1,73 @@
 """
 JD Analysis Agent node for the resume processor workflow.
 Analyzes resume against job description using LLM.
+
+In streaming mode (JD_STREAMING=true) the completion is parsed as it streams.
+The output format puts the scores and verdict first, so the node records them
+and routes on as soon as they arrive; the cultural agent then runs while the
+detailed breakdown finishes streaming, and the full analysis is saved to S3 in
+the background (see utils.background). Until it is saved the run reports the
+analysis as pending (jd_analysis_pending) rather than a url, and the candidate's
+item is recorded as score-only; the url, the 'full' detail and the JD
+fingerprint are set on it together once the analysis is stored. Score-only
+runs of the fast mode are not streamed.
+
+Environment variables:
+    JD_STREAMING: Route on the streamed scores instead of the whole analysis (default false)
+    JD_STREAM_TIMEOUT: Seconds the background write waits for the rest of a streamed analysis (default 300)
 """
 import json
 import logging
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+import os
+from typing import Dict, Any, Optional, TYPE_CHECKING
 from prompts.jd_agent_prompt import JD_AGENT_PROMPT
-from prompts.constants import SCORING_RUBRIC, JD_OUTPUT_FORMAT
-from workflows.resume_processor.state import ResumeProcessorState
+from prompts.constants import SCORING_RUBRIC, JD_OUTPUT_FORMAT, JD_SCORE_OUTPUT_FORMAT
+from workflows.resume_processor.state import ResumeProcessorState, mark_dependency_unavailable, mark_deadline_exceeded, with_truncation_report
+from workflows.resume_processor.job_context import get_job_documents
+from workflows.resume_processor.token_budget import get_budgeted_resume
+from workflows.resume_processor.jd_digest import get_jd_prompt_input
+from workflows.resume_processor.consts import ANALYSIS_DETAIL_FULL, ANALYSIS_DETAIL_SCORES
 from utils.s3_client import S3Client
 from utils.dynamo_client import DynamoClient
+from utils.logger import Payload
+from utils.circuit_breaker import CircuitOpenError
+from utils.deadline import DeadlineExceeded
+from utils.background import get_background_writer
+from services.llm_invoker import LLMStream, invoke_llm, stream_llm
 from decimal import Decimal
 
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
 logger = logging.getLogger(__name__)
 
+# Fields the router needs, first in JD_OUTPUT_FORMAT
+SCORE_FIELDS = ('Normalized Score (out of 10)', 'Verdict')
+
 class JDAnalysisAgent:
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(
+        self,
+        llm: "ChatOpenAI",
+        s3_client: Optional[S3Client] = None,
+        dynamo_client: Optional[DynamoClient] = None,
+        streaming: Optional[bool] = None
+    ):
         """
         Initialize JD Analysis Agent.
         
         Args:
             llm: Configured LLM instance
+            s3_client: S3 client to use; a new one is created per run when omitted
+            dynamo_client: DynamoDB client to use; a new one is created per run when omitted
+            streaming: Route on the streamed scores; defaults to JD_STREAMING
         """
         self.llm = llm
         self.prompt = JD_AGENT_PROMPT
+        self.s3_client = s3_client
+        self.dynamo_client = dynamo_client
+        if streaming is None:
+            streaming = os.getenv('JD_STREAMING', 'false').lower() == 'true'
+        self.streaming = streaming
 
     def analyze_resume(self, state: ResumeProcessorState) -> ResumeProcessorState:
         """
@@ -38,83 +81,239 @@ class JDAnalysisAgent:
         """
         logger.info(f"[JD Analysis Agent] Starting JD Analysis Agent...")
         try:
-            s3_client = S3Client()
-            dynamo_client = DynamoClient()
+            job_documents = get_job_documents(state, self.s3_client)
+            resume, truncation = get_budgeted_resume(state, job_documents)
+            if truncation:
+                state['resume_truncation'] = truncation
+
+            # In the fast mode only the scores are generated; the explanation comes later
+            output_format = JD_SCORE_OUTPUT_FORMAT if state.get('analysis_detail') == ANALYSIS_DETAIL_SCORES else JD_OUTPUT_FORMAT
+
             # Prepare input for LLM
-            prompt_input = {
-                'resume': state['resume_data'],
-                'job_description': state['jd_data'],
-                'scoring_rubric': json.dumps(SCORING_RUBRIC, indent=2),
-                'output_format': json.dumps(JD_OUTPUT_FORMAT, indent=2)
-            }
+            prompt_input = self.build_prompt_input(resume, job_documents, output_format)
 
             # Get LLM analysis using instance prompt template
             chain = self.prompt | self.llm
-            analysis_result = chain.invoke(prompt_input)
+            if self.streaming and output_format is JD_OUTPUT_FORMAT:
+                return self._analyze_streamed(state, chain, prompt_input)
+            analysis_result = invoke_llm(chain, prompt_input, name='jd_analysis')
 
-            logger.info(f"[JD Analysis Agent] JD AGENT LLM OUTPUT: {analysis_result}")
+            logger.info("[JD Analysis Agent] JD AGENT LLM OUTPUT: %s", Payload(analysis_result))
 
             # Parse analysis result
             try:
                 analysis_data = self._parse_analysis_result(analysis_result)
-                # update the state with scores
-                state['jd_score'] = analysis_data['Normalized Score (out of 10)']
-                logger.info(f"[JD Analysis Agent] Scores updated in state: jd_score: {state['jd_score']}")
-
             except Exception as e:
                 logger.error(f"Failed to parse analysis result: {str(e)}")
                 state['error_message'] = f"[JD Analysis Agent] Failed to parse analysis result: {str(e)}"
                 state['status'] = 'FAILED'
                 state['next_node'] = 'end'
                 return state
+
+            return self.record_analysis(state, analysis_data)
+
+        except CircuitOpenError as e:
+            return mark_dependency_unavailable(state, "[JD Analysis Agent]", e)
+        except DeadlineExceeded as e:
+            return mark_deadline_exceeded(state, "[JD Analysis Agent]", str(e))
+        except Exception as e:
+            logger.error(f"Unexpected error in JD analysis by LLM: {str(e)}")
+            state['error_message'] = f"[JD Analysis Agent] Unexpected error in JD analysis by LLM: {str(e)}"
+            state['status'] = 'FAILED'
+            state['next_node'] = 'end'
+            return state
+
+    @staticmethod
+    def build_prompt_input(resume: str, job_documents: Dict[str, Any], output_format: Dict[str, Any] = JD_OUTPUT_FORMAT) -> Dict[str, Any]:
+        """
+        Input of JD_AGENT_PROMPT for a resume.
+
+        Args:
+            resume: Rendered resume for the prompt
+            job_documents: Job documents of the run
+            output_format: Output format the analysis must follow
+
+        Returns:
+            Dict[str, Any]: Prompt input
+        """
+        return {
+            'resume': resume,
+            'job_description': get_jd_prompt_input(job_documents['jd_data']),
+            'scoring_rubric': json.dumps(SCORING_RUBRIC, indent=2),
+            'output_format': json.dumps(output_format, indent=2)
+        }
+
+    def record_analysis(self, state: ResumeProcessorState, analysis_data: Dict[str, Any]) -> ResumeProcessorState:
+        """
+        Apply a parsed JD analysis to the state and save it to S3 and DynamoDB.
+
+        Args:
+            state: Current workflow state
+            analysis_data: Parsed analysis in JD_OUTPUT_FORMAT, or JD_SCORE_OUTPUT_FORMAT in the fast mode
+
+        Returns:
+            ResumeProcessorState: Updated state, routed to the router or, on failure, to the end
+        """
+        s3_client = self.s3_client or S3Client()
+        dynamo_client = self.dynamo_client or DynamoClient()
+
+        try:
+            # update the state with scores
+            state['jd_score'] = analysis_data['Normalized Score (out of 10)']
+            logger.info(f"[JD Analysis Agent] Scores updated in state: jd_score: {state['jd_score']}")
+
+        except Exception as e:
+            logger.error(f"Failed to parse analysis result: {str(e)}")
+            state['error_message'] = f"[JD Analysis Agent] Failed to parse analysis result: {str(e)}"
+            state['status'] = 'FAILED'
+            state['next_node'] = 'end'
+            return state
+
+        # Save analysis to S3 & DynamoDB
+        try:
+            # Save detailed analysis to S3
+            analysis_key = f"{state['job_id']}/{state['candidate_id']}/jd_analysis.json"
+            s3_client.put_object(
+                analysis_key, 
+                json.dumps(with_truncation_report(state, analysis_data), indent=2)
+            )
             
-            # Save analysis to S3 & DynamoDB
-            try:
-                # Save detailed analysis to S3
-                analysis_key = f"{state['job_id']}/{state['candidate_id']}/jd_analysis.json"
-                s3_client.put_object(
-                    analysis_key, 
-                    json.dumps(analysis_data, indent=2)
-                )
-                
-                logger.info(f"[JD Analysis Agent] JD analysis saved successfully to S3: {analysis_key}")
-                state['jd_analysis_url'] = analysis_key
-
-                # Update status in DynamoDB to track progress
-                verdict = "JD_APPROVED" if analysis_data['Verdict'] == True else "JD_REJECTED"
-
-                dynamo_client.update_item(
-                    key={'candidate_id': state['candidate_id'], 'job_id': state['job_id']},
-                    update_expression='SET jd_score = :score, jd_analysis_url = :url, #status = :status',
-                    expression_values={
-                        ':score': Decimal(str(state['jd_score'])),
-                        ':url': analysis_key,
-                        ':status': "JD_APPROVED" if analysis_data['Verdict'] else "JD_REJECTED"
-                    },
-                    expression_attribute_names={
-                        '#status': 'status'
-                    }
-                )
-
-                logger.info(f"[JD Analysis Agent] JD analysis saved successfully to DynamoDB: {state['candidate_id']},{state['job_id']} with verdict: {verdict}")
+            logger.info(f"[JD Analysis Agent] JD analysis saved successfully to S3: {analysis_key}")
+            state['jd_analysis_url'] = analysis_key
+
+            # Update status in DynamoDB to track progress
+            verdict = "JD_APPROVED" if analysis_data['Verdict'] == True else "JD_REJECTED"
+
+            dynamo_client.update_item(
+                key={'candidate_id': state['candidate_id'], 'job_id': state['job_id']},
+                update_expression='SET jd_score = :score, jd_analysis_url = :url, analysis_detail = :detail, jd_fingerprint = :fingerprint, #status = :status',
+                expression_values={
+                    ':score': Decimal(str(state['jd_score'])),
+                    ':url': analysis_key,
+                    ':detail': state.get('analysis_detail') or ANALYSIS_DETAIL_FULL,
+                    ':fingerprint': (state.get('fingerprints') or {}).get('jd_analysis'),
+                    ':status': "JD_APPROVED" if analysis_data['Verdict'] else "JD_REJECTED"
+                },
+                expression_attribute_names={
+                    '#status': 'status'
+                }
+            )
+
+            logger.info(f"[JD Analysis Agent] JD analysis saved successfully to DynamoDB: {state['candidate_id']},{state['job_id']} with verdict: {verdict}")
+
+        except CircuitOpenError as e:
+            return mark_dependency_unavailable(state, "[JD Analysis Agent]", e)
+        except Exception as e:
+            logger.error(f"Error saving analysis to dynamo db or s3: {str(e)}")
+            state['error_message'] = f"[JD Analysis Agent] Failed to save analysis to dynamo db or s3: {str(e)}"
+            state['status'] = 'FAILED'
+            state['next_node'] = 'end'
+            return state
+        
+        state['next_node'] = 'router'
+        return state
 
+    def _analyze_streamed(self, state: ResumeProcessorState, chain, prompt_input: Dict[str, Any]) -> ResumeProcessorState:
+        """
+        Record the scores as soon as they stream in and save the full analysis in the background.
+
+        Falls back to recording the whole analysis when the scores are not the first fields.
+        """
+        scores, stream = stream_llm(chain, prompt_input, 'jd_analysis', SCORE_FIELDS)
+        if len(scores) < len(SCORE_FIELDS):
+            logger.warning("[JD Analysis Agent] Scores were not streamed first, recording the full analysis")
+            try:
+                analysis_data = self._parse_analysis_result(stream.result())
             except Exception as e:
-                logger.error(f"Error saving analysis to dynamo db or s3: {str(e)}")
-                state['error_message'] = f"[JD Analysis Agent] Failed to save analysis to dynamo db or s3: {str(e)}"
+                state['error_message'] = f"[JD Analysis Agent] Failed to parse analysis result: {str(e)}"
                 state['status'] = 'FAILED'
                 state['next_node'] = 'end'
                 return state
-            
-            state['next_node'] = 'router'
+            return self.record_analysis(state, analysis_data)
+
+        logger.info("[JD Analysis Agent] Streamed scores: %s", Payload(scores))
+        state = self.record_scores(state, scores)
+        if state['next_node'] == 'end':
+            stream.cancel()
             return state
 
+        # The artifact is written once the rest of the analysis has streamed; its url is
+        # only recorded then, so nothing points at an analysis that may never be saved
+        state['jd_analysis_pending'] = True
+        get_background_writer().submit('jd_analysis', self._save_streamed_analysis, stream, dict(state))
+        return state
+
+    def record_scores(self, state: ResumeProcessorState, scores: Dict[str, Any]) -> ResumeProcessorState:
+        """
+        Apply the streamed JD score and verdict to the state and DynamoDB, ahead of the full analysis.
+
+        The item is recorded as score-only, and its JD fingerprint is only set once the
+        analysis is saved: if that never happens, the analysis is generated on demand
+        and a re-evaluation asking for it runs the node again.
+
+        Args:
+            state: Current workflow state
+            scores: The SCORE_FIELDS of the analysis
+
+        Returns:
+            ResumeProcessorState: Updated state, routed to the router or, on failure, to the end
+        """
+        dynamo_client = self.dynamo_client or DynamoClient()
+        try:
+            state['jd_score'] = scores['Normalized Score (out of 10)']
+            dynamo_client.update_item(
+                key={'candidate_id': state['candidate_id'], 'job_id': state['job_id']},
+                update_expression='SET jd_score = :score, analysis_detail = :detail, #status = :status',
+                expression_values={
+                    ':score': Decimal(str(state['jd_score'])),
+                    ':detail': ANALYSIS_DETAIL_SCORES,
+                    ':status': "JD_APPROVED" if scores['Verdict'] else "JD_REJECTED"
+                },
+                expression_attribute_names={
+                    '#status': 'status'
+                }
+            )
+        except CircuitOpenError as e:
+            return mark_dependency_unavailable(state, "[JD Analysis Agent]", e)
         except Exception as e:
-            logger.error(f"Unexpected error in JD analysis by LLM: {str(e)}")
-            state['error_message'] = f"[JD Analysis Agent] Unexpected error in JD analysis by LLM: {str(e)}"
+            logger.error(f"Error saving streamed scores to dynamo db: {str(e)}")
+            state['error_message'] = f"[JD Analysis Agent] Failed to save scores to dynamo db: {str(e)}"
             state['status'] = 'FAILED'
             state['next_node'] = 'end'
             return state
 
+        state['next_node'] = 'router'
+        return state
+
+    def _save_streamed_analysis(self, stream: LLMStream, state: ResumeProcessorState) -> None:
+        """Wait for the rest of a streamed analysis and save it to S3; runs in the background."""
+        s3_client = self.s3_client or S3Client()
+        dynamo_client = self.dynamo_client or DynamoClient()
+
+        try:
+            text = stream.result(timeout=float(os.getenv('JD_STREAM_TIMEOUT', 300)))
+        except DeadlineExceeded:
+            stream.cancel()
+            raise
+        analysis_data = self._parse_analysis_result(text)
+        if analysis_data is None:
+            raise ValueError("Failed to parse the streamed JD analysis")
+        analysis_key = f"{state['job_id']}/{state['candidate_id']}/jd_analysis.json"
+        if not s3_client.put_object(analysis_key, json.dumps(with_truncation_report(state, analysis_data), indent=2)):
+            raise Exception(f"Failed to save JD analysis to S3: {analysis_key}")
+        # Not the status: it has moved on since the scores were recorded
+        dynamo_client.update_item(
+            key={'candidate_id': state['candidate_id'], 'job_id': state['job_id']},
+            update_expression='SET #url = :url, analysis_detail = :detail, jd_fingerprint = :fingerprint',
+            expression_values={
+                ':url': analysis_key,
+                ':detail': ANALYSIS_DETAIL_FULL,
+                ':fingerprint': (state.get('fingerprints') or {}).get('jd_analysis')
+            },
+            expression_attribute_names={'#url': 'jd_analysis_url'}
+        )
+        logger.info(f"[JD Analysis Agent] Streamed JD analysis saved to S3: {analysis_key}")
+
     def _parse_analysis_result(self, result: str) -> Dict[str, Any]:
         """
         Parse the analysis result from the LLM into a structured format.
@@ -3,17 +3,28 @@ Router node for the resume processor workflow.
 Makes decisions based on JD analysis score.
 """
 import logging
+from typing import Optional
 from utils.dynamo_client import DynamoClient
-from workflows.resume_processor.state import ResumeProcessorState
-from utils.config import load_config
-load_config()
+from utils.circuit_breaker import CircuitOpenError
+from workflows.resume_processor.state import ResumeProcessorState, mark_dependency_unavailable
+from workflows.resume_processor.consts import EVALUATION_MODE_COMBINED
 
 logger = logging.getLogger(__name__)
 
 class RouterNode:
-    def __init__(self):
-        """Initialize router node."""
-        pass
+    def __init__(self, dynamo_client: Optional[DynamoClient] = None):
+        """
+        Initialize router node.
+
+        Args:
+            dynamo_client: DynamoDB client to use; a new one is created per update when omitted
+        """
+        self.dynamo_client = dynamo_client
+
+    @staticmethod
+    def passes_jd_threshold(state: ResumeProcessorState) -> bool:
+        """Whether the run's JD score reaches its jd_threshold."""
+        return state['jd_score'] >= state['jd_threshold']
 
     def route(self, state: ResumeProcessorState) -> ResumeProcessorState:
         """
@@ -30,7 +41,7 @@ class RouterNode:
             jd_score = state['jd_score']
             jd_threshold = state['jd_threshold']
 
-            if jd_score < jd_threshold:
+            if not self.passes_jd_threshold(state):
                 logger.info(f"JD score {jd_score} below threshold {jd_threshold}")
                 self._update_db_status(
                     state['candidate_id'],
@@ -46,9 +57,15 @@ class RouterNode:
                 state['job_id'],
                 'JD_APPROVED',
             )
-            state['next_node'] = 'cultural_agent'
+            # The combined evaluation already produced the cultural scores
+            if state.get('evaluation_mode') == EVALUATION_MODE_COMBINED:
+                state['next_node'] = 'absolute_rating'
+            else:
+                state['next_node'] = 'cultural_agent'
             return state
 
+        except CircuitOpenError as e:
+            return mark_dependency_unavailable(state, "[RouterNode]", e)
         except Exception as e:
             logger.error(f"[RouterNode] Unexpected error in router: {str(e)}")
             state['status'] = 'FAILED'
@@ -64,7 +81,7 @@ class RouterNode:
             candidate_id (str): Candidate ID
             status (str): New status
         """
-        dynamo_client = DynamoClient()
+        dynamo_client = self.dynamo_client or DynamoClient()
         try:
             dynamo_client.update_item(
                 key={'candidate_id': candidate_id, 'job_id': job_id },
@@ -77,5 +94,8 @@ class RouterNode:
                 }
             )
 
+        except CircuitOpenError:
+            # Let route() stop the run instead of carrying on without the update
+            raise
         except Exception as e:
             logger.error(f"Failed to update database status: {str(e)}") 
\ No newline at end of file
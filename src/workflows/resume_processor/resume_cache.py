@@ -0,0 +1,193 @@
+"""
+Rendered resume cache for the resume processor workflow.
+
+Both agents put the candidate's resume into their prompts. The resume is rendered
+once into a compact, normalized JSON string and cached per candidate_id and resume
+content version, so every agent and every job the candidate applies to reuses the
+same text. Entries live in a bounded in-memory LRU, optionally backed by a
+directory on disk that survives restarts and is shared by worker processes.
+
+Environment variables:
+    RESUME_CACHE_MAX_ENTRIES: Rendered resumes kept in memory (default 1024)
+    RESUME_CACHE_DIR: Directory for the on-disk tier; disabled when unset
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+
+from utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def compute_resume_version(raw_resume: bytes) -> str:
+    """
+    Compute a content version for a raw resume document.
+
+    Returns:
+        str: Short hex digest that changes whenever the resume changes
+    """
+    return hashlib.sha256(raw_resume).hexdigest()[:16]
+
+
+def normalize_resume(value: Any) -> Any:
+    """
+    Normalize parsed resume data for prompting.
+
+    Collapses runs of whitespace in strings and drops empty values (None, empty
+    strings, lists and dicts), which carry no signal but cost tokens.
+    """
+    if isinstance(value, str):
+        return ' '.join(value.split())
+    if isinstance(value, dict):
+        normalized = {key: normalize_resume(item) for key, item in value.items()}
+        return {key: item for key, item in normalized.items() if item not in (None, '', [], {})}
+    if isinstance(value, list):
+        normalized = [normalize_resume(item) for item in value]
+        return [item for item in normalized if item not in (None, '', [], {})]
+    return value
+
+
+def render_resume(resume_data: Any) -> str:
+    """Render parsed resume data as compact, normalized JSON."""
+    return json.dumps(normalize_resume(resume_data), ensure_ascii=False, separators=(',', ':'))
+
+
+class RenderedResumeCache:
+    """Thread-safe LRU of rendered resumes keyed by (candidate_id, version), with an optional disk tier."""
+
+    def __init__(self, max_entries: int = 1024, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, candidate_id: str, version: str) -> str:
+        # candidate_id is caller supplied, so it is hashed rather than used in the file name
+        name = hashlib.sha256(f"{candidate_id}\0{version}".encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _read_disk(self, candidate_id: str, version: str) -> Optional[str]:
+        try:
+            with open(self._path(candidate_id, version), encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.error(f"[RenderedResumeCache] Failed to read cached resume for {candidate_id}: {str(e)}")
+            return None
+
+    def _write_disk(self, candidate_id: str, version: str, rendered: str) -> None:
+        try:
+            # Write then rename, so concurrent readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(rendered)
+            os.replace(tmp_path, self._path(candidate_id, version))
+        except OSError as e:
+            logger.error(f"[RenderedResumeCache] Failed to write cached resume for {candidate_id}: {str(e)}")
+
+    def _remember(self, key: tuple, rendered: str) -> None:
+        # Caller holds the lock
+        self._entries[key] = rendered
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_render(self, candidate_id: str, version: str, resume_data: Any) -> str:
+        """
+        Return the rendered resume, rendering and caching it on a miss.
+
+        Args:
+            candidate_id: Candidate the resume belongs to
+            version: Content version of the resume (see compute_resume_version)
+            resume_data: Parsed resume, rendered only on a miss
+
+        Returns:
+            str: Compact, normalized JSON rendering of the resume
+        """
+        key = (candidate_id, version)
+        with self._lock:
+            rendered = self._entries.get(key)
+            if rendered is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return rendered
+
+        rendered = self._read_disk(candidate_id, version) if self.directory else None
+        if rendered is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._remember(key, rendered)
+            return rendered
+
+        rendered = render_resume(resume_data)
+        with self._lock:
+            self.misses += 1
+            self._remember(key, rendered)
+        if self.directory:
+            self._write_disk(candidate_id, version, rendered)
+        return rendered
+
+    def clear(self) -> None:
+        """Drop the in-memory entries; the disk tier is left untouched."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'disk_tier': bool(self.directory)
+            }
+
+
+# Process-wide cache used by the agents
+resume_cache = RenderedResumeCache(
+    int(os.getenv('RESUME_CACHE_MAX_ENTRIES', 1024)),
+    os.getenv('RESUME_CACHE_DIR') or None
+)
+register_metrics('resume_cache', resume_cache.snapshot)
+
+
+def get_resume_version(state: Mapping[str, Any]) -> str:
+    """
+    Return the content version of a workflow state's resume.
+
+    Uses the resume version recorded by WorkflowService.build_state, falling back to
+    hashing the parsed resume for states built elsewhere.
+    """
+    version = state.get('resume_version')
+    if not version:
+        canonical = json.dumps(state['resume_data'], sort_keys=True, ensure_ascii=False)
+        version = compute_resume_version(canonical.encode('utf-8'))
+    return version
+
+
+def get_rendered_resume(state: Mapping[str, Any]) -> str:
+    """
+    Return the rendered resume for a workflow state.
+
+    Args:
+        state: Current workflow state
+
+    Returns:
+        str: Compact, normalized JSON rendering of the candidate's resume
+    """
+    return resume_cache.get_or_render(state['candidate_id'], get_resume_version(state), state['resume_data'])
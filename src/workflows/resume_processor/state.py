@@ -2,11 +2,11 @@
 State management for the resume processor workflow.
 """
 import logging
-from typing import Dict, Any, Optional, List, TypedDict, Annotated, Sequence
-from utils.s3_client import S3Client
-from utils.dynamo_client import DynamoClient
-from langchain_core.messages import BaseMessage
-from operator import add as add_messages
+from typing import Dict, Any, Optional, List, TypedDict, TYPE_CHECKING
+from workflows.resume_processor.consts import ABORTED_STATUSES, STATUS_DEADLINE_EXCEEDED, STATUS_DEPENDENCY_UNAVAILABLE
+
+if TYPE_CHECKING:
+    from utils.circuit_breaker import CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +15,20 @@ class ResumeProcessorState(TypedDict):
     State definition for the resume processor workflow.
     
     Attributes:
-        messages: Sequence of messages in the conversation
         resume_data: Parsed resume data from S3
-        jd_data: Parsed job description data from S3
-        company_values_data: Company core values data from S3
-        uniqueness_data: Company uniqueness definition from S3
-        custom_criteria_data: Custom evaluation criteria from S3
+        resume_version: Content hash of the raw resume, keys the rendered resume cache
+        resume_truncation: What was dropped to fit the resume into the token budget, if anything
+        jd_data: Parsed job description data from S3 (full state mode only)
+        company_values_data: Company core values data from S3 (full state mode only)
+        uniqueness_data: Company uniqueness definition from S3 (full state mode only)
+        custom_criteria_data: Custom evaluation criteria from S3 (full state mode only)
+        job_context_ref: Reference to the shared job context holding the job documents (slim state mode only)
+        evaluation_mode: 'two_call' or 'combined' (single LLM call for every score)
+        analysis_detail: 'full' analyses, or 'scores' only with explanations generated on demand
+        deadline: Unix timestamp by which the caller needs the result, if it set a timeout
+        fingerprints: Fingerprint of the inputs of each LLM node (see fingerprints.py)
+        stored_results: Candidate's DynamoDB item, when re-evaluating; reused by nodes whose inputs are unchanged
+        reused_nodes: Nodes whose stored results were reused instead of running them
         weights: Scoring weights for different components
         jd_threshold: Minimum JD match score threshold
         absolute_grading_error_boundary: Error boundary for absolute grading
@@ -30,15 +38,28 @@ class ResumeProcessorState(TypedDict):
         candidate_id: Unique identifier for the candidate
         status: Current workflow processing status
         errors: List of error messages if any occur during processing
+        retry_after: Seconds to wait before retrying a run stopped by an open circuit breaker
+        trace_id: Id of the run's trace, when tracing is enabled
+        jd_analysis_url: S3 key of the JD analysis
+        jd_analysis_pending: The streamed JD analysis is still being saved; its url is set on the candidate's item once stored
+        cultural_analysis_url: S3 key of the cultural analysis
         next_node: Next node to process in workflow graph
     """
     # Input data
-    messages: Annotated[Sequence[BaseMessage], add_messages]
     resume_data: Optional[Dict[str, Any]]
+    resume_version: Optional[str]
+    resume_truncation: Optional[Dict[str, Any]]
     jd_data: Optional[Dict[str, Any]]
     core_values_data: Optional[Dict[str, Any]]
     uniqueness_data: Optional[Dict[str, Any]]
     custom_criteria_data: Optional[Dict[str, Any]]
+    job_context_ref: Optional[Dict[str, str]]
+    evaluation_mode: Optional[str]
+    analysis_detail: Optional[str]
+    deadline: Optional[float]
+    fingerprints: Optional[Dict[str, str]]
+    stored_results: Optional[Dict[str, Any]]
+    reused_nodes: Optional[List[str]]
     weights: Optional[Dict[str, Any]]
     jd_threshold: Optional[float]
     absolute_grading_error_boundary: Optional[float]
@@ -55,5 +76,80 @@ class ResumeProcessorState(TypedDict):
     # Status and error handling
     status: str
     error_message: Optional[str]
+    retry_after: Optional[float]
+    trace_id: Optional[str]
+    jd_analysis_url: Optional[str]
+    jd_analysis_pending: Optional[bool]
+    cultural_analysis_url: Optional[str]
     # Next node in workflow
     next_node: str
+
+
+def mark_dependency_unavailable(state: ResumeProcessorState, source: str, error: "CircuitOpenError") -> ResumeProcessorState:
+    """
+    End the run because a dependency's circuit breaker is open.
+
+    Args:
+        state: Current workflow state
+        source: Node name used as the error message prefix
+        error: The CircuitOpenError raised by the client
+
+    Returns:
+        ResumeProcessorState: State marked retryable and routed to the end
+    """
+    logger.error(f"{source} {str(error)}")
+    state['error_message'] = f"{source} {str(error)}"
+    state['status'] = STATUS_DEPENDENCY_UNAVAILABLE
+    state['retry_after'] = error.retry_after
+    state['next_node'] = 'end'
+    return state
+
+
+def mark_deadline_exceeded(state: ResumeProcessorState, source: str, reason: str) -> ResumeProcessorState:
+    """
+    End the run because it can no longer finish before the caller's deadline.
+
+    Args:
+        state: Current workflow state
+        source: Node name used as the error message prefix
+        reason: Why the run was aborted
+
+    Returns:
+        ResumeProcessorState: State marked DEADLINE_EXCEEDED and routed to the end
+    """
+    logger.warning(f"{source} {reason}")
+    state['error_message'] = f"{source} {reason}"
+    state['status'] = STATUS_DEADLINE_EXCEEDED
+    state['next_node'] = 'end'
+    return state
+
+
+def final_status(state: ResumeProcessorState) -> str:
+    """
+    Status a finished run is reported with.
+
+    A run aborted by an open circuit breaker or its deadline keeps its status, a run
+    stopped by a failing node (which records an error_message) is FAILED, and any
+    other run is COMPLETED.
+    """
+    if state.get('status') in ABORTED_STATUSES:
+        return state['status']
+    if state.get('status') == 'FAILED' or state.get('error_message'):
+        return 'FAILED'
+    return 'COMPLETED'
+
+
+def with_truncation_report(state: ResumeProcessorState, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Analysis artifact to save, including what was dropped from the resume to fit the token budget.
+
+    Args:
+        state: Current workflow state
+        analysis_data: Parsed analysis from the LLM
+
+    Returns:
+        Dict[str, Any]: analysis_data, plus 'resume_truncation' when the resume was trimmed
+    """
+    if not state.get('resume_truncation'):
+        return analysis_data
+    return {**analysis_data, 'resume_truncation': state['resume_truncation']}
@@ -0,0 +1,271 @@
+"""
+Token budget for the resume put into the agents' prompts.
+
+Oversized resumes (e.g. academic CVs with long publication lists) make prompts
+slow and can overflow the model's context window. Before prompting, the rendered
+resume is counted locally; when it is over budget, the least JD-relevant entries
+are dropped until it fits. Contact details, summary and skills are always kept.
+The agents record what was dropped in their analysis artifacts.
+
+Every agent of a run prompts with the same resume, so the result (trimmed or
+not) is cached per candidate, resume version, JD, budget and digest version,
+next to the rendered resume, and counted and ranked once.
+
+Tokens are counted with tiktoken when it is installed and its encoding can be
+loaded, otherwise estimated at 4 characters per token.
+
+Environment variables:
+    RESUME_TOKEN_BUDGET: Maximum resume tokens per prompt; 0 disables trimming (default 8000)
+    RESUME_BUDGET_CACHE_MAX_ENTRIES: Budgeted resumes kept in memory (default 1024)
+"""
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+from utils.metrics import register_metrics
+from workflows.resume_processor.resume_cache import get_rendered_resume, get_resume_version, normalize_resume, render_resume
+from workflows.resume_processor.jd_digest import DIGEST_VERSION, compute_jd_hash, get_jd_digest
+
+logger = logging.getLogger(__name__)
+
+# Sections never dropped, whatever their relevance
+PROTECTED_SECTIONS = ('name', 'email', 'phone', 'address', 'linkedin', 'summary', 'skills')
+
+# Key added to a trimmed resume so the model knows entries were left out
+OMITTED_KEY = 'omitted_for_length'
+
+_STOPWORDS = {
+    'and', 'the', 'for', 'with', 'from', 'that', 'this', 'are', 'was', 'were', 'have', 'has',
+    'you', 'your', 'our', 'will', 'not', 'all', 'any', 'can', 'into', 'using', 'use', 'such'
+}
+_TERM = re.compile(r'[a-z0-9][a-z0-9+#.]{2,}')
+
+_encoding: Any = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            _encoding_loaded = True
+            try:
+                import tiktoken
+                try:
+                    _encoding = tiktoken.encoding_for_model(os.getenv('LLM_MODEL_NAME', 'gpt-4o-mini'))
+                except KeyError:
+                    _encoding = tiktoken.get_encoding('o200k_base')
+            except Exception as e:
+                logger.warning(f"[TokenBudget] tiktoken unavailable, estimating tokens from length: {str(e)}")
+        return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens of `text` for the configured model."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def get_token_budget() -> int:
+    return int(os.getenv('RESUME_TOKEN_BUDGET', 8000))
+
+
+def _terms(text: str) -> Set[str]:
+    return {term for term in _TERM.findall(text.lower()) if term not in _STOPWORDS}
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def rank_resume_entries(resume: Mapping[str, Any], jd_data: Any) -> List[Dict[str, Any]]:
+    """
+    Score every droppable resume entry by its relevance to the job description.
+
+    List sections (experience, projects, publications, ...) are scored per entry,
+    other sections as a whole. Relevance is the number of distinct JD terms in the
+    entry divided by the square root of its token count, so short, on-topic entries
+    rank above long, loosely related ones.
+
+    Returns:
+        Entries ordered from least to most relevant, each with section, index
+        (None for a whole section), tokens and relevance
+    """
+    jd_terms = _terms(_compact(jd_data))
+    entries = []
+    for section, value in resume.items():
+        if section in PROTECTED_SECTIONS or section == OMITTED_KEY:
+            continue
+        items = list(enumerate(value)) if isinstance(value, list) else [(None, value)]
+        for index, item in items:
+            text = _compact(item)
+            tokens = count_tokens(text)
+            hits = len(jd_terms & _terms(text))
+            entries.append({
+                'section': section,
+                'index': index,
+                'tokens': tokens,
+                'relevance': round(hits / math.sqrt(max(tokens, 1)), 4)
+            })
+    entries.sort(key=lambda entry: (entry['relevance'], -entry['tokens']))
+    return entries
+
+
+def _without(resume: Mapping[str, Any], dropped: List[Dict[str, Any]]) -> Dict[str, Any]:
+    dropped_sections = {entry['section'] for entry in dropped if entry['index'] is None}
+    dropped_items: Dict[str, Set[int]] = {}
+    for entry in dropped:
+        if entry['index'] is not None:
+            dropped_items.setdefault(entry['section'], set()).add(entry['index'])
+
+    trimmed: Dict[str, Any] = {}
+    for section, value in resume.items():
+        if section in dropped_sections:
+            continue
+        if section in dropped_items:
+            value = [item for index, item in enumerate(value) if index not in dropped_items[section]]
+            if not value:
+                continue
+        trimmed[section] = value
+
+    omitted: Dict[str, Any] = {}
+    for entry in dropped:
+        if entry['index'] is None:
+            omitted[entry['section']] = 'entire section'
+        else:
+            omitted[entry['section']] = f"{len(dropped_items[entry['section']])} entries"
+    trimmed[OMITTED_KEY] = omitted
+    return trimmed
+
+
+def fit_resume_to_budget(
+    resume_data: Any,
+    jd_data: Any,
+    budget: int,
+    rendered: Optional[str] = None
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Render the resume within a token budget.
+
+    Args:
+        resume_data: Parsed resume
+        jd_data: Parsed job description, used to rank entries
+        budget: Maximum tokens; 0 or less disables trimming
+        rendered: The already rendered resume, if the caller has it
+
+    Returns:
+        Tuple of the rendered resume and a truncation report, or None when nothing was dropped
+    """
+    rendered = rendered if rendered is not None else render_resume(resume_data)
+    original_tokens = count_tokens(rendered)
+    if budget <= 0 or original_tokens <= budget or not isinstance(resume_data, dict):
+        return rendered, None
+
+    resume = normalize_resume(resume_data)
+    candidates = rank_resume_entries(resume, jd_data)
+
+    # Drop by estimated size first, then keep dropping until the real count fits
+    dropped: List[Dict[str, Any]] = []
+    excess = original_tokens - budget
+    while candidates and excess > 0:
+        entry = candidates.pop(0)
+        dropped.append(entry)
+        excess -= entry['tokens']
+
+    trimmed = render_resume(_without(resume, dropped))
+    final_tokens = count_tokens(trimmed)
+    while candidates and final_tokens > budget:
+        dropped.append(candidates.pop(0))
+        trimmed = render_resume(_without(resume, dropped))
+        final_tokens = count_tokens(trimmed)
+
+    if final_tokens > budget:
+        logger.warning(f"[TokenBudget] Resume still {final_tokens} tokens after trimming, budget {budget}")
+
+    report = {
+        'budget': budget,
+        'original_tokens': original_tokens,
+        'final_tokens': final_tokens,
+        'dropped': dropped
+    }
+    logger.info(
+        f"[TokenBudget] Trimmed resume from {original_tokens} to {final_tokens} tokens "
+        f"by dropping {len(dropped)} entries"
+    )
+    return trimmed, report
+
+
+class BudgetedResumeCache:
+    """Thread-safe LRU of resumes fitted to a token budget, with their truncation reports."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[str, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_fit(self, key: tuple, fit) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Return the budgeted resume cached under `key`, calling `fit()` on a miss.
+
+        The returned report is shared and must not be mutated.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = fit()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Process-wide cache used by the agents
+budgeted_resume_cache = BudgetedResumeCache(int(os.getenv('RESUME_BUDGET_CACHE_MAX_ENTRIES', 1024)))
+register_metrics('budgeted_resume', budgeted_resume_cache.snapshot)
+
+
+def get_budgeted_resume(state: Mapping[str, Any], job_documents: Mapping[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Return the rendered resume for the prompt, trimmed to RESUME_TOKEN_BUDGET.
+
+    Args:
+        state: Current workflow state
+        job_documents: Job documents of the run (see get_job_documents)
+
+    Returns:
+        Tuple of the resume text and a truncation report, or None when it fit as is
+    """
+    jd_data = job_documents['jd_data']
+    budget = get_token_budget()
+    key = (state['candidate_id'], get_resume_version(state), compute_jd_hash(jd_data), budget, DIGEST_VERSION)
+    # Entries are ranked against the JD's requirements only (see jd_digest)
+    return budgeted_resume_cache.get_or_fit(key, lambda: fit_resume_to_budget(
+        state['resume_data'],
+        get_jd_digest(jd_data),
+        budget,
+        rendered=get_rendered_resume(state)
+    ))
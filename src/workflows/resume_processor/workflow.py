@@ -3,38 +3,56 @@ Main workflow file for resume processing.
 Connects all nodes and defines the workflow graph.
 """
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple, TYPE_CHECKING
 from langgraph.graph import StateGraph, END
+from utils.deadline import deadline_scope, remaining_seconds
+from utils.tracing import span, start_trace
+from services.llm_invoker import get_invoker
 from .nodes.jd_analysis_agent import JDAnalysisAgent
 from .nodes.router import RouterNode
-from .nodes.cultural_agent import CulturalAgent
+from .nodes.cultural_agent import FANOUT_PARTS, CulturalAgent
 from .nodes.absolute_rating import AbsoluteRatingNode
-from .state import ResumeProcessorState
-from langchain_openai import ChatOpenAI
-import os
-from utils.config import load_config
+from .nodes.combined_agent import CombinedEvaluationAgent
+from .nodes.explanation_agent import EXPLANATION_CALLS, ExplanationAgent
+from .state import ResumeProcessorState, final_status, mark_deadline_exceeded
+from .fingerprints import apply_stored_results, get_fingerprints, reusable_nodes
+from .consts import EVALUATION_MODE_COMBINED
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+    from utils.s3_client import S3Client
+    from utils.dynamo_client import DynamoClient
 
 logger = logging.getLogger(__name__)
-load_config()
 
 class ResumeProcessorWorkflow:
     def __init__(
-        self
+        self,
+        llm: Optional["BaseChatModel"] = None,
+        s3_client: Optional["S3Client"] = None,
+        dynamo_client: Optional["DynamoClient"] = None
     ):
         """
         Initialize resume processor workflow.
         
         Args:
-            score_threshold: Minimum score threshold for continuing
-            error_boundary: Error boundary for decision zones
-            weights: Weights for different scoring components
+            llm: Chat model shared by the agents; defaults to the process-shared ChatOpenAI model
+            s3_client: S3 client shared by the nodes; each node creates its own when omitted
+            dynamo_client: DynamoDB client shared by the nodes; each node creates its own when omitted
         """
+        if llm is None:
+            # Shared across workflows so pooled connections to the provider are reused
+            from services.llm_client import get_chat_model
+            llm = get_chat_model()
+
         # Initialize nodes
-        self.llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.2, top_p=0.9, api_key=os.getenv('OPENAI_API_KEY'))
-        self.jd_analysis = JDAnalysisAgent(self.llm)
-        self.router = RouterNode()
-        self.cultural_agent = CulturalAgent(self.llm)
-        self.absolute_rating = AbsoluteRatingNode()
+        self.llm = llm
+        self.jd_analysis = JDAnalysisAgent(self.llm, s3_client, dynamo_client)
+        self.router = RouterNode(dynamo_client)
+        self.cultural_agent = CulturalAgent(self.llm, s3_client, dynamo_client)
+        self.absolute_rating = AbsoluteRatingNode(dynamo_client)
+        self.combined_evaluation = CombinedEvaluationAgent(self.llm, self.jd_analysis, self.cultural_agent)
+        self.explanation = ExplanationAgent(self.llm, s3_client, dynamo_client)
 
         # Create and compile workflow graph
         self.workflow = self._create_workflow()
@@ -51,10 +69,21 @@ class ResumeProcessorWorkflow:
         workflow = StateGraph(ResumeProcessorState)
 
         # Add nodes
-        workflow.add_node("jd_analysis", self.jd_analysis.analyze_resume)
-        workflow.add_node("router", self.router.route)
-        workflow.add_node("cultural_agent", self.cultural_agent.analyze_cultural_fit)
-        workflow.add_node("absolute_rating", self.absolute_rating.compute_rating)
+        workflow.add_node("jd_analysis", self._incremental(
+            "jd_analysis", ('jd_analysis',), 'router',
+            self._traced("jd_analysis", self.jd_analysis.analyze_resume)
+        ))
+        workflow.add_node("router", self._traced("router", self.router.route))
+        workflow.add_node("cultural_agent", self._incremental(
+            "cultural_agent", ('cultural_agent',), 'absolute_rating',
+            self._traced("cultural_agent", self.cultural_agent.analyze_cultural_fit)
+        ))
+        workflow.add_node("absolute_rating", self._traced("absolute_rating", self.absolute_rating.compute_rating))
+        workflow.add_node("combined_evaluation", self._incremental(
+            "combined_evaluation", ('jd_analysis', 'cultural_agent'), 'router',
+            self._traced("combined_evaluation", self.combined_evaluation.evaluate)
+        ))
+        workflow.add_node("explanation", self._traced("explanation", self.explanation.explain))
 
         # Add conditional edges
         workflow.add_conditional_edges(
@@ -67,11 +96,22 @@ class ResumeProcessorWorkflow:
         )
 
         workflow.add_conditional_edges(
-            "router",
+            "combined_evaluation",
             self._should_end,
             {
                 True: END,
-                False: "cultural_agent"
+                False: "router"
+            }
+        )
+
+        # In combined mode the router skips the cultural agent
+        workflow.add_conditional_edges(
+            "router",
+            self._next_node,
+            {
+                'end': END,
+                'cultural_agent': "cultural_agent",
+                'absolute_rating': "absolute_rating"
             }
         )
 
@@ -84,8 +124,24 @@ class ResumeProcessorWorkflow:
             }
         )
 
-        # Set entry point
-        workflow.set_entry_point("jd_analysis")
+        # Fast-mode runs explain the scores of the candidates worth reading about
+        workflow.add_conditional_edges(
+            "absolute_rating",
+            self.explanation.should_explain,
+            {
+                True: "explanation",
+                False: END
+            }
+        )
+
+        # Set entry point, chosen per run by the evaluation mode
+        workflow.set_conditional_entry_point(
+            self._entry_node,
+            {
+                "jd_analysis": "jd_analysis",
+                "combined_evaluation": "combined_evaluation"
+            }
+        )
 
         return workflow
 
@@ -101,20 +157,104 @@ class ResumeProcessorWorkflow:
         """
         try:
             logger.info(f"Starting resume processing for candidate {state['candidate_id']}")
-            
-            # Run workflow
-            final_state = self.compiled_workflow.invoke(state)
+
+            with start_trace(
+                'process_resume',
+                job_id=state['job_id'],
+                candidate_id=state['candidate_id'],
+                evaluation_mode=state.get('evaluation_mode')
+            ) as run_span:
+                if run_span.trace_id:
+                    state['trace_id'] = run_span.trace_id
+
+                # Run workflow
+                final_state = self.compiled_workflow.invoke(state)
+                run_span.set_attribute('status', final_state.get('status'))
             
             logger.info(f"Completed resume processing for candidate {state['candidate_id']}")
-            final_state['status'] = 'COMPLETED'
+            final_state['status'] = final_status(final_state)
             return final_state
 
         except Exception as e:
             logger.error(f"Error in resume processing workflow: {str(e)}")
             raise
     
+    def _traced(self, name: str, node):
+        """
+        Wrap a node so each of its runs is recorded as a span of the run's trace and
+        runs under the run's deadline.
+
+        A node is skipped, and the run aborted, when the deadline has passed or less
+        time is left than the node's LLM call typically takes.
+        """
+        def run(state: ResumeProcessorState) -> ResumeProcessorState:
+            with span(f"node.{name}") as node_span, deadline_scope(state.get('deadline')):
+                remaining = remaining_seconds()
+                if remaining is not None:
+                    typical = self._typical_latency(name)
+                    node_span.set_attributes(remaining_s=round(remaining, 3), typical_s=typical)
+                    if remaining <= typical:
+                        return mark_deadline_exceeded(
+                            state,
+                            f"[{name}]",
+                            f"Aborted with {max(remaining, 0):.2f}s left before the deadline, "
+                            f"typical duration {typical:.2f}s"
+                        )
+                result = node(state)
+                node_span.set_attributes(next_node=result.get('next_node'), status=result.get('status'))
+                return result
+        return run
+
+    def _typical_latency(self, name: str) -> float:
+        """
+        Typical duration of a node's LLM calls, looked up under the names the
+        invoker records them by; 0 while too few are known.
+        """
+        invoker = get_invoker()
+        if name == 'cultural_agent' and self.cultural_agent.fanout:
+            # The parts are scored concurrently: the slowest one sets the pace
+            return max(invoker.typical_latency(f'cultural_agent.{part}') or 0.0 for part in FANOUT_PARTS)
+        if name == 'explanation':
+            return sum(invoker.typical_latency(call) or 0.0 for call in EXPLANATION_CALLS)
+        return invoker.typical_latency(name) or 0.0
+
+    def _incremental(self, name: str, nodes: Tuple[str, ...], next_node: str, node):
+        """
+        Wrap an LLM node so a re-evaluation reuses the stored results of `nodes`,
+        and routes to `next_node`, when their input fingerprints are unchanged.
+        """
+        def run(state: ResumeProcessorState) -> ResumeProcessorState:
+            try:
+                # Recorded with the node's scores
+                get_fingerprints(state, self.cultural_agent.fanout, self.jd_analysis.s3_client)
+            except Exception as e:
+                # The node reports unreadable job documents itself
+                logger.warning(f"[{name}] Could not fingerprint the inputs: {str(e)}")
+            if not reusable_nodes(state, nodes):
+                return node(state)
+            with span(f"node.{name}", reused=True):
+                logger.info(f"[{name}] Inputs unchanged, reusing the stored results")
+                state = apply_stored_results(state, nodes)
+                state['next_node'] = next_node
+                return state
+        return run
+
     def _should_end(self, state: ResumeProcessorState) -> bool:
         """
         Check if JD analysis should end.
         """
-        return state['next_node'] == 'end'
\ No newline at end of file
+        return state['next_node'] == 'end'
+
+    def _next_node(self, state: ResumeProcessorState) -> str:
+        """
+        Next node chosen by the node that just ran.
+        """
+        return state['next_node']
+
+    def _entry_node(self, state: ResumeProcessorState) -> str:
+        """
+        First node of the run: one combined LLM call or the separate JD agent.
+        """
+        if state.get('evaluation_mode') == EVALUATION_MODE_COMBINED:
+            return "combined_evaluation"
+        return "jd_analysis"
\ No newline at end of file